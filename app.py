@@ -1,11 +1,18 @@
 from controller.controller import register_callbacks
+from controller.metrics import register_metrics
 from layout.layout import generate_layout
 
 import dash
 
 app = dash.Dash(title='MT5 Analyzer')
-app.layout = generate_layout
+
+# Built once at import: every page load is served the same skeleton
+app.layout = generate_layout()
 register_callbacks(app)
+register_metrics(app)
+
+# The Flask server, for WSGI servers (e.g. gunicorn app:server)
+server = app.server
 
 if __name__ == '__main__':
 
@@ -0,0 +1,63 @@
+from benchmarks.fake_mt5 import install_fake_mt5
+
+from concurrent.futures import ThreadPoolExecutor
+
+import os
+import tempfile
+import time
+
+SYMBOLS = [f"SYM{index:03d}" for index in range(200)]
+LATENCY = 0.02
+
+install_fake_mt5(SYMBOLS + ['USDJPY'])
+
+# A fresh bar store, so every run fetches from the backend
+os.environ['MT5_BAR_STORE_DIR'] = tempfile.mkdtemp()
+
+from src.BarCache import BarCache
+from src.BarStore import BarStore
+from src.DataProvider import MT5DataProvider
+from src.ForexAnalyzer import ForexAnalyzer, FETCH_MAX_WORKERS
+from src.ReplayDataProvider import ReplayDataProvider
+
+def _run_sequential(forex_analyzer, symbols):
+    return [forex_analyzer._fetch_data_mt5('1H', 1, symbol) for symbol in symbols]
+
+def _run_concurrent(forex_analyzer, symbols):
+    return forex_analyzer.fetch_symbols_data('1H', 1, symbols)
+
+def main():
+
+    # Recorded from the fake terminal, then replayed with the latency: the replay backend
+    # serves concurrent calls, where the MT5 terminal serves them one at a time
+    replay_directory = tempfile.mkdtemp()
+    ReplayDataProvider.record(MT5DataProvider(), replay_directory, SYMBOLS + ['USDJPY'], bar_count=10)
+
+    forex_analyzer = ForexAnalyzer.get_instance(ReplayDataProvider(replay_directory, latency=LATENCY))
+
+    print(f"{len(SYMBOLS)} symbols, {LATENCY * 1000:.0f} ms per terminal call")
+
+    runs = [
+        ('sequential', 1, _run_sequential),
+        ('1 worker (MT5 terminal)', 1, _run_concurrent),
+        (f"{FETCH_MAX_WORKERS} workers (replay, broker)", FETCH_MAX_WORKERS, _run_concurrent)
+    ]
+
+    for name, workers, runner in runs:
+
+        # Start every run on cold caches
+        forex_analyzer._bar_cache = BarCache()
+        forex_analyzer._bar_store = BarStore(tempfile.mkdtemp())
+        forex_analyzer._fetch_executor = ThreadPoolExecutor(max_workers=workers)
+
+        start = time.perf_counter()
+        runner(forex_analyzer, SYMBOLS)
+        elapsed = time.perf_counter() - start
+
+        print(f"{name:>28}: {elapsed:.3f} s")
+
+    _, failed_symbols = forex_analyzer.fetch_symbols_data('1H', 1, SYMBOLS[:5] + ['UNKNOWN'])
+    print(f"partial failure report: {failed_symbols}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.counting import CountingProvider
+from src.BrokerDataProvider import BrokerDataProvider
+from src.DataBroker import DataBroker
+from src.DataProvider import TIMEFRAME_H1, TIMEFRAME_H4
+from src.ReplayDataProvider import ReplayDataProvider
+
+import numpy as np
+
+import argparse
+import threading
+import time
+
+def _burst(clients, symbol, timeframe, threads_per_client):
+    """Every thread of every client asks for the same bars at the same time"""
+
+    barrier = threading.Barrier(len(clients) * threads_per_client)
+
+    def _fetch(client):
+        barrier.wait()
+        started_at = time.perf_counter()
+        rates = client.copy_rates_from(symbol, timeframe, datetime.now(), 500)
+
+        return time.perf_counter() - started_at, rates
+
+    with ThreadPoolExecutor(max_workers=len(clients) * threads_per_client) as executor:
+        results = list(executor.map(_fetch, [client for client in clients for _ in range(threads_per_client)]))
+
+    latencies = np.array([latency for latency, _ in results])
+
+    # Every request got the same bars
+    assert all(np.array_equal(rates, results[0][1]) for _, rates in results)
+
+    return latencies
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Terminal calls made through the data broker, for many clients asking for the same bars")
+    parser.add_argument('--replay-dir', required=True, help="the folder of recorded bars (see ReplayDataProvider)")
+    parser.add_argument('--latency', type=float, default=0.05, help="the seconds each simulated terminal call takes")
+    parser.add_argument('--processes', type=int, default=8, help="the simulated Dash worker processes (one client each)")
+    parser.add_argument('--threads', type=int, default=4, help="the request threads of each worker")
+    parser.add_argument('--address', default='tcp://127.0.0.1:5599')
+    arguments = parser.parse_args()
+
+    backend = CountingProvider(ReplayDataProvider(arguments.replay_dir, latency=arguments.latency))
+    symbol = backend.symbols_get()[0].name
+
+    broker = DataBroker(backend, arguments.address)
+    broker_thread = threading.Thread(target=broker.serve_forever, daemon=True)
+    broker_thread.start()
+
+    clients = [BrokerDataProvider(arguments.address) for _ in range(arguments.processes)]
+    requests = arguments.processes * arguments.threads
+
+    try:
+        for timeframe_name, timeframe in [('1H', TIMEFRAME_H1), ('4H', TIMEFRAME_H4)]:
+            backend.calls.clear()
+
+            latencies = _burst(clients, symbol, timeframe, arguments.threads)
+
+            print(
+                f"{symbol} {timeframe_name}: {requests} requests from {arguments.processes} clients -> "
+                f"{backend.calls['copy_rates_from']} terminal call(s) (vs {requests} without the broker), "
+                f"p50 {np.percentile(latencies, 50) * 1000:.0f} ms, max {latencies.max() * 1000:.0f} ms"
+            )
+
+        print(f"broker stats: {clients[0].get_broker_stats()}")
+    finally:
+        broker.stop()
+        broker_thread.join()
+
+if __name__ == '__main__':
+    main()
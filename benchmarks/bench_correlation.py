@@ -0,0 +1,62 @@
+from benchmarks.synthetic import generate_rates
+from src.CorrelationEngine import CorrelationEngine
+
+import numpy as np
+import pandas as pd
+
+import timeit
+import warnings
+
+SYMBOL_COUNT = 120
+BAR_COUNT = 720
+WINDOW = 48
+
+def _previous(symbols_data):
+    """The column by column frame of the closes, aligned on the index, as previously computed"""
+
+    currency_correlation_df = pd.DataFrame()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+
+        for currency_pair, data in symbols_data.items():
+            currency_correlation_df[currency_pair] = data['close']
+
+    return currency_correlation_df.corr()
+
+def _engine(engine, symbols_data):
+    times, symbols, closes = engine.align_closes(symbols_data)
+
+    return engine.correlation_matrix(closes)
+
+def main():
+
+    # Every fifth symbol misses a few random bars, to exercise the time alignment
+    symbols_data = {}
+
+    for seed in range(SYMBOL_COUNT):
+        rates_df = generate_rates(BAR_COUNT + 1, '1H', seed=seed)
+
+        if seed % 5 == 0:
+            rates_df = rates_df.drop(np.random.default_rng(seed).choice(BAR_COUNT, 10, replace=False)).reset_index(drop=True)
+
+        symbols_data[f"SYM{seed:03d}"] = rates_df
+
+    engine = CorrelationEngine()
+    times, symbols, closes = engine.align_closes(symbols_data)
+
+    # The rolling state follows the bars, as the correlation panel is refreshed (the results are
+    # checked against pandas in tests/test_correlation_engine.py)
+    for end in range(BAR_COUNT - 100, times.shape[0] + 1):
+        engine.rolling_correlation_matrix('1H', times[:end], symbols, closes[:end], WINDOW)
+
+    print(f"{len(symbols)} symbols x {times.shape[0]} bars")
+
+    previous_time = min(timeit.repeat(lambda: _previous(symbols_data), number=3, repeat=3)) / 3
+    engine_time = min(timeit.repeat(lambda: _engine(engine, symbols_data), number=3, repeat=3)) / 3
+    rolling_time = min(timeit.repeat(lambda: engine.rolling_correlation_matrix('1H', times, symbols, closes, WINDOW), number=10, repeat=3)) / 10
+
+    print(f"previous: {previous_time * 1000:.1f} ms, engine (align + correlate): {engine_time * 1000:.1f} ms, rolling refresh: {rolling_time * 1000:.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+from datetime import datetime
+
+from benchmarks.synthetic import generate_rates
+from src.Graphs import Graphs
+
+import numpy as np
+
+import inspect
+import timeit
+
+BAR_COUNT = 600
+MULTIPLIER = 0.0001
+
+def legacy_find_earlier_hour_today(data_day):
+    """The string round-trip finding midnight, kept for comparison"""
+
+    current_date_time = datetime.strptime(str(data_day['time'].iat[-1]), "%Y-%m-%d %H:%M:%S")
+
+    return datetime.combine(current_date_time, datetime.min.time())
+
+def legacy_pip_range_counts(data_day, multiplier):
+    """The row by row points and colours, kept for comparison"""
+
+    data_day = data_day[data_day['time'] >= legacy_find_earlier_hour_today(data_day)]
+
+    colors_list = []
+    points_list = []
+
+    for index, row in data_day.iterrows():
+        diff = round((row['close'] - row['open']) / multiplier)
+        colors_list.append('green' if diff > 0 else 'red')
+        points_list.append(int(abs(diff)))
+
+    return points_list, colors_list
+
+def legacy_volume(data):
+    return data[data['time'] >= legacy_find_earlier_hour_today(data)]['tick_volume']
+
+def _both_legacy(data):
+    return legacy_pip_range_counts(data, MULTIPLIER), legacy_volume(data)
+
+def _both_vectorized(graphs, data):
+    data_today = graphs.slice_today(data)
+    points = np.round((data_today['close'].to_numpy() - data_today['open'].to_numpy()) / MULTIPLIER)
+
+    return (np.abs(points).astype(int), np.where(points > 0, 'green', 'red')), data_today['tick_volume'].to_numpy()
+
+def main():
+
+    graphs = Graphs()
+
+    # Ends mid-day, like a forming day
+    data = generate_rates(BAR_COUNT, '1H').iloc[:-7].reset_index(drop=True)
+
+    (legacy_points, legacy_colors), legacy_volumes = _both_legacy(data)
+    (points, colors), volumes = _both_vectorized(graphs, data)
+
+    print(
+        f"{len(points)} bars today, same points: {legacy_points == points.tolist()}, "
+        f"same colours: {legacy_colors == colors.tolist()}, same volume: {legacy_volumes.tolist() == volumes.tolist()}"
+    )
+
+    legacy_time = min(timeit.repeat(lambda: _both_legacy(data), number=100, repeat=5)) / 100
+    vectorized_time = min(timeit.repeat(lambda: _both_vectorized(graphs, data), number=100, repeat=5)) / 100
+
+    print(f"points + volume data, legacy: {legacy_time * 1000:.3f} ms, vectorized: {vectorized_time * 1000:.3f} ms")
+
+    # The whole figures, bypassing the figure cache
+    data_today = graphs.slice_today(data)
+
+    figures_time = min(timeit.repeat(
+        lambda: (
+            inspect.unwrap(Graphs.plot_pip_range_counts)(graphs, data_today, MULTIPLIER),
+            inspect.unwrap(Graphs.plot_volume_graph)(graphs, data_today)
+        ),
+        number=10, repeat=3
+    )) / 10
+
+    print(f"both figures, uncached: {figures_time * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+from benchmarks.fake_mt5 import install_fake_mt5
+from benchmarks.synthetic import generate_rates
+
+import argparse
+import os
+import tempfile
+import time
+
+def _symbols(count):
+    return [f"SYM{index:03d}" for index in range(count)]
+
+def _per_series(scan_series, stack_series, timeframes_data, bar_count):
+    """The same scan, one symbol at a time (as a loop over get_daily_stats would)"""
+
+    rows = 0
+
+    for symbols_data in timeframes_data.values():
+        for symbol in symbols_data:
+            _, (highs, lows, closes) = stack_series({symbol: symbols_data[symbol]}, bar_count)
+            rows += scan_series(highs, lows, closes)['column'].shape[0]
+
+    return rows
+
+def main():
+
+    parser = argparse.ArgumentParser(description="RSI divergence scan of a whole universe of symbols and timeframes")
+    parser.add_argument('--symbols', type=int, default=300, help="the symbols scanned")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="the worker processes of the pooled scan")
+    parser.add_argument('--latency', type=float, default=0.0, help="the seconds each simulated terminal call takes")
+    arguments = parser.parse_args()
+
+    symbols = _symbols(arguments.symbols)
+
+    install_fake_mt5(symbols, latency=arguments.latency)
+    os.environ['MT5_BAR_STORE_DIR'] = tempfile.mkdtemp()
+
+    from src.DataProvider import MT5DataProvider
+    from src.DivergenceScanner import DivergenceScanner, scan_series, stack_series
+    from src.ForexAnalyzer import ForexAnalyzer, DIVERGENCE_BAR_COUNT, DIVERGENCE_TIMEFRAMES
+
+    timeframes_data = {
+        timeframe: {symbol: generate_rates(DIVERGENCE_BAR_COUNT, timeframe, seed=seed) for seed, symbol in enumerate(symbols)}
+        for timeframe in DIVERGENCE_TIMEFRAMES
+    }
+
+    series_count = arguments.symbols * len(DIVERGENCE_TIMEFRAMES)
+
+    started_at = time.perf_counter()
+    rows = _per_series(scan_series, stack_series, timeframes_data, DIVERGENCE_BAR_COUNT)
+    print(f"{'per symbol':>22}: {(time.perf_counter() - started_at) * 1000:8.1f} ms for {series_count} series, {rows} divergences")
+
+    for name, scanner in [('stacked, in process', DivergenceScanner(max_workers=1)), (f"stacked, {arguments.workers} processes", DivergenceScanner(max_workers=arguments.workers, chunk_series=max(1, arguments.symbols // arguments.workers)))]:
+        # The first scan starts the worker processes
+        scanner.scan(timeframes_data, DIVERGENCE_BAR_COUNT)
+
+        started_at = time.perf_counter()
+        divergence_df = scanner.scan(timeframes_data, DIVERGENCE_BAR_COUNT)
+        print(f"{name:>22}: {(time.perf_counter() - started_at) * 1000:8.1f} ms for {series_count} series, {divergence_df.shape[0]} divergences")
+
+        scanner.shutdown()
+
+    forex_analyzer = ForexAnalyzer.get_instance(MT5DataProvider())
+
+    for state in ['first', 'repeated']:
+        started_at = time.perf_counter()
+        divergence_df, failed_symbols = forex_analyzer.scan_divergences()
+        print(f"{'scan_divergences ' + state:>22}: {(time.perf_counter() - started_at) * 1000:8.1f} ms "
+              f"(fetch included), {divergence_df.shape[0]} divergences, {len(failed_symbols)} timeframes failed")
+
+    print(divergence_df.head(10))
+
+if __name__ == '__main__':
+    main()
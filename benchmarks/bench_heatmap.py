@@ -0,0 +1,69 @@
+from src.Graphs import Graphs
+
+import numpy as np
+import pandas as pd
+import plotly.figure_factory as ff
+import plotly.graph_objects as go
+
+import json
+import time
+
+SYMBOL_COUNTS = [10, 50, 200]
+
+def _correlations(symbol_count, seed=0):
+    """A random correlation matrix, from returns driven by a few common factors"""
+
+    rng = np.random.default_rng(seed)
+
+    factors = rng.normal(size=(500, 4))
+    loadings = rng.normal(size=(4, symbol_count))
+    returns = factors @ loadings + rng.normal(size=(500, symbol_count))
+
+    symbols = [f"SYM{position:03d}" for position in range(symbol_count)]
+
+    return pd.DataFrame(np.corrcoef(returns, rowvar=False), index=symbols, columns=symbols).round(3)
+
+def _previous(correlation_df):
+    """The annotated heatmap, as previously built (without the FigureWidget, which needs ipywidgets)"""
+
+    currency_pairs = list(correlation_df.columns)
+
+    ff_fig = ff.create_annotated_heatmap(
+        x=currency_pairs,
+        y=currency_pairs,
+        z=correlation_df.values.tolist(),
+        colorscale='Viridis',
+        showscale=True
+    )
+
+    fig = go.Figure(ff_fig)
+    fig.update_layout(title=f"Currency correlation")
+
+    return fig.to_json()
+
+def _timed(function):
+    started_at = time.perf_counter()
+    result = function()
+
+    return time.perf_counter() - started_at, result
+
+def main():
+
+    for symbol_count in SYMBOL_COUNTS:
+        correlation_df = _correlations(symbol_count)
+
+        previous_time, previous_json = _timed(lambda: _previous(correlation_df))
+
+        # A new Graphs object each time, so the figure cache doesn't answer
+        current_time, _ = _timed(lambda: Graphs().plot_correlation_heatmap(correlation_df))
+        unclustered_time, _ = _timed(lambda: Graphs().plot_correlation_heatmap(correlation_df, cluster=False))
+        current_figure = Graphs().plot_correlation_heatmap(correlation_df)
+
+        print(
+            f"{symbol_count} symbols: previous {previous_time * 1000:.0f} ms ({len(previous_json) / 1024:.0f} KiB), "
+            f"heatmap {current_time * 1000:.0f} ms clustered / {unclustered_time * 1000:.0f} ms unclustered "
+            f"({len(json.dumps(current_figure)) / 1024:.0f} KiB)"
+        )
+
+if __name__ == '__main__':
+    main()
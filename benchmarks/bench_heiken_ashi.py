@@ -0,0 +1,49 @@
+from benchmarks.synthetic import generate_rates
+from src.HeikenAshi import HeikenAshi
+
+import timeit
+
+def legacy_heiken_ashi(rates_df):
+    """The per-row .loc implementation, kept for comparison"""
+
+    data = rates_df.copy()
+
+    for i in range(data.shape[0]):
+        if i > 0:
+            data.loc[data.index[i],'open'] = (rates_df['open'][i-1] + rates_df['close'][i-1])/2
+
+        data.loc[data.index[i],'close'] = (rates_df['open'][i] + rates_df['close'][i] + rates_df['low'][i] +  rates_df['high'][i])/4
+
+    return data.iloc[1:,:]
+
+def _best_of(func, repeat=3):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+def main():
+
+    heiken_ashi = HeikenAshi()
+
+    print(f"{'bars':>10} {'legacy (s)':>12} {'build (s)':>12} {'update (s)':>12} {'unchanged (s)':>14}")
+
+    for bar_count in [600, 10_000, 100_000, 1_000_000]:
+
+        rates_df = generate_rates(bar_count + 1)
+        previous_df = rates_df.iloc[:-1].reset_index(drop=True)
+        current_df = rates_df.iloc[1:].reset_index(drop=True)
+
+        # The legacy loop is too slow to time on large windows
+        legacy_time = _best_of(lambda: legacy_heiken_ashi(current_df), 1) if bar_count <= 10_000 else float('nan')
+
+        build_time = _best_of(lambda: heiken_ashi.build(current_df))
+
+        cached_df = heiken_ashi.build(previous_df)
+        update_time = _best_of(lambda: heiken_ashi.update(cached_df, current_df))
+
+        # A refresh without any new tick
+        current_ha_df = heiken_ashi.build(current_df)
+        unchanged_time = _best_of(lambda: heiken_ashi.update(current_ha_df, current_df))
+
+        print(f"{bar_count:>10} {legacy_time:>12.4f} {build_time:>12.4f} {update_time:>12.4f} {unchanged_time:>14.6f}")
+
+if __name__ == '__main__':
+    main()
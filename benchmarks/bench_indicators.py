@@ -0,0 +1,53 @@
+from benchmarks.synthetic import generate_rates
+from src.IndicatorEngine import IndicatorEngine
+
+from tapy import Indicators
+
+import talib
+import timeit
+
+WINDOW = 600
+
+def _reference(window_df):
+    """The talib RSI and tapy ATR, as previously computed on every refresh"""
+
+    rsi = talib.RSI(window_df['close'], timeperiod=14).to_numpy()
+
+    indicators = Indicators(window_df.rename(columns={"close": "Close", "high": "High", "low": "Low", "open": "Open"}))
+    indicators.atr(period=50, column_name='atr')
+
+    return rsi, indicators.df['atr'].to_numpy()
+
+def _engine(engine, window_df):
+    times = window_df['time'].to_numpy()
+
+    rsi = engine.rsi('EURUSD', '4H', times, window_df['close'].to_numpy())
+    atr = engine.atr('EURUSD', '4H', times, window_df['high'].to_numpy(), window_df['low'].to_numpy(), window_df['close'].to_numpy())
+
+    return rsi, atr
+
+def main():
+
+    rates_df = generate_rates(WINDOW + 100, '4H')
+    windows = [rates_df.iloc[shift:WINDOW + shift].reset_index(drop=True) for shift in range(100)]
+
+    # The engine streams the windows, as the graphs are refreshed while bars close (its results
+    # are checked against talib and tapy in tests/test_indicator_engine.py)
+    engine = IndicatorEngine()
+
+    for window_df in windows:
+        _engine(engine, window_df)
+
+    # Timings of a refresh with one new bar
+    reference_time = min(timeit.repeat(lambda: _reference(windows[-1]), number=10, repeat=3)) / 10
+    streaming_time = min(timeit.repeat(lambda: _engine(engine, windows[-1]), number=10, repeat=3)) / 10
+
+    def _full_recompute():
+        return _engine(IndicatorEngine(), windows[-1])
+
+    full_time = min(timeit.repeat(_full_recompute, number=10, repeat=3)) / 10
+
+    print(f"talib + tapy: {reference_time * 1000:.3f} ms, engine full recompute: {full_time * 1000:.3f} ms, engine streaming: {streaming_time * 1000:.3f} ms")
+
+if __name__ == '__main__':
+    main()
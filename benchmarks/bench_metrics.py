@@ -0,0 +1,38 @@
+from src.Metrics import Histogram, Metrics
+
+import argparse
+import time
+
+def _noop(value):
+    return value
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Overhead of the timing hooks, and time to serve /metrics")
+    parser.add_argument('--calls', type=int, default=200000, help="the calls timed")
+    arguments = parser.parse_args()
+
+    metrics = Metrics()
+    timed_noop = metrics.timed(metrics.plot_seconds)(_noop)
+
+    for name, function in [('plain call', _noop), ('timed call', timed_noop)]:
+        started_at = time.perf_counter()
+
+        for value in range(arguments.calls):
+            function(value)
+
+        print(f"{name:>12}: {(time.perf_counter() - started_at) / arguments.calls * 1e9:6.0f} ns per call")
+
+    # A busy process: every method of every histogram observed
+    histogram = Histogram('bench_seconds', "Benchmark")
+
+    for method in range(200):
+        for value in range(50):
+            histogram.observe(value / 1000, method=f"method_{method}")
+
+    started_at = time.perf_counter()
+    exposition = '\n'.join(histogram.expose())
+    print(f"{'exposition':>12}: {(time.perf_counter() - started_at) * 1000:6.2f} ms for 200 series ({len(exposition)} bytes)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+from benchmarks.synthetic import generate_rates
+from src.Graphs import Graphs
+
+import pandas as pd
+
+import timeit
+
+def legacy_filter_missing_dates(data):
+    """The list-based implementation, kept for comparison"""
+
+    all_dates = pd.date_range(start=data['time'].iat[0],end=data['time'].iat[-1])
+    original_dates = [d.strftime("%Y-%m-%d") for d in data['time']]
+
+    return [d for d in all_dates.strftime("%Y-%m-%d").tolist() if not d in original_dates]
+
+def _best_of(func, repeat=3):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+def main():
+
+    graphs = Graphs()
+
+    print(f"{'1H bars':>10} {'years':>6} {'legacy (s)':>12} {'vectorized (s)':>15} {'memoized (s)':>13}")
+
+    for bar_count in [600, 6_000, 30_000, 120_000]:
+
+        data = generate_rates(bar_count, '1H')
+        years = bar_count / (24 * 5 * 52)
+
+        # The legacy version is quadratic, so only time it on the shorter series
+        legacy_time = _best_of(lambda: legacy_filter_missing_dates(data), 1) if bar_count <= 6_000 else float('nan')
+
+        # The memo is keyed by symbol and series bounds: cleared before each cold run
+        def _uncached():
+            graphs._rangebreaks_cache.clear()
+            return graphs._find_rangebreaks(data, '1H', 'EURUSD')
+
+        vectorized_time = _best_of(_uncached)
+        memoized_time = _best_of(lambda: graphs._find_rangebreaks(data, '1H', 'EURUSD'))
+
+        print(f"{bar_count:>10} {years:>6.1f} {legacy_time:>12.4f} {vectorized_time:>15.4f} {memoized_time:>13.6f}")
+
+if __name__ == '__main__':
+    main()
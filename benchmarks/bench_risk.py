@@ -0,0 +1,67 @@
+from benchmarks.counting import CountingProvider
+from src.DataProvider import ORDER_TYPE_BUY, ORDER_TYPE_SELL
+from src.ReplayDataProvider import ReplayDataProvider
+from src.RiskEngine import RiskEngine
+from src.SymbolRegistry import SymbolRegistry
+
+import numpy as np
+
+import argparse
+import time
+
+LOT_SIZES = [0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0]
+
+def _previous(data_provider, symbols, lot_sizes, balance):
+    """One tick and one margin call per symbol, side and lot size, as calculate_margin did"""
+
+    margins = []
+
+    for symbol in symbols:
+        for action in [ORDER_TYPE_BUY, ORDER_TYPE_SELL]:
+            for lot_size in lot_sizes:
+                tick = data_provider.symbol_info_tick(symbol)
+                price = tick.ask if action == ORDER_TYPE_BUY else tick.bid
+                margins.append(data_provider.order_calc_margin(action, symbol, lot_size, price))
+
+    margins = np.array(margins)
+
+    return margins, balance - 0.20 * margins
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Margins of a watchlist for many lot sizes, per click, with and without the risk engine")
+    parser.add_argument('--replay-dir', required=True, help="the folder of recorded bars (see ReplayDataProvider)")
+    parser.add_argument('--latency', type=float, default=0.005, help="the seconds each simulated terminal call takes")
+    arguments = parser.parse_args()
+
+    data_provider = CountingProvider(ReplayDataProvider(arguments.replay_dir, latency=arguments.latency))
+    symbol_registry = SymbolRegistry(data_provider)
+    risk_engine = RiskEngine(data_provider, symbol_registry)
+
+    symbols = symbol_registry.get_names()
+    combinations = len(symbols) * 2 * len(LOT_SIZES)
+
+    runs = [
+        ('one call per combination', lambda: _previous(data_provider, symbols, LOT_SIZES, 10000)),
+        ('risk engine, new ticks', lambda: risk_engine.calculate_risk(symbols, LOT_SIZES, 10000, 8000, 200, 500, 5)),
+        ('risk engine, same ticks', lambda: risk_engine.calculate_risk(symbols, LOT_SIZES, 10000, 8000, 200, 500, 5))
+    ]
+
+    results = {}
+
+    for name, run in runs:
+        data_provider.calls.clear()
+
+        started_at = time.perf_counter()
+        results[name] = run()
+        elapsed = time.perf_counter() - started_at
+
+        print(f"{name:>26}: {combinations} combinations in {elapsed * 1000:7.1f} ms, terminal calls: {dict(data_provider.calls)}")
+
+    previous_margins, _ = results['one call per combination']
+    risk_df, _ = results['risk engine, same ticks']
+
+    print(f"max |engine - previous| margin: {np.abs(risk_df['margin'].to_numpy() - previous_margins).max():.2e}")
+
+if __name__ == '__main__':
+    main()
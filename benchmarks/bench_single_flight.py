@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.counting import CountingProvider
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+class _NoFlight:
+    """Run every call, as before the single-flight layer"""
+
+    def do(self, key, function, *args, copy=None):
+        return function(*args)
+
+def _burst(forex_analyzer, symbol, users):
+    """Every user opens the symbol at the same time: each callback fetches its 1H and 4H bars"""
+
+    barrier = threading.Barrier(users)
+
+    def _open_symbol(user):
+        barrier.wait()
+        forex_analyzer.get_daily_stats('1H', 600, symbol)
+        forex_analyzer.get_daily_stats('4H', 600, symbol)
+
+    started_at = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        list(executor.map(_open_symbol, range(users)))
+
+    return time.perf_counter() - started_at
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Terminal calls made by users opening the same symbol at the same time")
+    parser.add_argument('--replay-dir', required=True, help="the folder of recorded bars (see ReplayDataProvider)")
+    parser.add_argument('--latency', type=float, default=0.05, help="the seconds each simulated terminal call takes")
+    parser.add_argument('--users', type=int, default=16)
+    arguments = parser.parse_args()
+
+    # A fresh bar store, so the first burst of each run is cold
+    os.environ['MT5_BAR_STORE_DIR'] = tempfile.mkdtemp()
+
+    from src.BarCache import BarCache
+    from src.BarStore import BarStore
+    from src.ForexAnalyzer import ForexAnalyzer
+    from src.ReplayDataProvider import ReplayDataProvider
+    from src.SingleFlight import SingleFlight
+
+    backend = CountingProvider(ReplayDataProvider(arguments.replay_dir, latency=arguments.latency))
+    forex_analyzer = ForexAnalyzer.get_instance(backend)
+    symbol = backend.symbols_get()[0].name
+
+    for name, flight in [('without single-flight', _NoFlight()), ('with single-flight', SingleFlight())]:
+        forex_analyzer._fetch_flight = flight
+        forex_analyzer._bar_cache = BarCache()
+        forex_analyzer._bar_store = BarStore(tempfile.mkdtemp())
+
+        for state in ['cold', 'warm']:
+            backend.calls.clear()
+            elapsed = _burst(forex_analyzer, symbol, arguments.users)
+
+            print(f"{name:>22} ({state}): {backend.calls['copy_rates_from']:>3} terminal calls for {arguments.users} users, {elapsed * 1000:.0f} ms")
+
+        print(f"{'':>22} stats: {forex_analyzer.get_fetch_flight_stats() if isinstance(flight, SingleFlight) else '-'}")
+
+if __name__ == '__main__':
+    main()
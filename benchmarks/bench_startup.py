@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Run in a fresh interpreter, so the imports and the first requests are cold
+_CHILD = """
+import json, time
+
+started_at = time.perf_counter()
+import app
+imported_at = time.perf_counter()
+
+client = app.server.test_client()
+
+def _get(path):
+    started_at = time.perf_counter()
+    response = client.get(path)
+    return time.perf_counter() - started_at, len(response.data)
+
+index_time, _ = _get('/')
+layout_time, layout_bytes = _get('/_dash-layout')
+repeated_times = [_get('/_dash-layout')[0] for _ in range({repeats})]
+
+print(json.dumps({{
+    'import': imported_at - started_at,
+    'index': index_time,
+    'layout': layout_time,
+    'repeated_layout': repeated_times,
+    'layout_bytes': layout_bytes
+}}))
+"""
+
+def _with_symbols(replay_dir, symbol_count):
+    """A copy of the recorded bars, listing that many more symbols (a terminal lists hundreds)"""
+
+    directory = tempfile.mkdtemp()
+
+    for file_name in os.listdir(replay_dir):
+        shutil.copy(os.path.join(replay_dir, file_name), directory)
+
+    with open(os.path.join(directory, 'symbols.csv'), 'w') as symbols_file:
+        symbols_file.write('name\n' + ''.join(f"SYM{index:04d}\n" for index in range(symbol_count)))
+
+    return directory
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Import time and time to first byte of the dashboard, served from recorded bars")
+    parser.add_argument('--replay-dir', required=True, help="the folder of recorded bars (see ReplayDataProvider)")
+    parser.add_argument('--latency', type=float, default=0.2, help="the seconds each simulated terminal call takes")
+    parser.add_argument('--symbols', type=int, default=500, help="the symbols listed on top of the recorded ones")
+    parser.add_argument('--runs', type=int, default=3, help="the fresh interpreters started")
+    parser.add_argument('--repeats', type=int, default=20, help="the page loads after the first one, per run")
+    arguments = parser.parse_args()
+
+    replay_dir = _with_symbols(arguments.replay_dir, arguments.symbols)
+    environment = dict(os.environ, MT5_REPLAY_DIR=replay_dir, MT5_REPLAY_LATENCY=str(arguments.latency))
+    runs = []
+
+    for _ in range(arguments.runs):
+        output = subprocess.run(
+            [sys.executable, '-W', 'ignore', '-c', _CHILD.format(repeats=arguments.repeats)],
+            env=environment, capture_output=True, text=True, check=True
+        ).stdout
+
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    def _median(field):
+        return statistics.median(run[field] for run in runs) * 1000
+
+    shutil.rmtree(replay_dir)
+
+    print(f"{arguments.latency * 1000:.0f} ms per terminal call, median of {arguments.runs} fresh processes")
+    print(f"  import app:                  {_median('import'):8.1f} ms")
+    print(f"  first GET /:                 {_median('index'):8.1f} ms")
+    print(f"  first GET /_dash-layout:     {_median('layout'):8.1f} ms")
+    print(f"  later GET /_dash-layout:     {statistics.median(time for run in runs for time in run['repeated_layout']) * 1000:8.1f} ms")
+    print(f"  layout size:                 {runs[0]['layout_bytes']:8d} bytes")
+
+if __name__ == '__main__':
+    main()
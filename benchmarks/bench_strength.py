@@ -0,0 +1,40 @@
+from benchmarks.fake_mt5 import install_fake_mt5
+from src.StrengthEngine import MAJOR_CURRENCIES
+
+import itertools
+import os
+import tempfile
+import time
+
+LATENCY = 0.01
+
+CROSSES = [f"{base}{quote}" for base, quote in itertools.combinations(MAJOR_CURRENCIES, 2)]
+
+# A broker lists metals, indices and suffixed duplicates along with the crosses
+SYMBOLS = CROSSES + [f"{cross}.m" for cross in CROSSES[:5]] + ['XAUUSD', 'XAGUSD', 'US500', 'BTCUSD']
+
+install_fake_mt5(SYMBOLS, latency=LATENCY)
+os.environ['MT5_BAR_STORE_DIR'] = tempfile.mkdtemp()
+
+from benchmarks.counting import CountingProvider
+from src.DataProvider import MT5DataProvider
+from src.ForexAnalyzer import ForexAnalyzer
+
+def main():
+
+    data_provider = CountingProvider(MT5DataProvider())
+    forex_analyzer = ForexAnalyzer.get_instance(data_provider)
+
+    for state in ['first', 'repeated']:
+        data_provider.calls.clear()
+
+        started_at = time.perf_counter()
+        strength_df = forex_analyzer.get_currency_strength()
+        elapsed = time.perf_counter() - started_at
+
+        print(f"{state:>9}: {elapsed * 1000:.0f} ms, terminal calls: {dict(data_provider.calls)}")
+
+    print(strength_df)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+from benchmarks.synthetic import generate_rates
+from src.SupportResistance import SupportResistance, PIVOT_ORDER
+
+import argparse
+import time
+
+import numpy as np
+
+def _loop_pivots(highs, lows, order):
+    """Pivots found bar by bar, with a max and min over each window"""
+
+    pivots = []
+
+    for position in range(order, len(highs) - order):
+        if highs[position] == max(highs[position - order:position + order + 1]):
+            pivots.append(highs[position])
+
+        if lows[position] == min(lows[position - order:position + order + 1]):
+            pivots.append(lows[position])
+
+    return pivots
+
+def _refresh(support_resistance, windows):
+    """Zones of each window in turn, as the 4H graph is refreshed while bars close"""
+
+    started_at = time.perf_counter()
+
+    for rates_df in windows:
+        zones_df = support_resistance.update('EURUSD', '4H', rates_df)
+
+    return (time.perf_counter() - started_at) / len(windows), zones_df
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Support and resistance zones of a sliding window, scanned in full or incrementally")
+    parser.add_argument('--bars', type=int, default=600, help="the bars of each window")
+    parser.add_argument('--refreshes', type=int, default=500, help="the refreshes simulated, one new bar each")
+    arguments = parser.parse_args()
+
+    rates_df = generate_rates(arguments.bars + arguments.refreshes, '4H', seed=3)
+    windows = [
+        rates_df.iloc[end - arguments.bars:end].reset_index(drop=True)
+        for end in range(arguments.bars, arguments.bars + arguments.refreshes)
+    ]
+
+    full_timings = []
+    full_scanner = None
+
+    for rates_window in windows:
+        # A new engine each time has no pivots kept, so it scans the whole window
+        full_scanner = SupportResistance()
+
+        started_at = time.perf_counter()
+        full_scanner.update('EURUSD', '4H', rates_window)
+        full_timings.append(time.perf_counter() - started_at)
+
+    incremental_scanner = SupportResistance()
+    incremental_time, zones_df = _refresh(incremental_scanner, windows)
+
+    highs = windows[-1]['high'].tolist()
+    lows = windows[-1]['low'].tolist()
+
+    started_at = time.perf_counter()
+    loop_pivots = _loop_pivots(highs, lows, PIVOT_ORDER)
+    print(f"{'loop pivots':>12}: {(time.perf_counter() - started_at) * 1000:.3f} ms per window ({len(loop_pivots)} pivots, zones not included)")
+
+    print(f"{'full scan':>12}: {np.mean(full_timings) * 1000:.3f} ms per refresh")
+    print(f"{'incremental':>12}: {incremental_time * 1000:.3f} ms per refresh")
+
+    print(zones_df)
+
+if __name__ == '__main__':
+    main()
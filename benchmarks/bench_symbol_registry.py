@@ -0,0 +1,44 @@
+from benchmarks.counting import CountingProvider
+from src.ReplayDataProvider import ReplayDataProvider
+from src.SymbolRegistry import SymbolRegistry
+
+import argparse
+import time
+
+def _lookup_direct(data_provider, symbol):
+    """The digits and multiplier as previously looked up: one symbol_info call each"""
+
+    digits = data_provider.symbol_info(symbol).digits
+
+    return digits, 10 ** -data_provider.symbol_info(symbol).digits
+
+def _lookup_registry(symbol_registry, symbol):
+    symbol_meta = symbol_registry.get(symbol)
+
+    return symbol_meta.digits, symbol_meta.multiplier
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Symbol metadata lookups, with and without the registry")
+    parser.add_argument('--replay-dir', required=True, help="the folder of recorded bars (see ReplayDataProvider)")
+    parser.add_argument('--latency', type=float, default=0.005, help="the seconds each simulated terminal call takes")
+    parser.add_argument('--lookups', type=int, default=200, help="the symbol changes simulated")
+    arguments = parser.parse_args()
+
+    data_provider = CountingProvider(ReplayDataProvider(arguments.replay_dir, latency=arguments.latency))
+    symbols = [symbol.name for symbol in ReplayDataProvider(arguments.replay_dir).symbols_get()]
+    symbol_registry = SymbolRegistry(data_provider)
+
+    for name, lookup in [('symbol_info per lookup', lambda symbol: _lookup_direct(data_provider, symbol)), ('registry', lambda symbol: _lookup_registry(symbol_registry, symbol))]:
+        data_provider.calls.clear()
+
+        started_at = time.perf_counter()
+        results = [lookup(symbols[index % len(symbols)]) for index in range(arguments.lookups)]
+        elapsed = time.perf_counter() - started_at
+
+        print(f"{name:>24}: {elapsed * 1000:8.1f} ms for {arguments.lookups} lookups, terminal calls: {dict(data_provider.calls)}")
+
+    assert [_lookup_direct(data_provider, symbol) for symbol in symbols] == [_lookup_registry(symbol_registry, symbol) for symbol in symbols]
+
+if __name__ == '__main__':
+    main()
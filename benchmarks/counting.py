@@ -0,0 +1,21 @@
+import collections
+import threading
+
+class CountingProvider:
+    """Wrap a data provider, counting the calls made to each of its methods"""
+
+    def __init__(self, data_provider):
+        self._data_provider = data_provider
+        self._lock = threading.Lock()
+        self.calls = collections.Counter()
+
+    def __getattr__(self, method):
+        function = getattr(self._data_provider, method)
+
+        def _counted(*args):
+            with self._lock:
+                self.calls[method] += 1
+
+            return function(*args)
+
+        return _counted
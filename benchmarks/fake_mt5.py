@@ -0,0 +1,156 @@
+from collections import namedtuple
+from benchmarks.synthetic import generate_rates, generate_ticks, TIMEFRAME_SECONDS
+
+import numpy as np
+
+import sys
+import time
+import types
+import zlib
+
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8')
+])
+
+TIMEFRAMES = {
+    16385: '1H',
+    16388: '4H',
+    32769: '1W'
+}
+
+SymbolInfo = namedtuple('SymbolInfo', [
+    'name',
+    'digits',
+    'point',
+    'trade_contract_size',
+    'currency_base',
+    'currency_profit',
+    'currency_margin'
+])
+
+SymbolTick = namedtuple('SymbolTick', ['time', 'bid', 'ask', 'last', 'volume', 'time_msc'])
+
+# Leverage of the simulated account, for the margins
+LEVERAGE = 100
+
+# Ticks generated per symbol, served in turn (and again from the first one once all are served),
+# following the bars of this timeframe (1H)
+TICK_COUNT = 10000
+TICK_TIMEFRAME = 16385
+
+def _seed(*key):
+    # Unlike hash(), the same in every run (str hashes are salted per process)
+    return zlib.crc32('/'.join(map(str, key)).encode())
+
+def _symbol_info(symbol):
+    digits = 3 if 'JPY' in symbol else 5
+
+    return SymbolInfo(symbol, digits, 10 ** -digits, 100000.0, symbol[:3], symbol[3:6], symbol[:3])
+
+def install_fake_mt5(symbols, bar_count=2000, latency=0.0):
+    """Install a fake MetaTrader5 module, serving synthetic bars and ticks with a simulated latency
+
+    Every symbol gets its own random walks, the same in every run. The ticks start from the
+    latest close of the 1H bars, and each symbol_info_tick call serves the next one.
+
+    Parameters:
+        - symbols(list): the symbols served
+        - bar_count(int): the number of bars generated per symbol and timeframe
+        - latency(float): the seconds each terminal call takes
+
+    Returns:
+        - module: the fake MetaTrader5 module
+
+    """
+
+    rates_cache = {}
+
+    def _rates(symbol, timeframe):
+        key = (symbol, timeframe)
+
+        if key not in rates_cache:
+            rates_df = generate_rates(bar_count, TIMEFRAMES[timeframe], seed=_seed(*key))
+
+            rates = np.zeros(bar_count, dtype=RATES_DTYPE)
+            rates['time'] = rates_df['time'].to_numpy().astype('datetime64[s]').astype(np.int64)
+
+            for column in RATES_DTYPE.names[1:]:
+                rates[column] = rates_df[column].to_numpy()
+
+            rates_cache[key] = rates
+
+        return rates_cache[key]
+
+    def copy_rates_from(symbol, timeframe, date_from, count):
+        time.sleep(latency)
+
+        if symbol not in symbols:
+            return None
+
+        rates = _rates(symbol, timeframe)
+
+        # The synthetic history ends in the past, so always serve its latest bars
+        return rates[-count:].copy()
+
+    ticks_cache = {}
+
+    def symbol_info_tick(symbol):
+        time.sleep(latency)
+
+        if symbol not in symbols:
+            return None
+
+        if symbol not in ticks_cache:
+            digits = _symbol_info(symbol).digits
+            ticks_df = generate_ticks(TICK_COUNT, seed=_seed(symbol, 'ticks'), price=_rates(symbol, TICK_TIMEFRAME)['close'][-1], point=10 ** -digits)
+
+            # The ticks follow the latest bar
+            ticks_df['time_msc'] += (_rates(symbol, TICK_TIMEFRAME)['time'][-1] + TIMEFRAME_SECONDS['1H']) * 1000 - ticks_df['time_msc'].iat[0]
+            ticks_df['time'] = ticks_df['time_msc'] // 1000
+
+            ticks_cache[symbol] = [ticks_df.to_records(index=False), 0]
+
+        ticks, position = ticks_cache[symbol]
+        ticks_cache[symbol][1] = (position + 1) % ticks.shape[0]
+
+        return SymbolTick(*(ticks[position][field].item() for field in SymbolTick._fields))
+
+    def order_calc_margin(action, symbol, volume, price):
+        time.sleep(latency)
+
+        return volume * _symbol_info(symbol).trade_contract_size * price / LEVERAGE if symbol in symbols else None
+
+    def order_calc_profit(action, symbol, volume, price_open, price_close):
+        time.sleep(latency)
+
+        direction = 1 if action == 0 else -1
+
+        return direction * volume * _symbol_info(symbol).trade_contract_size * (price_close - price_open) if symbol in symbols else None
+
+    fake_mt5 = types.ModuleType('MetaTrader5')
+
+    fake_mt5.TIMEFRAME_H1 = 16385
+    fake_mt5.TIMEFRAME_H4 = 16388
+    fake_mt5.TIMEFRAME_W1 = 32769
+    fake_mt5.ORDER_TYPE_BUY = 0
+    fake_mt5.ORDER_TYPE_SELL = 1
+
+    fake_mt5.initialize = lambda: True
+    fake_mt5.last_error = lambda: (1, 'Success')
+    fake_mt5.copy_rates_from = copy_rates_from
+    fake_mt5.symbols_get = lambda: [_symbol_info(symbol) for symbol in symbols]
+    fake_mt5.symbol_info = _symbol_info
+    fake_mt5.symbol_info_tick = symbol_info_tick
+    fake_mt5.order_calc_margin = order_calc_margin
+    fake_mt5.order_calc_profit = order_calc_profit
+
+    sys.modules['MetaTrader5'] = fake_mt5
+
+    return fake_mt5
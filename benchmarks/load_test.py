@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import make_server
+
+import numpy as np
+
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.request
+
+GRAPH_OUTPUTS = [
+    ('candlestick-4H-fig', 'figure'),
+    ('rsi-4H-fig', 'figure'),
+    ('point-counts-1H', 'figure'),
+    ('atr-graph-1H', 'figure'),
+    ('volume-graph-1H', 'figure'),
+    ('live-origin', 'data')
+]
+
+def _graphs_request(symbol, width):
+    """The body of the update_all_graphs callback request, as sent by the browser on a symbol change"""
+
+    inputs = [
+        ('current-currency', 'data', symbol),
+        ('refresh-stats', 'n_clicks', None),
+        ('candlestick-4H-fig', 'relayoutData', None),
+        ('rsi-4H-fig', 'relayoutData', None),
+        ('atr-graph-1H', 'relayoutData', None)
+    ]
+
+    return {
+        'output': '..' + '...'.join(f"{component}.{prop}" for component, prop in GRAPH_OUTPUTS) + '..',
+        'outputs': [{'id': component, 'property': prop} for component, prop in GRAPH_OUTPUTS],
+        'inputs': [{'id': component, 'property': prop, 'value': value} for component, prop, value in inputs],
+        'state': [{'id': 'viewport-width', 'property': 'data', 'value': width}],
+        'changedPropIds': ['current-currency.data']
+    }
+
+def _post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers={'Content-Type': 'application/json'})
+
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return json.loads(response.read())
+
+def _run_user(url, symbols, user, request_count):
+    """Switch between the symbols, checking that each response shows the symbol requested
+
+    Returns:
+        - list: the latency of each request
+        - int: the number of responses showing another symbol
+
+    """
+
+    latencies = []
+    mismatches = 0
+
+    for request_number in range(request_count):
+        symbol = symbols[(user + request_number) % len(symbols)]
+
+        # Different widths per user and request, so the figure cache doesn't answer everything
+        width = 800 + 10 * ((user * request_count + request_number) % 80)
+
+        started_at = time.perf_counter()
+        response = _post(url, _graphs_request(symbol, width))
+        latencies.append(time.perf_counter() - started_at)
+
+        title = response['response']['candlestick-4H-fig']['figure']['layout']['title']['text']
+
+        if not title.startswith(f"{symbol} "):
+            mismatches += 1
+
+    return latencies, mismatches
+
+def _load(server_app, threaded, symbols, users, request_count, port):
+
+    server = make_server('127.0.0.1', port, server_app, threaded=threaded)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    url = f"http://127.0.0.1:{port}/_dash-update-component"
+
+    try:
+        started_at = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=users) as executor:
+            results = list(executor.map(lambda user: _run_user(url, symbols, user, request_count), range(users)))
+
+        elapsed = time.perf_counter() - started_at
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    latencies = np.concatenate([user_latencies for user_latencies, _ in results])
+    mismatches = sum(user_mismatches for _, user_mismatches in results)
+
+    print(
+        f"{'threaded' if threaded else 'single-threaded'} server: {latencies.shape[0] / elapsed:.1f} requests/s, "
+        f"p50 {np.percentile(latencies, 50) * 1000:.0f} ms, p95 {np.percentile(latencies, 95) * 1000:.0f} ms, "
+        f"{mismatches} response(s) showing another symbol"
+    )
+
+    return None
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Concurrent users switching symbols on the dashboard, served from recorded bars")
+    parser.add_argument('--replay-dir', required=True, help="the folder of recorded bars (see ReplayDataProvider)")
+    parser.add_argument('--latency', type=float, default=0.02, help="the seconds each simulated terminal call takes")
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=10, help="the requests sent by each user")
+    parser.add_argument('--port', type=int, default=8157)
+    arguments = parser.parse_args()
+
+    os.environ['MT5_REPLAY_DIR'] = arguments.replay_dir
+    os.environ['MT5_REPLAY_LATENCY'] = str(arguments.latency)
+
+    # Imported once the environment selects the replay backend
+    import app
+
+    symbols = sorted({file_name.split('_')[0] for file_name in os.listdir(arguments.replay_dir) if '_' in file_name})
+
+    # One port per server, as the first one may linger in TIME_WAIT
+    for offset, threaded in enumerate([False, True]):
+        _load(app.server, threaded, symbols, arguments.users, arguments.requests, arguments.port + offset)
+
+if __name__ == '__main__':
+    main()
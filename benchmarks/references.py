@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+# Plain numpy/pandas versions of the talib and tapy indicators the engines replaced, to check
+# them against without installing either library
+
+def talib_rsi(closes, period=14):
+    """talib.RSI: Wilder's smoothing, seeded with the plain averages of the first period"""
+
+    changes = np.diff(np.asarray(closes, dtype=np.float64))
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+
+    rsi = np.full(changes.shape[0] + 1, np.nan)
+    average_gain = gains[:period].mean()
+    average_loss = losses[:period].mean()
+
+    for position in range(period, changes.shape[0] + 1):
+        if position > period:
+            average_gain = (average_gain * (period - 1) + gains[position - 1]) / period
+            average_loss = (average_loss * (period - 1) + losses[position - 1]) / period
+
+        total = average_gain + average_loss
+        rsi[position] = 100 * average_gain / total if total else 0.0
+
+    return rsi
+
+def tapy_atr(rates_df, period=50):
+    """tapy's Indicators.atr: the simple moving average of max(high - low, previous close - high, previous close - low)"""
+
+    previous_close = rates_df['close'].shift(1)
+    true_ranges = pd.concat([
+        rates_df['high'] - rates_df['low'],
+        previous_close - rates_df['high'],
+        previous_close - rates_df['low']
+    ], axis=1).max(axis=1)
+
+    return true_ranges.rolling(window=period).mean().to_numpy()
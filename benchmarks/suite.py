@@ -0,0 +1,297 @@
+from benchmarks.fake_mt5 import install_fake_mt5
+from benchmarks.synthetic import generate_rates
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+MAJOR_CURRENCIES = ['USD', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD', 'NZD']
+
+# The update_all_graphs callback draws this width, unless it is changed to skip the figure cache
+DEFAULT_WIDTH = 1400
+
+def _universe(symbol_count):
+    """The crosses of the majors first (for the currency strength), then made up symbols"""
+
+    crosses = [f"{base}{quote}" for base, quote in itertools.combinations(MAJOR_CURRENCIES, 2)]
+    made_up = [f"SYM{index:04d}" for index in range(max(symbol_count - len(crosses), 0))]
+
+    return (crosses + made_up)[:symbol_count]
+
+def _measure(function, repeats, setup=None):
+    """Time a function, each repeat after its own (untimed) setup
+
+    Returns:
+        - dict: the median, fastest and slowest seconds, and the repeats
+
+    """
+
+    timings = []
+
+    for _ in range(repeats):
+        arguments = setup() if setup else ()
+
+        started_at = time.perf_counter()
+        function(*arguments)
+        timings.append(time.perf_counter() - started_at)
+
+    return {
+        'median': statistics.median(timings),
+        'min': min(timings),
+        'max': max(timings),
+        'repeats': repeats
+    }
+
+def _git_commit():
+
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _bar_stages(bar_count, repeats):
+    """Time the stages working on the bars of one symbol, on bar_count bars
+
+    Returns:
+        - dict: the timings of each stage
+
+    """
+
+    import pandas
+
+    from src.Graphs import Graphs
+    from src.HeikenAshi import HeikenAshi
+    from src.IndicatorEngine import IndicatorEngine
+    from src.SupportResistance import SupportResistance
+
+    # One more bar than requested: the refresh stages step from the first bar_count to the last ones
+    rates_1H = generate_rates(bar_count + 1, '1H', seed=1)
+    rates_4H = generate_rates(bar_count + 1, '4H', seed=4)
+
+    previous_4H = rates_4H.iloc[:-1].reset_index(drop=True)
+    rates_4H = rates_4H.iloc[1:].reset_index(drop=True)
+    rates_1H = rates_1H.iloc[1:].reset_index(drop=True)
+
+    times = rates_4H['time'].to_numpy()
+    highs, lows, closes = (rates_4H[column].to_numpy() for column in ['high', 'low', 'close'])
+
+    trend_4H = rates_4H.rename(columns={'close': 'Close', 'high': 'High', 'low': 'Low', 'open': 'Open'})
+    trend_4H['atr'] = IndicatorEngine().atr('EURUSD', '4H', times, highs, lows, closes)
+
+    trend_1H = rates_1H.rename(columns={'close': 'Close', 'high': 'High', 'low': 'Low', 'open': 'Open'})
+    trend_1H['atr'] = IndicatorEngine().atr('EURUSD', '1H', rates_1H['time'].to_numpy(), rates_1H['high'].to_numpy(), rates_1H['low'].to_numpy(), rates_1H['close'].to_numpy())
+
+    rsi_4H = {'time': rates_4H['time'], 'value': pandas.Series(IndicatorEngine().rsi('EURUSD', '4H', times, closes), index=rates_4H.index)}
+    zones = SupportResistance().update('EURUSD', '4H', rates_4H)
+    today_1H = Graphs().slice_today(rates_1H)
+
+    def _rsi_refresh_setup():
+        engine = IndicatorEngine()
+        engine.rsi('EURUSD', '4H', previous_4H['time'].to_numpy(), previous_4H['close'].to_numpy())
+        return (engine,)
+
+    def _zones_refresh_setup():
+        engine = SupportResistance()
+        engine.update('EURUSD', '4H', previous_4H)
+        return (engine,)
+
+    # Each stage gets a new Graphs, so neither the figure nor the rangebreaks cache answers
+    stages = {
+        'HeikenAshi.build': (lambda: HeikenAshi().build(rates_4H), None),
+        'HeikenAshi.update (one new bar)': (lambda ha_df: HeikenAshi().update(ha_df, rates_4H), lambda: (HeikenAshi().build(previous_4H),)),
+        'IndicatorEngine.rsi': (lambda: IndicatorEngine().rsi('EURUSD', '4H', times, closes), None),
+        'IndicatorEngine.rsi (one new bar)': (lambda engine: engine.rsi('EURUSD', '4H', times, closes), _rsi_refresh_setup),
+        'IndicatorEngine.atr': (lambda: IndicatorEngine().atr('EURUSD', '4H', times, highs, lows, closes), None),
+        'SupportResistance.update': (lambda: SupportResistance().update('EURUSD', '4H', rates_4H), None),
+        'SupportResistance.update (one new bar)': (lambda engine: engine.update('EURUSD', '4H', rates_4H), _zones_refresh_setup),
+        'Graphs._filter_missing_dates': (lambda graphs: graphs._filter_missing_dates(rates_1H, '1H'), lambda: (Graphs(),)),
+        'Graphs._find_rangebreaks': (lambda graphs: graphs._find_rangebreaks(rates_1H, '1H', 'EURUSD'), lambda: (Graphs(),)),
+        'Graphs.plot_candlesticks_fullday': (lambda graphs: graphs.plot_candlesticks_fullday(rates_4H, '4H', trend_4H, 'EURUSD', DEFAULT_WIDTH, zones=zones), lambda: (Graphs(),)),
+        'Graphs.plot_rsi_figure': (lambda graphs: graphs.plot_rsi_figure(rsi_4H, 'EURUSD', DEFAULT_WIDTH), lambda: (Graphs(),)),
+        'Graphs.plot_atr': (lambda graphs: graphs.plot_atr(trend_1H, rates_1H, '1H', 'EURUSD', 5, DEFAULT_WIDTH), lambda: (Graphs(),)),
+        'Graphs.plot_pip_range_counts': (lambda graphs: graphs.plot_pip_range_counts(today_1H, 0.00001), lambda: (Graphs(),)),
+        'Graphs.plot_volume_graph': (lambda graphs: graphs.plot_volume_graph(today_1H), lambda: (Graphs(),)),
+        'Graphs.plot_candlesticks_fullday (figure cache hit)': (lambda graphs: graphs.plot_candlesticks_fullday(rates_4H, '4H', trend_4H, 'EURUSD', DEFAULT_WIDTH, zones=zones), None)
+    }
+
+    results = {}
+    cached_graphs = Graphs()
+    cached_graphs.plot_candlesticks_fullday(rates_4H, '4H', trend_4H, 'EURUSD', DEFAULT_WIDTH, zones=zones)
+
+    for stage, (function, setup) in stages.items():
+        if stage.endswith('(figure cache hit)'):
+            results[stage] = _measure(lambda: function(cached_graphs), repeats)
+        else:
+            results[stage] = _measure(function, repeats, setup)
+
+    return results
+
+def _universe_stages(forex_analyzer, symbols, repeats):
+    """Time the stages working on every symbol at once
+
+    Returns:
+        - dict: the timings of each stage
+
+    """
+
+    stages = {
+        'ForexAnalyzer.fetch_symbols_data (4H, 180 bars)': lambda: forex_analyzer.fetch_symbols_data('4H', 180, symbols),
+        'ForexAnalyzer.get_currency_correlations (4H)': lambda: forex_analyzer.get_currency_correlations(symbols, '4H'),
+        'ForexAnalyzer.get_currency_strength': forex_analyzer.get_currency_strength,
+        'ForexAnalyzer.scan_divergences': lambda: forex_analyzer.scan_divergences(symbols),
+        'ForexAnalyzer.calculate_risk (3 lot sizes)': lambda: forex_analyzer.calculate_risk(symbols, [0.01, 0.1, 1.0], 10000, 8000, 200, 500, 5)
+    }
+
+    # The first call fills the bar cache, and is timed apart
+    results = {}
+
+    for stage, function in stages.items():
+        results[f"{stage} (first call)"] = _measure(function, 1)
+        results[stage] = _measure(function, repeats)
+
+    return results
+
+def _callback_stages(symbols, repeats):
+    """Time the update_all_graphs callback end to end, through the Flask test client
+
+    Returns:
+        - dict: the timings of a symbol change (first request of the symbol), a refresh at another
+          width (cached bars, new figures) and a refresh answered by the figure cache
+
+    """
+
+    from benchmarks.load_test import _graphs_request
+
+    import app
+
+    client = app.app.server.test_client()
+
+    def _post(symbol, width):
+        response = client.post('/_dash-update-component', json=_graphs_request(symbol, width))
+
+        if response.status_code != 200:
+            raise RuntimeError(f"update_all_graphs failed for {symbol}: HTTP {response.status_code}")
+
+        return response
+
+    # The first symbol is drawn before timing (it imports and connects): the others are new
+    new_symbols = iter(symbols[1:] or symbols)
+    widths = itertools.count(DEFAULT_WIDTH + 1)
+
+    _post(symbols[0], DEFAULT_WIDTH)
+
+    return {
+        'update_all_graphs (symbol change)': _measure(lambda symbol: _post(symbol, DEFAULT_WIDTH), max(min(repeats, len(symbols) - 1), 1), lambda: (next(new_symbols),)),
+        'update_all_graphs (refresh, new width)': _measure(lambda width: _post(symbols[0], width), repeats, lambda: (next(widths),)),
+        'update_all_graphs (refresh, figure cache hit)': _measure(lambda: _post(symbols[0], DEFAULT_WIDTH), repeats)
+    }
+
+def _compare(results, baseline, tolerance):
+    """Print the median of every stage against the baseline run
+
+    Returns:
+        - int: the number of stages slower than the tolerance allows
+
+    """
+
+    baseline_medians = {(entry['stage'], entry['bars'], entry['symbols']): entry['median'] for entry in baseline['results']}
+    regressions = 0
+
+    print(f"\nAgainst {baseline['meta'].get('commit') or 'the baseline'} (regression above x{tolerance}):")
+
+    for entry in results:
+        previous = baseline_medians.get((entry['stage'], entry['bars'], entry['symbols']))
+
+        if not previous:
+            continue
+
+        ratio = entry['median'] / previous
+        flag = 'REGRESSION' if ratio > tolerance else ''
+        regressions += bool(flag)
+
+        print(f"{entry['stage']:>64} {entry['bars'] or '':>9} {entry['symbols'] or '':>5} "
+              f"{previous * 1000:10.3f} ms -> {entry['median'] * 1000:10.3f} ms  x{ratio:5.2f} {flag}")
+
+    return regressions
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Time every stage of the dashboard on synthetic market data, into a JSON file")
+    parser.add_argument('--bars', type=int, nargs='+', default=[600, 6000, 60000], help="the bar counts of the single symbol stages")
+    parser.add_argument('--symbols', type=int, default=50, help="the symbols of the universe stages (the 28 crosses of the majors first)")
+    parser.add_argument('--history', type=int, default=2000, help="the bars the fake terminal holds per symbol and timeframe")
+    parser.add_argument('--latency', type=float, default=0.0, help="the seconds each fake terminal call takes")
+    parser.add_argument('--repeats', type=int, default=5, help="the timed runs of each stage (the median is reported)")
+    parser.add_argument('--output', default='benchmark_results.json', help="the JSON file the results are written to")
+    parser.add_argument('--compare', help="a previous results file, to compare the medians against")
+    parser.add_argument('--tolerance', type=float, default=1.25, help="the slowdown (median ratio) counted as a regression")
+    arguments = parser.parse_args()
+
+    # Plotly 4 warns on every figure with recent pandas versions, which would bury the results
+    warnings.filterwarnings('ignore', category=FutureWarning)
+
+    symbols = _universe(arguments.symbols)
+
+    # Before any import of src: the terminal is the fake one, and the bar store a new folder
+    install_fake_mt5(symbols, bar_count=arguments.history, latency=arguments.latency)
+    os.environ['MT5_BAR_STORE_DIR'] = tempfile.mkdtemp()
+    os.environ.pop('FOREX_DATA_BROKER', None)
+    os.environ.pop('MT5_REPLAY_DIR', None)
+
+    import numpy
+    import pandas
+    import plotly
+
+    from src.ForexAnalyzer import ForexAnalyzer
+
+    results = []
+
+    def _record(timings, bars=None, symbol_count=None):
+        for stage, timing in timings.items():
+            results.append(dict(stage=stage, bars=bars, symbols=symbol_count, **timing))
+            print(f"{stage:>64} {bars or '':>9} {symbol_count or '':>5} {timing['median'] * 1000:10.3f} ms")
+
+    for bar_count in arguments.bars:
+        _record(_bar_stages(bar_count, arguments.repeats), bars=bar_count)
+
+    forex_analyzer = ForexAnalyzer.get_instance()
+
+    _record(_universe_stages(forex_analyzer, symbols, arguments.repeats), symbol_count=len(symbols))
+    _record(_callback_stages(symbols, arguments.repeats), symbol_count=len(symbols))
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'arguments': {key: value for key, value in vars(arguments).items() if key not in ['output', 'compare', 'tolerance']},
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'versions': {'numpy': numpy.__version__, 'pandas': pandas.__version__, 'plotly': plotly.__version__}
+        },
+        'results': results
+    }
+
+    with open(arguments.output, 'w') as output_file:
+        json.dump(report, output_file, indent=1)
+
+    print(f"\nWritten to {arguments.output}")
+
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            regressions = _compare(results, json.load(baseline_file), arguments.tolerance)
+
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
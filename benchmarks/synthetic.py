@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+TIMEFRAME_SECONDS = {
+    '1H': 60 * 60,
+    '4H': 4 * 60 * 60,
+    '1W': 7 * 24 * 60 * 60
+}
+
+def generate_rates(bar_count, timeframe='1H', seed=0, start='2015-01-05', price=1.1000):
+    """Generate a random walk of OHLC bars, shaped like ForexAnalyzer._fetch_data_mt5 output
+
+    Weekend bars (Saturday and Sunday) are left out, like a forex feed.
+
+    Parameters:
+        - bar_count(int): the number of bars to generate
+        - timeframe(str): the timeframe of the bars
+        - seed(int): the random seed
+        - start(str): the time of the first bar
+        - price(float): the opening price of the first bar
+
+    Returns:
+        - dataframe: the synthetic rates
+
+    """
+
+    rng = np.random.default_rng(seed)
+    step = np.timedelta64(TIMEFRAME_SECONDS[timeframe], 's')
+
+    # Over-generate the timeline, then drop the weekends
+    total = int(bar_count * 1.5) + 10
+    times = np.datetime64(start, 's') + step * np.arange(total)
+
+    if timeframe != '1W':
+        weekday = (times.astype('datetime64[D]').astype(np.int64) + 3) % 7
+        times = times[weekday < 5]
+
+    times = times[:bar_count]
+
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.001, bar_count)))
+    open_price = np.concatenate([[price], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.0008, (2, bar_count)))
+
+    return pd.DataFrame({
+        'time': pd.to_datetime(times),
+        'open': open_price,
+        'high': np.maximum(open_price, close) + spread[0],
+        'low': np.minimum(open_price, close) - spread[1],
+        'close': close,
+        'tick_volume': rng.integers(100, 5000, bar_count),
+        'spread': rng.integers(1, 20, bar_count),
+        'real_volume': np.zeros(bar_count, dtype=np.int64)
+    })
+
+def generate_ticks(tick_count, seed=0, start='2015-01-05', price=1.1000, point=0.00001, mean_interval_ms=500):
+    """Generate a random walk of bid/ask ticks, shaped like the MT5 ticks (see symbol_info_tick)
+
+    The ticks arrive at random intervals, with a random spread of a few points. Weekend ticks
+    are left out, like a forex feed.
+
+    Parameters:
+        - tick_count(int): the number of ticks to generate
+        - seed(int): the random seed
+        - start(str): the time of the first tick
+        - price(float): the bid of the first tick
+        - point(float): the price of a point, for the spread
+        - mean_interval_ms(float): the mean milliseconds between two ticks
+
+    Returns:
+        - dataframe: the synthetic ticks (time, bid, ask, last, volume and time_msc columns)
+
+    """
+
+    rng = np.random.default_rng(seed)
+
+    # Over-generate the timeline, then drop the weekends
+    total = int(tick_count * 1.5) + 10
+    start_msc = np.datetime64(start, 'ms').astype(np.int64)
+    time_msc = start_msc + np.cumsum(rng.exponential(mean_interval_ms, total)).astype(np.int64)
+
+    weekday = (time_msc // (24 * 60 * 60 * 1000) + 3) % 7
+    time_msc = time_msc[weekday < 5][:tick_count]
+    tick_count = time_msc.shape[0]
+
+    bid = price * np.exp(np.cumsum(rng.normal(0, 0.00005, tick_count)))
+
+    return pd.DataFrame({
+        'time': time_msc // 1000,
+        'bid': bid,
+        'ask': bid + rng.integers(1, 20, tick_count) * point,
+        'last': np.zeros(tick_count),
+        'volume': np.zeros(tick_count, dtype=np.int64),
+        'time_msc': time_msc
+    })
@@ -1,18 +1,24 @@
 import dash
 from dash.dependencies import Input, Output, State
 
-from currency_analysis import calculate_currency_strength
+from currency_analysis import calculate_currency_strength, search_forex_pairs
 from economics_events_scraper import ForexFactoryScraper
 
-from src.Graphs import Graphs
+from src.Graphs import Graphs, LIVE_TIME_FORMAT
 from src.ForexAnalyzer import ForexAnalyzer
+from src.TickPoller import TickPoller
 
 import math
 
+# Symbols listed in the dropdown at once, among those matching the search
+SYMBOL_SEARCH_MAX_OPTIONS = 50
+
 def register_callbacks(app):
     
-    forex_analyzer = ForexAnalyzer.get_instance()
+    # Nothing here talks to the terminal: ForexAnalyzer connects on the first callback needing it
+    economic_calendar = ForexFactoryScraper('this')
     graph_generator = Graphs()
+    tick_poller = TickPoller()
 
     settlement_conversion = {
         'GBP': 1.40,
@@ -31,7 +37,7 @@ def register_callbacks(app):
         ]
     )
     def update_new_forex(changed_currency):
-        """Callback for updating the symbol attribute
+        """Callback for updating the symbol of the session
 
         Parameters:
            - changed_currency(str): the underlying symbol
@@ -41,12 +47,42 @@ def register_callbacks(app):
         
         """
 
-        digits = forex_analyzer.get_digits(changed_currency)
+        return [changed_currency]
+
+    @app.callback(
+        [
+            Output("currency-dropdown", "options"),
+            Output("currency-dropdown", "value")
+        ],
+        [
+            Input("currency-dropdown", "search_value")
+        ],
+        [
+            State("currency-dropdown", "value")
+        ]
+    )
+    def search_symbols(search_value, current_value):
+        """Callback serving the symbols matching the search, picking the first symbol on page load
+
+        Parameters:
+           - search_value(str): the text typed in the dropdown
+           - current_value(str): the symbol selected
+        
+        Returns:
+            - list: the dropdown options, and its value
+        
+        """
 
-        forex_analyzer.update_symbol(changed_currency)
-        graph_generator.update_symbol(changed_currency, digits)
+        symbols = search_forex_pairs(search_value, SYMBOL_SEARCH_MAX_OPTIONS)
 
-        return [changed_currency]
+        # The selected symbol stays listed, or the dropdown would show it blank
+        if current_value is not None and current_value not in symbols:
+            symbols.append(current_value)
+
+        return [
+            [{'label': symbol, 'value': symbol} for symbol in symbols],
+            dash.no_update if current_value is not None or not symbols else symbols[0]
+        ]
 
     @app.callback(
         [
@@ -76,48 +112,255 @@ def register_callbacks(app):
                 {'display':'none'}
             ]
 
-        currency_stregnth_dict = calculate_currency_strength()
+        currency_strength_df = calculate_currency_strength()
 
         return [
-            graph_generator.display_symbol_strength(currency_stregnth_dict),
+            graph_generator.display_symbol_strength(currency_strength_df),
             {'display':'block'}
         ]
 
+    app.clientside_callback(
+        """
+        function(clicks) {
+            return window.innerWidth;
+        }
+        """,
+        Output("viewport-width", "data"),
+        Input("refresh-stats", "n_clicks")
+    )
+
+    def _get_zoomed_range(relayout_data):
+        """Get the x-axis range from the relayout data of a zoomed graph
+
+        Parameters:
+            - relayout_data(dict): the relayout data of the graph
+        
+        Returns:
+            - list: the [start, end] zoomed range, None when zoomed out, or dash.no_update for other events
+        
+        """
+
+        relayout_data = relayout_data or {}
+
+        if 'xaxis.range[0]' in relayout_data:
+            return [relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']]
+
+        if 'xaxis.range' in relayout_data:
+            return relayout_data['xaxis.range']
+
+        if relayout_data.get('xaxis.autorange'):
+            return None
+
+        return dash.no_update
+
     @app.callback(
         [
             Output("candlestick-4H-fig","figure"),
             Output("rsi-4H-fig","figure"),
             Output("point-counts-1H", "figure"),
             Output("atr-graph-1H", "figure"),
-            Output("volume-graph-1H", "figure")
+            Output("volume-graph-1H", "figure"),
+            Output("live-origin", "data")
         ],
         [
             Input("current-currency", "data"),
-            Input("refresh-stats","n_clicks")
+            Input("refresh-stats","n_clicks"),
+            Input("candlestick-4H-fig", "relayoutData"),
+            Input("rsi-4H-fig", "relayoutData"),
+            Input("atr-graph-1H", "relayoutData")
+        ],
+        [
+            State("viewport-width", "data")
         ]
     )
-    def update_all_graphs(value, clicks):
+    def update_all_graphs(value, clicks, candlestick_relayout, rsi_relayout, atr_relayout, width):
         """Callback for updating the respective graphs, of a given symbol
+        Zooming into a graph only redraws that graph, at full resolution within the zoomed range
 
         Parameters:
             - value(str): the new symbol to update at
             - clicks(int): dummy click whenever the refresh button is clicked
+            - candlestick_relayout(dict): the zoom events of the candlestick graph
+            - rsi_relayout(dict): the zoom events of the RSI graph
+            - atr_relayout(dict): the zoom events of the ATR graph
+            - width(int): the browser width, in pixels
         
         Returns:
-            - list: the list of areas to update in layout
+            - list: the list of areas to update in layout, and the forming bar drawn (for live updates)
         
         """
-        stats_1H = forex_analyzer.get_daily_stats('1H',600)
-        stats_4H = forex_analyzer.get_daily_stats('4H',600)
+
+        # No symbol until the dropdown options are served, on page load
+        if value is None:
+            raise dash.exceptions.PreventUpdate
+
+        forex_analyzer = ForexAnalyzer.get_instance()
+
+        triggered_ids = [trigger['prop_id'] for trigger in dash.callback_context.triggered]
+
+        def _redraw_candlesticks(x_range):
+            stats_4H = forex_analyzer.get_daily_stats('4H', 600, value)
+            return graph_generator.plot_candlesticks_fullday(stats_4H.rates, '4H', stats_4H.trend_indicators, value, width, x_range, stats_4H.zones)
+
+        def _redraw_rsi(x_range):
+            stats_4H = forex_analyzer.get_daily_stats('4H', 600, value)
+            return graph_generator.plot_rsi_figure(stats_4H.rsi, value, width, x_range)
+
+        def _redraw_atr(x_range):
+            stats_1H = forex_analyzer.get_daily_stats('1H', 600, value)
+            digits = forex_analyzer.get_digits(value)
+            return graph_generator.plot_atr(stats_1H.trend_indicators, stats_1H.rates, '1H', value, digits, width, x_range)
+
+        # Output position, relayout data and redraw function of the zoomable graphs
+        zoomable_graphs = {
+            'candlestick-4H-fig.relayoutData': (0, candlestick_relayout, _redraw_candlesticks),
+            'rsi-4H-fig.relayoutData': (1, rsi_relayout, _redraw_rsi),
+            'atr-graph-1H.relayoutData': (3, atr_relayout, _redraw_atr)
+        }
+
+        if all(prop_id in zoomable_graphs for prop_id in triggered_ids):
+            output_list = [dash.no_update] * 6
+
+            for prop_id in triggered_ids:
+                position, relayout_data, redraw = zoomable_graphs[prop_id]
+                x_range = _get_zoomed_range(relayout_data)
+
+                if x_range is not dash.no_update:
+                    output_list[position] = redraw(x_range)
+
+            return output_list
+
+        stats_1H = forex_analyzer.get_daily_stats('1H', 600, value)
+        stats_4H = forex_analyzer.get_daily_stats('4H', 600, value)
+        digits = forex_analyzer.get_digits(value)
+
+        # The bars of the day, shared by the points and volume figures
+        today_1H = graph_generator.slice_today(stats_1H.rates)
 
         return [
-            graph_generator.plot_candlesticks_fullday(stats_4H, '4H', forex_analyzer.get_trend_indicators('4H')),
-            graph_generator.plot_rsi_figure(forex_analyzer.get_lagging_indicator('4H', 'rsi')),
-            graph_generator.plot_pip_range_counts(stats_1H, forex_analyzer.get_multiplier()),
-            graph_generator.plot_atr(forex_analyzer.get_trend_indicators('1H'), stats_1H, '1H'),
-            graph_generator.plot_volume_graph(stats_1H)
+            graph_generator.plot_candlesticks_fullday(stats_4H.rates, '4H', stats_4H.trend_indicators, value, width, zones=stats_4H.zones),
+            graph_generator.plot_rsi_figure(stats_4H.rsi, value, width),
+            graph_generator.plot_pip_range_counts(today_1H, forex_analyzer.get_multiplier(value)),
+            graph_generator.plot_atr(stats_1H.trend_indicators, stats_1H.rates, '1H', value, digits, width),
+            graph_generator.plot_volume_graph(today_1H),
+            {
+                'symbol': value,
+                'forming_time': stats_4H.rates['time'].iloc[-1].strftime(LIVE_TIME_FORMAT),
+                'forming_time_1H': stats_1H.rates['time'].iloc[-1].strftime(LIVE_TIME_FORMAT),
+                'forming_index_1H': len(today_1H) - 1
+            }
         ]
 
+    def _closed_bar_count(bar_times, previous_forming_time):
+        """Count the bars closed since the last update: from the previously forming bar up to the current one
+
+        Parameters:
+            - bar_times(series): the formatted times of the latest bars, the last one still forming
+            - previous_forming_time(str): the formatted time of the bar forming at the last update
+
+        Returns:
+            - int: the number of closed bars
+        
+        """
+
+        return int(((bar_times >= previous_forming_time) & (bar_times < bar_times.iloc[-1])).sum())
+
+    @app.callback(
+        [
+            Output("candlestick-4H-fig", "extendData"),
+            Output("rsi-4H-fig", "extendData"),
+            Output("point-counts-1H", "extendData"),
+            Output("atr-graph-1H", "extendData"),
+            Output("volume-graph-1H", "extendData"),
+            Output("live-state", "data")
+        ],
+        [
+            Input("live-interval", "n_intervals")
+        ],
+        [
+            State("live-origin", "data"),
+            State("live-state", "data")
+        ]
+    )
+    def push_live_updates(n_intervals, live_origin, live_state):
+        """Callback pushing the latest ticks to the graphs, without redrawing them
+        The forming bar is replaced on every new tick, and appended to the closed bars once a new one starts
+
+        Parameters:
+            - n_intervals(int): dummy count of the live interval
+            - live_origin(dict): the symbol and forming bar times of the graphs last drawn
+            - live_state(dict): the origin, update versions and forming bar times last pushed
+        
+        Returns:
+            - list: the extendData updates of the graphs, and the new live state
+        
+        """
+
+        if live_origin is None:
+            raise dash.exceptions.PreventUpdate
+
+        forex_analyzer = ForexAnalyzer.get_instance()
+        symbol = live_origin['symbol']
+
+        # Pushing from where the graphs were last drawn, whenever they are redrawn
+        if live_state is None or live_state['origin'] != live_origin:
+            live_state = {
+                'origin': live_origin,
+                'version': None,
+                'forming_time': live_origin['forming_time'],
+                'version_1H': None,
+                'forming_time_1H': live_origin['forming_time_1H'],
+                'forming_index_1H': live_origin['forming_index_1H']
+            }
+
+        output_list = [dash.no_update] * 5
+        new_state = dict(live_state)
+
+        update = tick_poller.get_update(symbol, '4H')
+
+        if update is not None and live_state['version'] != update['version']:
+            bars = update['bars']
+            bar_times = bars['time'].dt.strftime(LIVE_TIME_FORMAT)
+            closed_bars = _closed_bar_count(bar_times, live_state['forming_time'])
+
+            output_list[0] = graph_generator.get_live_candlestick_update(bars, closed_bars)
+
+            rsi_values = forex_analyzer.get_live_rsi('4H', bars, symbol)
+
+            if not rsi_values.iloc[-2 - closed_bars:].isna().any():
+                output_list[1] = graph_generator.get_live_line_update(bars, rsi_values, closed_bars)
+
+            new_state.update(version=update['version'], forming_time=bar_times.iloc[-1])
+
+        update_1H = tick_poller.get_update(symbol, '1H')
+
+        if update_1H is not None and live_state['version_1H'] != update_1H['version']:
+            bars = update_1H['bars']
+            bar_times = bars['time'].dt.strftime(LIVE_TIME_FORMAT)
+            closed_bars = _closed_bar_count(bar_times, live_state['forming_time_1H'])
+            forming_index = live_state['forming_index_1H'] + closed_bars
+
+            atr_values = forex_analyzer.get_live_atr('1H', bars, symbol)
+
+            if not atr_values.iloc[-2 - closed_bars:].isna().any():
+                output_list[3] = graph_generator.get_live_line_update(bars, atr_values, closed_bars)
+
+            # The points and volume graphs only show the day they were drawn on
+            if bar_times.iloc[-1][:10] == live_origin['forming_time_1H'][:10]:
+                output_list[2], output_list[4] = graph_generator.get_live_day_updates(
+                    bars,
+                    closed_bars,
+                    forming_index,
+                    forex_analyzer.get_multiplier(symbol)
+                )
+
+            new_state.update(version_1H=update_1H['version'], forming_time_1H=bar_times.iloc[-1], forming_index_1H=forming_index)
+
+        if new_state == live_state:
+            raise dash.exceptions.PreventUpdate
+
+        return output_list + [new_state]
+
     @app.callback(
         [
             Output('currency-correlation-fig', 'figure'),
@@ -127,30 +370,74 @@ def register_callbacks(app):
             Input('show-correlation-heatmap','n_clicks')
         ],
         [
-            State('input_currencies_list','value')
+            State('input_currencies_list','value'),
+            State('correlation-timeframe','value'),
+            State('input_correlation_window','value')
         ],
         prevent_initial_call=True
     )
-    def calculate_correlation_currencies(click, currencies):
-        """Callback for finding the percentage, of a profit target
+    def calculate_correlation_currencies(click, currencies, timeframe, window):
+        """Callback for finding the correlations, between the given symbols
 
         Parameters:
             - click(int): dummy click whenever the button is clicked
-            - profit_target(int): the profit target, broken down
+            - currencies(str): the symbols, seperated by commas (all the symbols if empty)
+            - timeframe(str): the timeframe of the bars
+            - window(int): the number of latest bars of the rolling correlations (the whole period if empty)
         
         Returns:
             - list: the list of areas to update in layout
         
         """
 
-        currencies_list = currencies.split(',')
-        correlated_df = forex_analyzer.get_currency_correlations(currencies_list)
+        forex_analyzer = ForexAnalyzer.get_instance()
+
+        currencies_list = [currency.strip() for currency in (currencies or '').split(',')]
+        correlated_df = forex_analyzer.get_currency_correlations(currencies_list, timeframe, int(window) if window else None)
 
         return [
             graph_generator.plot_correlation_heatmap(correlated_df),
             {'display':'block'}
         ]
 
+    @app.callback(
+        [
+            Output("divergence-table", "data"),
+            Output("divergence-errors", "children")
+        ],
+        [
+            Input("scan-divergences", "n_clicks")
+        ],
+        [
+            State("input_divergence_symbols", "value"),
+            State("divergence-timeframes", "value")
+        ],
+        prevent_initial_call=True
+    )
+    def scan_divergences(clicks, symbols, timeframes):
+        """Callback listing the RSI divergences of the given symbols
+
+        Parameters:
+            - clicks(int): dummy click whenever the button is clicked
+            - symbols(str): the symbols, seperated by commas (all the symbols if empty)
+            - timeframes(list): the timeframes to scan
+        
+        Returns:
+            - list: the rows of the table, and the symbols that failed
+        
+        """
+
+        symbols_list = [symbol.strip() for symbol in (symbols or '').split(',') if symbol.strip()]
+
+        divergence_df, failed_symbols = ForexAnalyzer.get_instance().scan_divergences(symbols_list, timeframes or [])
+
+        divergence_df = divergence_df.round({'price_change': 3, 'rsi_change': 2, 'rsi': 2})
+
+        return [
+            divergence_df.to_dict('records'),
+            '; '.join(f"Failed ({timeframe}): {', '.join(failed)}" for timeframe, failed in failed_symbols.items())
+        ]
+
     @app.callback(
         [
             Output("download-volume-begin", "data")
@@ -162,7 +449,7 @@ def register_callbacks(app):
     )
     def get_symbol_volume_sorted(n_clicks):
 
-        symbol_list_vol = forex_analyzer.get_symbol_volume()
+        symbol_list_vol = ForexAnalyzer.get_instance().get_symbol_volume()
 
         file_text = ""
 
@@ -214,10 +501,8 @@ def register_callbacks(app):
     )
     def get_symbol_volume_sorted(n_clicks):
 
-        economic_obj = ForexFactoryScraper('this')
-        
         return [
-            dict(content=economic_obj.get_today_events(), filename="today_economic_events.txt")
+            dict(content=economic_calendar.get_today_events(), filename="today_economic_events.txt")
         ]
 
     @app.callback(
@@ -238,11 +523,68 @@ def register_callbacks(app):
     )
     def calculate_margin(clicks_count, action_type, lot_size, symbol, balance):
         
-        margin_required = forex_analyzer.calculate_margin(action_type, lot_size, symbol)
+        margin_required = ForexAnalyzer.get_instance().calculate_margin(action_type, lot_size, symbol)
 
         maximum_loss_allowed = float(balance) - (0.20 * margin_required)
 
         return [
             f"Margin required: {margin_required:.2f}",
             f"Maximum loss possible (20% stop-out): {maximum_loss_allowed:.2f}"
-        ]
\ No newline at end of file
+        ]
+
+    @app.callback(
+        [
+            Output("risk-table", "data"),
+            Output("risk-errors", "children")
+        ],
+        [
+            Input("calculate-risk", "n_clicks")
+        ],
+        [
+            State("input_risk_symbols", "value"),
+            State("input_risk_lot_sizes", "value"),
+            State("input_risk_balance", "value"),
+            State("input_risk_buffer_balance", "value"),
+            State("input_risk_stop_loss_points", "value"),
+            State("input_risk_profit_target", "value"),
+            State("input_risk_profit_trades", "value")
+        ],
+        prevent_initial_call=True,
+    )
+    def calculate_risk_table(clicks_count, symbols, lot_sizes, balance, buffer_balance, stop_loss_points, profit_target, profit_trades):
+        """Callback sizing every symbol, side and lot size of the watchlist
+
+        Parameters:
+            - clicks_count(int): dummy click whenever the button is clicked
+            - symbols(str): the symbols, seperated by commas (all the symbols if empty)
+            - lot_sizes(str): the lot sizes, seperated by commas
+            - balance(str): the account balance
+            - buffer_balance(str): the balance not to go under
+            - stop_loss_points(str): the points lost by a losing trade
+            - profit_target(str): the profit aimed for
+            - profit_trades(str): the trades to reach the profit target in
+        
+        Returns:
+            - list: the rows of the table, and the symbols that failed
+        
+        """
+
+        symbols_list = [symbol.strip() for symbol in (symbols or '').split(',') if symbol.strip()]
+        lot_sizes_list = [float(lot_size) for lot_size in (lot_sizes or '').split(',') if lot_size.strip()]
+
+        risk_df, failed_symbols = ForexAnalyzer.get_instance().calculate_risk(
+            symbols_list,
+            lot_sizes_list,
+            float(balance),
+            float(buffer_balance or 0),
+            float(stop_loss_points),
+            float(profit_target or 0),
+            int(profit_trades or 1)
+        )
+
+        risk_df = risk_df.round({'price': 5, 'margin': 2, 'stop_out_loss': 2, 'point_value': 4})
+
+        return [
+            risk_df.to_dict('records'),
+            f"Failed: {', '.join(failed_symbols)}" if failed_symbols else ''
+        ]
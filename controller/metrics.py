@@ -0,0 +1,60 @@
+import flask
+
+from src.Metrics import METRICS, METRICS_ENABLED
+
+import time
+
+CALLBACK_PATH = '/_dash-update-component'
+
+def register_metrics(app, metrics=METRICS):
+    """Time every Dash callback request, and serve the metrics on /metrics (Prometheus text format)
+
+    Parameters:
+        - app(Dash): the Dash app
+        - metrics(Metrics): the metrics of the process
+
+    Returns:
+        - None
+
+    """
+
+    server = app.server
+
+    @server.route('/metrics')
+    def serve_metrics():
+        return flask.Response(metrics.expose(), mimetype='text/plain; version=0.0.4')
+
+    if not METRICS_ENABLED:
+        return None
+
+    @server.before_request
+    def start_callback_timer():
+
+        if flask.request.path.endswith(CALLBACK_PATH):
+            flask.g.callback_started_at = time.perf_counter()
+
+        return None
+
+    @server.after_request
+    def observe_callback(response):
+
+        started_at = flask.g.pop('callback_started_at', None)
+
+        if started_at is None:
+            return response
+
+        # Labelled by the outputs of the callback, only when it is a registered one
+        body = flask.request.get_json(silent=True) or {}
+        output = body.get('output')
+        callback = output.strip('.') if isinstance(output, str) and output in app.callback_map else 'unknown'
+
+        metrics.callback_seconds.observe(time.perf_counter() - started_at, callback=callback)
+        metrics.callback_responses.inc(callback=callback, status=response.status_code)
+
+        # Registered after Flask-Compress, so this runs first: the size before compression
+        if response.content_length is not None:
+            metrics.callback_response_bytes.observe(response.content_length, callback=callback)
+
+        return response
+
+    return None
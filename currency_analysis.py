@@ -1,5 +1,7 @@
 from src.ForexAnalyzer import ForexAnalyzer
 
+import itertools
+
 def load_forex_pairs():
     """Load all the symbols
         Source: https://www.mql5.com/en/docs/integration/python_metatrader5/mt5symbolsget_py
@@ -14,19 +16,35 @@ def load_forex_pairs():
 
     forex_analyzer = ForexAnalyzer.get_instance()
 
-    symbols_list = forex_analyzer.get_symbol_list()
-    
-    return sorted(symbols_list)
+    return forex_analyzer.get_symbol_list()
+
+def search_forex_pairs(search_value, limit):
+    """Find the symbols containing the search, for the symbol dropdown
+
+        Parameters:
+           - search_value(str): the text typed in the dropdown (None or empty for any symbol)
+           - limit(int): the maximum number of symbols returned
+        
+        Returns:
+            - list: the first matching symbols, in alphabetical order
+        
+    """
+
+    search_value = (search_value or '').upper()
+
+    matches = (symbol for symbol in load_forex_pairs() if search_value in symbol)
+
+    return list(itertools.islice(matches, limit))
 
 def calculate_currency_strength():
 
-    """Find the currency strength, based on JPY pairs
+    """Find the currency strength of the majors, from every cross between them
 
         Parameters:
            None
         
         Returns:
-            - dict: return the strength of all currencies, in sorted order (strongest to weakest)
+            - dataframe: the strength of the currencies on each timeframe, in sorted order (strongest to weakest)
         
     """
 
@@ -0,0 +1,27 @@
+from src.DataBroker import DataBroker, BROKER_WORKERS, BROKER_CACHE_TTL_SECONDS
+from src.ForexAnalyzer import create_data_provider
+
+import argparse
+import logging
+import os
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Serve the MetaTrader5 terminal (or the replay backend) to the Dash worker processes")
+    parser.add_argument('--address', default=os.environ.get('FOREX_DATA_BROKER', 'tcp://127.0.0.1:5557'), help="the ZeroMQ address to bind")
+    parser.add_argument('--workers', type=int, default=BROKER_WORKERS, help="the backend calls running at the same time")
+    parser.add_argument('--cache-ttl', type=float, default=BROKER_CACHE_TTL_SECONDS, help="the seconds a reply is served again to identical requests")
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    # The broker owns the terminal connection, whatever FOREX_DATA_BROKER says
+    data_provider = create_data_provider(use_broker=False)
+
+    if not data_provider.initialize():
+        raise SystemExit(f"initialize() failed, error code = {data_provider.last_error()}")
+
+    DataBroker(data_provider, arguments.address, workers=arguments.workers, cache_ttl=arguments.cache_ttl).serve_forever()
+
+if __name__ == '__main__':
+    main()
@@ -2,66 +2,158 @@ from bs4 import BeautifulSoup
 from datetime import datetime
 
 import pandas as pd
+
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
 import urllib.request
 
+# lxml parses the calendar page several times faster than html.parser
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+CALENDAR_URL = 'https://www.forexfactory.com/calendar.php?month='
+CALENDAR_CACHE_DIR = os.environ.get('FOREX_CALENDAR_CACHE_DIR', 'calendar_cache')
+
+# The parsed calendar is served from the cache for this long, then revalidated in the background
+CALENDAR_TTL_SECONDS = 60 * 60
+CALENDAR_TIMEOUT_SECONDS = 20
+
+EVENT_COLUMNS = ['date', 'time_minus_12hours', 'currency', 'event', 'impact']
+
+def _format_day(day):
+    """Format a day like the calendar page does (e.g. 'Jan 5', without leading 0)"""
+
+    return f"{day:%b} {day.day}"
+
 class ForexFactoryScraper:
+    """The ForexFactory calendar of a month, fetched once and cached
+
+    The parsed events are saved to disk, and served from there until they are older than the TTL.
+    Expired events are still served while a background thread revalidates them (with the ETag and
+    Last-Modified of the last download, so an unchanged page is not downloaded again). Only the
+    very first call, without anything cached, waits for the download.
+
+    Any URL urllib can open works, so a saved page can be parsed with a file:// URL.
+    """
+
+    def __init__(self, month_select, cache_dir=CALENDAR_CACHE_DIR, ttl=CALENDAR_TTL_SECONDS, url=None):
+        """Create the calendar, loading the cached events if any (nothing is downloaded yet)
+
+        Parameters:
+            - month_select(str): the month of the calendar ('this', 'next', 'last' or e.g. 'jan.2021')
+            - cache_dir(str): the folder holding the cached events
+            - ttl(float): the seconds the cached events are served for, before being revalidated
+            - url(str): the calendar page, instead of the ForexFactory one (e.g. a saved page)
+
+        """
+
+        self._url = url or CALENDAR_URL + month_select
+        self._month_select = month_select
+        self._ttl = ttl
+
+        self._cache_path = os.path.join(cache_dir, f"calendar_{month_select}.json")
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
 
-    def __init__(self, month_select):
-        self._url = 'https://www.forexfactory.com/calendar.php?month=' + month_select
         self._extracted_events = None
+        self._events_by_date = {}
+
+        # The download the events come from: when, and its validators for conditional requests
+        self._fetched_at = 0
+        self._fetched_month = None
+        self._etag = None
+        self._last_modified = None
+
+        self._load_cache()
+
+    def _cell_text(self, row_html, css_class):
+        cells = row_html.xpath(f".//td[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]")
+
+        return cells[0].text_content().strip() if cells else ''
+
+    def _cell_impact(self, row_html):
+        classes = row_html.xpath(".//td[contains(concat(' ', normalize-space(@class), ' '), ' impact ')]//span/@class")
+
+        return classes[0].split()[0] if classes else ''
+
+    def _extract_rows_lxml(self, html):
+        """Extract the (day, currency, event, time, impact) of the calendar rows, with lxml"""
+
+        document = lxml.html.fromstring(html)
+        rows = document.xpath("//tr[contains(concat(' ', normalize-space(@class), ' '), ' calendar_row ')]")
 
-        self._begin_extraction()
+        return [
+            (
+                self._cell_text(row, 'calendar__date')[3:],
+                self._cell_text(row, 'calendar__currency'),
+                self._cell_text(row, 'calendar__event'),
+                self._cell_text(row, 'calendar__time'),
+                self._cell_impact(row)
+            ) for row in rows
+        ]
 
-    def _extract_day(self, row_html):
-        day_date = row_html.find("td", {"class": "calendar__date"}).text.strip()
-        return day_date[3:]
+    def _extract_rows_soup(self, html):
+        """Extract the (day, currency, event, time, impact) of the calendar rows, with BeautifulSoup"""
 
-    def _extract_currency(self, row_html):
-        return row_html.find("td", {"class":"calendar__currency"}).text.strip()
+        def _text(row_html, css_class):
+            cell = row_html.find("td", {"class": css_class})
+            return cell.text.strip() if cell else ''
 
-    def _extract_event(self, row_html):
-        return row_html.find("td", {"class":"calendar__event"}).text.strip()
+        def _impact(row_html):
+            cell = row_html.find("td", {"class": "impact"})
+            span = cell.find("span") if cell else None
+            return span.get("class")[0] if span and span.get("class") else ''
 
-    def _extract_time(self, row_html):
-        return row_html.find("td", {"class":"calendar__time"}).text.strip()
+        rows = BeautifulSoup(html, "html.parser").find_all("tr", class_="calendar_row")
 
-    def _extract_impact(self, row_html):
-        return row_html.find("td", {"class":"impact"}).find("span").get("class")[0]
+        return [
+            (
+                _text(row, "calendar__date")[3:],
+                _text(row, "calendar__currency"),
+                _text(row, "calendar__event"),
+                _text(row, "calendar__time"),
+                _impact(row)
+            ) for row in rows
+        ]
 
-    def _extract_html_data(self):
+    def parse(self, html):
+        """Parse a calendar page into its events
 
-        opener = urllib.request.build_opener()
-        opener.addheaders = [('User-agent', 'Mozilla/5.0')]
-        response = opener.open(self._url)
-        result = response.read().decode('utf-8', errors='replace')
+        Parameters:
+            - html(str): the calendar page
 
-        return BeautifulSoup(result,"html.parser")
+        Returns:
+            - dataframe: the events, with their date (e.g. 'Jan 5'), time, currency, event and impact rank
 
-    def _begin_extraction(self):
-        parsed_html = self._extract_html_data()
-        table = parsed_html.find_all("tr", class_="calendar_row")
+        """
+
+        rows = self._extract_rows_lxml(html) if lxml is not None else self._extract_rows_soup(html)
 
         economic_events_list = []
 
         current_extracted_date = None
         current_time = None
-        
-        for row in table:
 
-            currency = self._extract_currency(row)
+        for day, currency, event, event_time, impact in rows:
 
             # Sometimes there are no events. This can be checked via the currency
             if not currency:
                 continue
-            
+
             # Recurring day and date is blank
-            current_extracted_date = self._extract_day(row) or current_extracted_date
+            current_extracted_date = day or current_extracted_date
 
             # Events at the same time is blank
-            current_time = self._extract_time(row) or current_time
-
-            event = self._extract_event(row)
-            impact = self._extract_impact(row)
+            current_time = event_time or current_time
 
             economic_events_list.append({
                 'date': current_extracted_date,
@@ -70,23 +162,190 @@ class ForexFactoryScraper:
                 'event': event,
                 'impact': impact
             })
-        
-        events_df = pd.DataFrame(economic_events_list)
+
+        events_df = pd.DataFrame(economic_events_list, columns=EVENT_COLUMNS)
         events_df['impact'] = events_df.impact.map({'high': 1, 'medium': 2, 'low': 3}).fillna(4).astype(int)
 
-        self._extracted_events = events_df
+        return events_df
+
+    def _set_events(self, events_df):
+        """Swap in the events, and their index by date"""
+
+        events_by_date = {day: frame for day, frame in events_df.groupby('date', sort=False)}
+
+        with self._lock:
+            self._extracted_events = events_df
+            self._events_by_date = events_by_date
 
         return None
 
-    def get_today_events(self):
+    def _load_cache(self):
+
+        if not os.path.exists(self._cache_path):
+            return None
+
+        try:
+            with open(self._cache_path) as cache_file:
+                cache = json.load(cache_file)
+
+            self._set_events(pd.DataFrame(cache['events'], columns=EVENT_COLUMNS))
+        except (OSError, ValueError, KeyError) as error:
+            logging.warning(f"Ignoring the calendar cache {self._cache_path}: {error!r}")
+            return None
+
+        self._fetched_at = cache['fetched_at']
+        self._fetched_month = cache.get('fetched_month')
+        self._etag = cache.get('etag')
+        self._last_modified = cache.get('last_modified')
+
+        return None
+
+    def _save_cache(self):
+        cache = {
+            'fetched_at': self._fetched_at,
+            'fetched_month': self._fetched_month,
+            'etag': self._etag,
+            'last_modified': self._last_modified,
+            'events': self._extracted_events.to_dict(orient='records')
+        }
+
+        temp_path = f"{self._cache_path}.tmp"
+
+        with open(temp_path, 'w') as cache_file:
+            json.dump(cache, cache_file)
+
+        os.replace(temp_path, self._cache_path)
+
+        return None
+
+    def _download(self):
+        """Download the calendar page, unless it didn't change since the last download
+
+        Returns:
+            - str: the page, or None if it didn't change
+            - str: the ETag of the page
+            - str: the Last-Modified date of the page
+
+        """
 
-        # Remove leading 0 from date.
-        # If using non-windows, replace '#' with '-'
-        current_date = datetime.now().strftime("%b %#d")
-        extracted_events_copy = self._extracted_events.copy()
+        request = urllib.request.Request(self._url, headers={'User-agent': 'Mozilla/5.0'})
+
+        if self._etag:
+            request.add_header('If-None-Match', self._etag)
+
+        if self._last_modified:
+            request.add_header('If-Modified-Since', self._last_modified)
+
+        try:
+            with urllib.request.urlopen(request, timeout=CALENDAR_TIMEOUT_SECONDS) as response:
+                html = response.read().decode('utf-8', errors='replace')
+                return html, response.headers.get('ETag'), response.headers.get('Last-Modified')
+        except urllib.error.HTTPError as error:
+            if error.code == 304:
+                return None, self._etag, self._last_modified
+
+            raise
+
+    def refresh(self):
+        """Download (or revalidate) and parse the calendar, and save it to the cache
+
+        Returns:
+            - None
+
+        """
+
+        with self._refresh_lock:
+            self._refresh_locked()
+
+        return None
+
+    def _refresh_locked(self):
+
+        html, etag, last_modified = self._download()
+
+        if html is not None:
+            self._set_events(self.parse(html))
+
+        self._fetched_at = time.time()
+        self._fetched_month = datetime.now().strftime('%Y-%m')
+        self._etag = etag
+        self._last_modified = last_modified
+
+        self._save_cache()
+
+        return None
+
+    def _refresh_in_background(self):
+
+        try:
+            self.refresh()
+        except Exception as error:
+            logging.warning(f"Failed to refresh the economic calendar: {error!r}")
+
+        return None
+
+    def start_refresh(self):
+        """Refresh the calendar in a background thread, unless a refresh is already running
+
+        Returns:
+            - None
+
+        """
+
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return None
+
+            self._refresh_thread = threading.Thread(target=self._refresh_in_background, name='calendar-refresh', daemon=True)
+            self._refresh_thread.start()
+
+        return None
+
+    def _has_events(self):
+
+        # Once the month rolls over, the events cached for 'this' month are of the previous one
+        if self._month_select == 'this' and self._fetched_month != datetime.now().strftime('%Y-%m'):
+            return False
+
+        return self._extracted_events is not None
+
+    def _ensure_events(self):
+        """Make sure events are loaded, revalidating expired ones in the background"""
+
+        if not self._has_events():
+            with self._refresh_lock:
+                if self._has_events():
+                    return None
+
+                # Nothing usable is cached: download the whole page again
+                self._etag = None
+                self._last_modified = None
+
+                self._refresh_locked()
+        elif time.time() - self._fetched_at > self._ttl:
+            self.start_refresh()
+
+        return None
+
+    def get_events(self, day):
+        """Get the events of a day
+
+        Parameters:
+            - day(date): the day of the events
+
+        Returns:
+            - dataframe: the events of the day (empty if there are none)
+
+        """
+
+        self._ensure_events()
+
+        with self._lock:
+            return self._events_by_date.get(_format_day(day), self._extracted_events.iloc[:0])
+
+    def get_today_events(self):
 
-        filtered_events = extracted_events_copy[extracted_events_copy['date'] == current_date]
-        filtered_events = filtered_events.groupby('currency')
+        filtered_events = self.get_events(datetime.now()).groupby('currency')
 
         events_str = ""
 
@@ -100,4 +359,4 @@ class ForexFactoryScraper:
 
             events_str += "\n\n-----\n\n"
 
-        return events_str
\ No newline at end of file
+        return events_str
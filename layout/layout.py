@@ -1,7 +1,9 @@
-from currency_analysis import load_forex_pairs
-
 import dash_core_components as dcc
 import dash_html_components as html
+import dash_table
+
+# Milliseconds between two live updates of the candlestick, RSI, points, ATR and volume graphs
+LIVE_INTERVAL_MS = 500
 
 def _loading_figure_layout(fig_id, config=None, style=None):
     return dcc.Loading(
@@ -26,7 +28,24 @@ def _generate_currency_correlation_input():
             dcc.Input(
                 id="input_currencies_list",
                 type="text",
-                placeholder="Symbols (seperated by ,)"
+                placeholder="Symbols (seperated by ,), empty for all"
+            )
+        ]),
+
+        html.Div([
+            dcc.Dropdown(
+                id='correlation-timeframe',
+                options=[{'label': timeframe, 'value': timeframe} for timeframe in ['1H', '4H', '1W']],
+                value='4H',
+                className='dropdown-field',
+                clearable=False
+            ),
+            dcc.Input(
+                id="input_correlation_window",
+                type="number",
+                min=2,
+                placeholder="Rolling window (bars), empty for all",
+                className='input-fields'
             )
         ]),
 
@@ -38,32 +57,85 @@ def _generate_currency_correlation_input():
 
     ]) 
 
-def _generate_dropdown(forex_list):
+def _generate_divergence_scanner():
 
-    current_forex = forex_list[0]
+    divergence_columns = [
+        ('symbol', 'Symbol'),
+        ('timeframe', 'Timeframe'),
+        ('divergence', 'Divergence'),
+        ('bars_ago', 'Bars ago'),
+        ('price_change', 'Price change (%)'),
+        ('rsi_change', 'RSI change'),
+        ('rsi', 'RSI')
+    ]
 
-    dropdown_options = []
+    return html.Div([
+        html.H1(
+            children="RSI divergences"
+        ),
 
-    for symbol in forex_list:
-        
-        dropdown_options.append({
-            'label': f"{symbol}",
-            'value': symbol
-        })
+        html.Div([
+            dcc.Input(
+                id="input_divergence_symbols",
+                type="text",
+                placeholder="Symbols (seperated by ,), empty for all"
+            )
+        ]),
+
+        html.Div([
+            dcc.Dropdown(
+                id='divergence-timeframes',
+                options=[{'label': timeframe, 'value': timeframe} for timeframe in ['1H', '4H', '1W']],
+                value=['1H', '4H', '1W'],
+                multi=True,
+                className='dropdown-field',
+                clearable=False
+            )
+        ]),
+
+        html.Button(
+            'Scan', 
+            id='scan-divergences',
+            className='button-placement'
+        ),
+
+        html.Div(
+            id='divergence-errors',
+            style={'margin-top': 10}
+        ),
+
+        dcc.Loading(
+            type="default",
+            children=dash_table.DataTable(
+                id='divergence-table',
+                columns=[{'name': name, 'id': column} for column, name in divergence_columns],
+                data=[],
+                sort_action='native',
+                filter_action='native',
+                page_size=50
+            )
+        )
+    ])
 
+def _generate_dropdown():
+
+    # The options are served by the search callback, so the layout doesn't wait for the terminal
     return html.Div([
 
         html.Div(
             [
                 dcc.Dropdown(
                     id='currency-dropdown',
-                    options=dropdown_options,
+                    options=[],
                     clearable=False,
                     className='dropdown-field',
-                    value=current_forex
+                    placeholder='Search a symbol'
                 ),
-                dcc.Store(id='current-currency',data=current_forex),
-                dcc.Store(id='candlesticks-width', data=forex_list)
+                dcc.Store(id='current-currency'),
+                dcc.Store(id='viewport-width'),
+                dcc.Store(id='live-origin'),
+                dcc.Store(id='live-state'),
+                dcc.Interval(id='live-interval', interval=LIVE_INTERVAL_MS)
             ]
         ),
 
@@ -134,6 +206,65 @@ def _generate_inputs_margin_calc():
         )
     ])
 
+def _generate_risk_table():
+
+    risk_items = {
+        'symbols': 'Symbols (seperated by ,), empty for all',
+        'lot_sizes': 'Lot sizes (seperated by ,)',
+        'balance': 'balance',
+        'buffer_balance': 'buffer balance',
+        'stop_loss_points': 'stop-loss points',
+        'profit_target': 'profit target',
+        'profit_trades': 'trades for the profit target'
+    }
+
+    risk_columns = [
+        ('symbol', 'Symbol'),
+        ('side', 'Side'),
+        ('lot_size', 'Lots'),
+        ('price', 'Price'),
+        ('margin', 'Margin'),
+        ('stop_out_loss', 'Max loss (20% stop-out)'),
+        ('point_value', 'Point value'),
+        ('remaining_trades', 'Losing trades to buffer'),
+        ('required_points', 'Points per trade for target')
+    ]
+
+    return html.Div([
+
+        html.H1(
+            children="Watchlist risk"
+        ),
+
+        html.Div([
+            dcc.Input(
+                id=f"input_risk_{field}",
+                type="text",
+                placeholder=placeholder,
+                className='input-fields'
+            ) for field, placeholder in risk_items.items()
+        ]),
+
+        html.Button(
+            'Calculate Risk', 
+            id='calculate-risk',
+            className='button-placement'
+        ),
+
+        html.Div(
+            id='risk-errors',
+            style={'margin-top': 10}
+        ),
+
+        dash_table.DataTable(
+            id='risk-table',
+            columns=[{'name': name, 'id': column} for column, name in risk_columns],
+            data=[],
+            sort_action='native',
+            page_size=50
+        )
+    ])
+
 def _generate_points_percentage_graph():
     return html.Div(
         [
@@ -178,8 +309,7 @@ def _generate_download_button():
     )
 
 def generate_layout():
-
-    forex_list = load_forex_pairs()
+    """Build the layout, once: it holds no market data, which the callbacks fill in"""
 
     draw_config = {'modeBarButtonsToAdd': ['drawline','eraseshape', 'drawopenpath', 'drawrect']}
     hide_display = {'display':'none'}
@@ -191,6 +321,8 @@ def generate_layout():
             dcc.Tab(label='Risk Management', value='risk-management-tab', children=[
                 _generate_inputs_margin_calc(),
                 html.Hr(),
+                _generate_risk_table(),
+                html.Hr(),
                 _generate_points_percentage_graph(),
                 _loading_figure_layout('points-fig',None,hide_display),
             ]),
@@ -201,12 +333,14 @@ def generate_layout():
                 _loading_figure_layout('bar-currency-strength-analysis',None,hide_display),
                 html.Hr(),
                 _generate_currency_correlation_input(),
-                _loading_figure_layout('currency-correlation-fig',None,hide_display)
+                _loading_figure_layout('currency-correlation-fig',None,hide_display),
+                html.Hr(),
+                _generate_divergence_scanner()
             ]),
 
             dcc.Tab(label='Price Analysis', value='price-analysis-tab', children=[
 
-                _generate_dropdown(forex_list),
+                _generate_dropdown(),
 
                 dcc.Tabs(id='timeframe-tabs', value='high-timeframe', children=[
 
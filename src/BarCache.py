@@ -0,0 +1,112 @@
+from collections import OrderedDict
+
+import threading
+
+class BarCache:
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self._max_bytes = max_bytes
+        self._current_bytes = 0
+
+        # (symbol, timeframe) -> (dataframe, size in bytes), least recently used first
+        self._bars = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _frame_size(self, rates_df):
+        return int(rates_df.memory_usage(index=True).sum())
+
+    def get(self, symbol, timeframe):
+        """Get the cached bars of a symbol, marking them as recently used
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+
+        Returns:
+            - dataframe: the cached bars, or None if there are none
+
+        """
+
+        key = (symbol, timeframe)
+
+        with self._lock:
+            if key not in self._bars:
+                return None
+
+            self._bars.move_to_end(key)
+
+            return self._bars[key][0]
+
+    def put(self, symbol, timeframe, rates_df):
+        """Store the bars of a symbol, evicting the least recently used ones above the memory cap
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+            - rates_df(dataframe): the bars to store
+
+        Returns:
+            - None
+
+        """
+
+        key = (symbol, timeframe)
+        size = self._frame_size(rates_df)
+
+        with self._lock:
+            self._remove(key)
+
+            # A single frame above the cap is never cached
+            if size > self._max_bytes:
+                return None
+
+            self._bars[key] = (rates_df, size)
+            self._current_bytes += size
+
+            while self._current_bytes > self._max_bytes:
+                _, (_, evicted_size) = self._bars.popitem(last=False)
+                self._current_bytes -= evicted_size
+
+        return None
+
+    def _remove(self, key):
+        entry = self._bars.pop(key, None)
+
+        if entry is not None:
+            self._current_bytes -= entry[1]
+
+        return None
+
+    def remove(self, symbol, timeframe):
+        with self._lock:
+            self._remove((symbol, timeframe))
+
+        return None
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def get_stats(self):
+        """Get the usage statistics of the cache
+
+        Returns:
+            - dict: the hits, misses, number of entries and memory used
+
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._bars),
+                'bytes': self._current_bytes,
+                'max_bytes': self._max_bytes
+            }
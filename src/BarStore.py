@@ -0,0 +1,170 @@
+from src.DataProvider import RATES_DTYPE
+
+import numpy as np
+
+import logging
+import os
+import threading
+import time
+
+# A file mapped by a concurrent request can't be replaced on Windows: the attempts, a moment apart
+REPLACE_ATTEMPTS = 5
+REPLACE_RETRY_SECONDS = 0.05
+
+class BarStore:
+    """On-disk store of the bars, with one file of fixed-width records per symbol and timeframe
+
+    The files hold the raw copy_rates_from records (RATES_DTYPE) back to back, so the latest
+    bars are read at an offset without parsing the older ones, and new bars are appended.
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, symbol, timeframe):
+        return os.path.join(self._directory, f"{symbol}_{timeframe}.bars")
+
+    def _count(self, path):
+        return os.path.getsize(path) // RATES_DTYPE.itemsize if os.path.exists(path) else 0
+
+    def _read_bar(self, path, index):
+        """Read a single stored bar, without mapping the file"""
+
+        return np.fromfile(path, dtype=RATES_DTYPE, count=1, offset=index * RATES_DTYPE.itemsize)[0]
+
+    def read(self, symbol, timeframe, bar_count=None):
+        """Read a snapshot of the latest stored bars
+
+        The bars are read under the lock, so a concurrent append (which overwrites the latest bar
+        in place) is never read half-written. The file isn't mapped either, as a mapped file can't
+        be rewritten on Windows.
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+            - bar_count(int): the number of bars to read (all of them if None)
+
+        Returns:
+            - ndarray: the stored bars, oldest first (empty if there are none)
+
+        """
+
+        path = self._path(symbol, timeframe)
+
+        with self._lock:
+            stored_count = self._count(path)
+
+            if stored_count == 0:
+                return np.zeros(0, dtype=RATES_DTYPE)
+
+            read_count = min(bar_count or stored_count, stored_count)
+
+            return np.fromfile(path, dtype=RATES_DTYPE, count=read_count, offset=(stored_count - read_count) * RATES_DTYPE.itemsize)
+
+    def get_extent(self, symbol, timeframe):
+        """Get the number of stored bars and the time of the latest one, without mapping the file
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+
+        Returns:
+            - int: the number of stored bars
+            - int: the time of the latest stored bar (epoch seconds), or None if there are none
+
+        """
+
+        path = self._path(symbol, timeframe)
+
+        with self._lock:
+            stored_count = self._count(path)
+
+            if stored_count == 0:
+                return 0, None
+
+            return stored_count, int(self._read_bar(path, stored_count - 1)['time'])
+
+    def _write(self, path, rates):
+        """Rewrite a whole file, replacing it with a temporary one
+
+        On Windows, a file can't be replaced while another process (e.g. a second worker) has it
+        open: the replace is retried for a moment, then given up, leaving the stored bars as they
+        were (the bars are fetched from the terminal again next time).
+        """
+
+        temp_path = f"{path}.tmp"
+
+        rates.astype(RATES_DTYPE).tofile(temp_path)
+
+        for attempt in range(REPLACE_ATTEMPTS):
+            try:
+                os.replace(temp_path, path)
+                return None
+            except PermissionError:
+                time.sleep(REPLACE_RETRY_SECONDS)
+
+        os.remove(temp_path)
+        logging.warning(f"Could not rewrite {path}, as it is still mapped: the new bars are not stored")
+
+        return None
+
+    def append(self, symbol, timeframe, rates):
+        """Store freshly fetched bars
+
+        Bars after the latest stored one are appended to the file and the latest stored bar is
+        overwritten in place, as it may have still been forming. The file is only rewritten
+        when the bars do not line up with the stored ones (older history, or a gap).
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+            - rates(ndarray): the bars fetched, oldest first
+
+        Returns:
+            - None
+
+        """
+
+        if len(rates) == 0:
+            return None
+
+        path = self._path(symbol, timeframe)
+
+        with self._lock:
+            stored_count = self._count(path)
+
+            if stored_count == 0:
+                self._write(path, rates)
+                return None
+
+            first_time = self._read_bar(path, 0)['time']
+            last_time = self._read_bar(path, stored_count - 1)['time']
+
+            if rates['time'][-1] < first_time or rates['time'][0] > last_time:
+                self._write(path, rates)
+                return None
+
+            if rates['time'][0] < first_time:
+                stored = np.fromfile(path, dtype=RATES_DTYPE)
+                newer = stored[stored['time'] > rates['time'][-1]]
+                self._write(path, np.concatenate([rates.astype(RATES_DTYPE), newer]))
+                return None
+
+            last_offset = (stored_count - 1) * RATES_DTYPE.itemsize
+
+            last_bar = rates[rates['time'] == last_time].astype(RATES_DTYPE)
+            new_bars = rates[rates['time'] > last_time].astype(RATES_DTYPE)
+
+            with open(path, 'r+b') as bars_file:
+
+                if len(last_bar):
+                    bars_file.seek(last_offset)
+                    bars_file.write(last_bar[-1:].tobytes())
+
+                bars_file.seek(0, os.SEEK_END)
+                bars_file.write(new_bars.tobytes())
+
+        return None
@@ -0,0 +1,205 @@
+from datetime import datetime, timedelta
+
+from src.DataProvider import DataProvider, SymbolInfo, SymbolTick, RATES_DTYPE
+from src.SingleFlight import SingleFlight
+
+import numpy as np
+import zmq
+
+import json
+import threading
+
+BROKER_TIMEOUT_SECONDS = 30
+
+# The methods the broker serves, and how their results are serialized
+BROKER_METHODS = {
+    'initialize': 'value',
+    'last_error': 'value',
+    'copy_rates_from': 'rates',
+    'symbols_get': 'symbols',
+    'symbol_info': 'symbol',
+    'symbol_info_tick': 'tick',
+    'order_calc_margin': 'value',
+    'order_calc_profit': 'value',
+    'broker_stats': 'value'
+}
+
+def encode_datetime(value):
+    """Convert a datetime argument to epoch seconds, reading naive datetimes as UTC"""
+
+    if not isinstance(value, datetime):
+        return value
+
+    if value.tzinfo is None:
+        return {'datetime': (value - datetime(1970, 1, 1)).total_seconds()}
+
+    return {'datetime': value.timestamp()}
+
+def decode_datetime(value):
+
+    if isinstance(value, dict) and 'datetime' in value:
+        return datetime(1970, 1, 1) + timedelta(seconds=value['datetime'])
+
+    return value
+
+def encode_result(method, result):
+    """Serialize the result of a data provider method into the payload frame
+
+    Parameters:
+        - method(str): the data provider method
+        - result: the value it returned
+
+    Returns:
+        - bytes: the payload (the raw records for bars, JSON otherwise)
+
+    """
+
+    kind = BROKER_METHODS[method]
+
+    if kind == 'rates':
+        return np.ascontiguousarray(result).astype(RATES_DTYPE).tobytes()
+
+    if kind == 'symbols':
+        result = [{field: getattr(symbol, field) for field in SymbolInfo._fields} for symbol in result]
+    elif kind == 'symbol':
+        result = {field: getattr(result, field) for field in SymbolInfo._fields}
+    elif kind == 'tick':
+        result = {field: getattr(result, field) for field in SymbolTick._fields}
+
+    # Backends may return numpy scalars (e.g. from recorded files)
+    return json.dumps(result, default=lambda value: value.item()).encode()
+
+def decode_result(method, payload):
+
+    kind = BROKER_METHODS[method]
+
+    if kind == 'rates':
+        return np.frombuffer(payload, dtype=RATES_DTYPE).copy()
+
+    result = json.loads(payload)
+
+    if kind == 'symbols':
+        return tuple(SymbolInfo(**symbol) for symbol in result)
+
+    if kind == 'symbol':
+        return SymbolInfo(**result)
+
+    if kind == 'tick':
+        return SymbolTick(**result)
+
+    return result
+
+class BrokerDataProvider(DataProvider):
+    """Market data from a data broker process (see data_broker.py), shared by many Dash workers
+
+    Each thread talks to the broker over its own REQ socket. Identical requests made at the same
+    time by several threads of the process are coalesced into a single broker request, which the
+    broker coalesces again with the requests of the other processes.
+    """
+
+    def __init__(self, address, timeout=BROKER_TIMEOUT_SECONDS):
+        """Create the client (the broker is only contacted by the first call)
+
+        Parameters:
+            - address(str): the ZeroMQ address of the broker (e.g. tcp://127.0.0.1:5557)
+            - timeout(float): the seconds to wait for each reply
+
+        """
+
+        self._address = address
+        self._timeout = timeout
+
+        self._context = zmq.Context.instance()
+        self._local = threading.local()
+
+        self._flight = SingleFlight()
+
+    def _get_socket(self):
+
+        if getattr(self._local, 'socket', None) is None:
+            socket = self._context.socket(zmq.REQ)
+            socket.setsockopt(zmq.LINGER, 0)
+            socket.connect(self._address)
+
+            self._local.socket = socket
+
+        return self._local.socket
+
+    def _send(self, request):
+        socket = self._get_socket()
+        socket.send(request)
+
+        if not socket.poll(self._timeout * 1000):
+            # A REQ socket waiting for a reply can't send again: start over with a new one
+            socket.close()
+            self._local.socket = None
+
+            raise TimeoutError(f"The data broker at {self._address} did not reply within {self._timeout} seconds")
+
+        return socket.recv_multipart()
+
+    def _request(self, method, *args):
+        """Send a request to the broker, or wait for the identical one already in flight
+
+        Parameters:
+            - method(str): the data provider method
+            - args(list): its arguments
+
+        Returns:
+            - the decoded result (None when the backend returned None, see last_error)
+
+        """
+
+        request = json.dumps({'method': method, 'args': [encode_datetime(arg) for arg in args]}).encode()
+
+        header, payload = self._flight.do(request, self._send, request)
+        header = json.loads(header)
+
+        if header['status'] == 'error':
+            raise RuntimeError(f"{method} failed in the data broker: {header['error']}")
+
+        # The error of the backend call, for last_error() in this thread
+        self._local.last_error = tuple(header['last_error']) if header['status'] == 'none' else None
+
+        if header['status'] == 'none':
+            return None
+
+        return decode_result(method, payload)
+
+    def initialize(self):
+        try:
+            return self._request('initialize')
+        except TimeoutError:
+            return False
+
+    def last_error(self):
+        return getattr(self._local, 'last_error', None) or tuple(self._request('last_error'))
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+
+        # Truncated to the second, so the requests made at the same time are identical
+        if isinstance(date_from, datetime):
+            date_from = date_from.replace(microsecond=0)
+
+        return self._request('copy_rates_from', symbol, timeframe, date_from, count)
+
+    def symbols_get(self):
+        return self._request('symbols_get')
+
+    def symbol_info(self, symbol):
+        return self._request('symbol_info', symbol)
+
+    def symbol_info_tick(self, symbol):
+        return self._request('symbol_info_tick', symbol)
+
+    def order_calc_margin(self, action, symbol, volume, price):
+        return self._request('order_calc_margin', action, symbol, volume, price)
+
+    def order_calc_profit(self, action, symbol, volume, price_open, price_close):
+        return self._request('order_calc_profit', action, symbol, volume, price_open, price_close)
+
+    def get_broker_stats(self):
+        """Get the request, fetch and coalescing counters of the broker
+        """
+
+        return self._request('broker_stats')
@@ -0,0 +1,211 @@
+from collections import OrderedDict
+
+import numpy as np
+
+import threading
+
+# Symbols with fewer bars than this share of the longest history are left out of the matrix
+MIN_HISTORY_SHARE = 0.5
+
+# Rolling states kept (e.g. per timeframe and list of symbols), the least recently used dropped first
+MAX_ROLLING_STATES = 64
+
+class _RollingState:
+
+    __slots__ = ['symbols', 'window', 'time', 'close', 'returns', 'sums', 'products', 'steps']
+
+    def __init__(self, symbols, window, time, close, returns, sums, products, steps):
+        # The committed (closed) bars: the symbols, time and closes of the last one, the returns
+        # in the window, their running sums and cross-products, and the steps since they were rebuilt
+        self.symbols = symbols
+        self.window = window
+        self.time = time
+        self.close = close
+        self.returns = returns
+        self.sums = sums
+        self.products = products
+        self.steps = steps
+
+class CorrelationEngine:
+    """Correlations of the log returns of many symbols, aligned on the bar times
+
+    The closes of all the symbols are aligned in a single (bars, symbols) matrix, so the whole
+    correlation matrix is one matrix product. Rolling correlations keep the running sums of the
+    returns and their cross-products per key, so a refresh only steps over the new bars.
+    """
+
+    def __init__(self, max_states=MAX_ROLLING_STATES):
+        self._max_states = max_states
+
+        # key -> rolling state, least recently used first
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def align_closes(self, symbols_data):
+        """Align the closes of the symbols on the union of their bar times
+
+        A symbol without a bar at some time keeps its previous close (no price change), and the
+        bars before the start of the shortest history kept are dropped.
+
+        Parameters:
+            - symbols_data(dict): the bars of each symbol (dataframes with 'time' and 'close')
+
+        Returns:
+            - ndarray: the bar times, oldest first
+            - list: the symbols kept, in the column order of the matrix
+            - ndarray: the (bars, symbols) matrix of the closes
+
+        """
+
+        symbols_data = {symbol: data for symbol, data in symbols_data.items() if not data.empty}
+
+        if not symbols_data:
+            return np.array([], dtype='datetime64[ns]'), [], np.zeros((0, 0))
+
+        longest_history = max(data.shape[0] for data in symbols_data.values())
+        symbols = [symbol for symbol, data in symbols_data.items() if data.shape[0] >= longest_history * MIN_HISTORY_SHARE]
+
+        times = np.unique(np.concatenate([symbols_data[symbol]['time'].to_numpy() for symbol in symbols]))
+        closes = np.full((times.shape[0], len(symbols)), np.nan)
+
+        for column, symbol in enumerate(symbols):
+            data = symbols_data[symbol]
+            closes[times.searchsorted(data['time'].to_numpy()), column] = data['close'].to_numpy()
+
+        # Forward fill: each cell takes the close of the latest row holding one
+        filled_rows = np.where(np.isnan(closes), 0, np.arange(times.shape[0])[:, None])
+        closes = closes[np.maximum.accumulate(filled_rows, axis=0), np.arange(len(symbols))]
+
+        first_row = int(np.argmax(~np.isnan(closes), axis=0).max())
+
+        return times[first_row:], symbols, closes[first_row:]
+
+    def _correlations(self, count, sums, products):
+        """The correlation matrix, from the count, sums and cross-products of the returns"""
+
+        covariances = (products - np.outer(sums, sums) / count) / (count - 1)
+        deviations = np.sqrt(np.clip(np.diag(covariances), 0, None))
+
+        # A symbol without price changes has no correlation
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlations = covariances / np.outer(deviations, deviations)
+
+        return np.clip(correlations, -1, 1)
+
+    def correlation_matrix(self, closes):
+        """Get the correlations of the log returns, over the whole period
+
+        Parameters:
+            - closes(ndarray): the (bars, symbols) matrix of the aligned closes
+
+        Returns:
+            - ndarray: the (symbols, symbols) correlation matrix (NaN for symbols without price changes)
+
+        """
+
+        returns = np.diff(np.log(closes), axis=0)
+
+        if returns.shape[0] < 2:
+            return np.full((closes.shape[1], closes.shape[1]), np.nan)
+
+        return self._correlations(returns.shape[0], returns.sum(axis=0), returns.T @ returns)
+
+    def rolling_correlation_matrix(self, key, times, symbols, closes, window):
+        """Get the correlations of the log returns over the latest window, from the committed state whenever possible
+
+        Every bar but the latest (which may still be forming) is committed. The sums are rebuilt
+        from the window when the bars don't line up with the committed ones (first call, other
+        symbols, or a gap), and every window steps to drop the rounding errors.
+
+        Parameters:
+            - key(tuple): the key of the state (e.g. the timeframe and the symbols)
+            - times(ndarray): the aligned bar times, oldest first
+            - symbols(list): the symbols of the matrix columns
+            - closes(ndarray): the (bars, symbols) matrix of the aligned closes
+            - window(int): the number of returns in the window
+
+        Returns:
+            - ndarray: the (symbols, symbols) correlation matrix of the latest window
+
+        """
+
+        symbols = tuple(symbols)
+
+        if times.shape[0] < 3:
+            return np.full((len(symbols), len(symbols)), np.nan)
+
+        with self._lock:
+            state = self._states.get(key)
+
+        position = times.searchsorted(state.time) if state is not None else 0
+
+        lines_up = (
+            state is not None and state.symbols == symbols and state.window == window
+            and position < times.shape[0] - 1 and times[position] == state.time
+            and np.array_equal(closes[position], state.close)
+        )
+
+        if lines_up and state.steps + times.shape[0] - position - 2 < window:
+            # Step over the bars closed since the last commit: add their returns, drop the oldest ones
+            new_returns = np.diff(np.log(closes[position:-1]), axis=0)
+            returns = np.vstack([state.returns, new_returns])
+            dropped = returns[:-window]
+
+            state = _RollingState(
+                symbols, window, times[-2], closes[-2].copy(), returns[-window:],
+                state.sums + new_returns.sum(axis=0) - dropped.sum(axis=0),
+                state.products + new_returns.T @ new_returns - dropped.T @ dropped,
+                state.steps + new_returns.shape[0]
+            )
+        else:
+            returns = np.diff(np.log(closes[:-1]), axis=0)[-window:]
+            state = _RollingState(symbols, window, times[-2], closes[-2].copy(), returns, returns.sum(axis=0), returns.T @ returns, 0)
+
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+
+            while len(self._states) > self._max_states:
+                self._states.popitem(last=False)
+
+        # The latest (forming) return replaces the oldest one, without being committed
+        latest_return = np.log(closes[-1]) - np.log(closes[-2])
+        count = state.returns.shape[0]
+
+        if count < window:
+            return self._correlations(count + 1, state.sums + latest_return, state.products + np.outer(latest_return, latest_return))
+
+        oldest = state.returns[0]
+
+        return self._correlations(
+            count,
+            state.sums + latest_return - oldest,
+            state.products + np.outer(latest_return, latest_return) - np.outer(oldest, oldest)
+        )
+
+    def cluster_order(self, correlations):
+        """Order the symbols so that strongly correlated ones are next to each other
+
+        The symbols are sorted on the Fiedler vector (spectral ordering) of the graph
+        weighted by the absolute correlations.
+
+        Parameters:
+            - correlations(ndarray): the (symbols, symbols) correlation matrix
+
+        Returns:
+            - ndarray: the positions of the symbols, in the clustered order
+
+        """
+
+        symbol_count = correlations.shape[0]
+
+        if symbol_count < 3:
+            return np.arange(symbol_count)
+
+        weights = np.nan_to_num(np.abs(correlations))
+        np.fill_diagonal(weights, 0)
+
+        laplacian = np.diag(weights.sum(axis=1)) - weights
+        _, eigenvectors = np.linalg.eigh(laplacian)
+
+        return np.argsort(eigenvectors[:, 1], kind='stable')
@@ -0,0 +1,229 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.BrokerDataProvider import BROKER_METHODS, decode_datetime, encode_result
+
+import zmq
+
+import json
+import logging
+import threading
+import time
+
+BROKER_WORKERS = 4
+
+# Replies are served again to the identical requests arriving this soon after
+BROKER_CACHE_TTL_SECONDS = 1.0
+
+RESULTS_ADDRESS = 'inproc://data-broker-results'
+
+class DataBroker:
+    """Serve a market data backend to the BrokerDataProvider clients of many processes
+
+    The broker owns the backend (e.g. the connection to the MetaTrader5 terminal). Requests
+    are received on a ROUTER socket and run on a thread pool. Identical requests arriving while
+    one is running wait for its reply instead of calling the backend again, and successful
+    replies are served from a short-lived cache.
+    """
+
+    def __init__(self, data_provider, address, workers=BROKER_WORKERS, cache_ttl=BROKER_CACHE_TTL_SECONDS):
+        """Create the broker (nothing is bound before serve_forever)
+
+        Parameters:
+            - data_provider(DataProvider): the backend, already initialized
+            - address(str): the ZeroMQ address to bind (e.g. tcp://127.0.0.1:5557)
+            - workers(int): the number of backend calls running at the same time
+            - cache_ttl(float): the seconds a reply is served from the cache
+
+        """
+
+        self._data_provider = data_provider
+        self._address = address
+        self._cache_ttl = cache_ttl
+
+        self._context = zmq.Context.instance()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='data-broker')
+        self._local = threading.local()
+        self._stopped = threading.Event()
+
+        # request key -> (expiry, reply frames)
+        self._cache = {}
+
+        # request key -> identities of the clients waiting for the reply
+        self._pending = {}
+
+        self._stats = {'requests': 0, 'fetches': 0, 'coalesced': 0, 'cache_hits': 0}
+
+    def _call(self, method, args):
+        """Call the backend, and build the reply frames
+
+        Returns:
+            - list: the reply frames (header, payload)
+            - bool: whether the reply can be cached
+
+        """
+
+        try:
+            result = getattr(self._data_provider, method)(*args)
+        except Exception as error:
+            logging.exception(f"{method}{tuple(args)} failed in the data broker")
+            return self._error_frames(error), False
+
+        if result is None:
+            last_error = self._data_provider.last_error()
+            return [json.dumps({'status': 'none', 'last_error': list(last_error)}).encode(), b''], False
+
+        return [json.dumps({'status': 'ok'}).encode(), encode_result(method, result)], True
+
+    def _error_frames(self, error):
+        return [json.dumps({'status': 'error', 'error': repr(error)}).encode(), b'']
+
+    def _push_result(self, key, frames, cacheable):
+
+        # ZeroMQ sockets can't be shared between threads: one PUSH socket per pool thread
+        if getattr(self._local, 'socket', None) is None:
+            self._local.socket = self._context.socket(zmq.PUSH)
+            self._local.socket.connect(RESULTS_ADDRESS)
+
+        self._local.socket.send_multipart([json.dumps(key).encode(), b'1' if cacheable else b''] + frames)
+
+        return None
+
+    def _fetch(self, key, method, args):
+        """Run a request on the pool, and hand its reply to the serving thread
+
+        A reply is always handed over (an error one when building or handing over the reply failed):
+        the clients waiting for the key, and the identical requests coalesced with it, are never left
+        without one
+        """
+
+        try:
+            frames, cacheable = self._call(method, args)
+        except Exception as error:
+            logging.exception(f"The reply of {method}{tuple(args)} could not be built in the data broker")
+            frames, cacheable = self._error_frames(error), False
+
+        try:
+            return self._push_result(key, frames, cacheable)
+        except Exception as error:
+            logging.exception(f"The reply of {method}{tuple(args)} could not be handed over in the data broker")
+            frames = self._error_frames(error)
+
+        # The socket may be left in a bad state: the error reply goes through a new one
+        if getattr(self._local, 'socket', None) is not None:
+            self._local.socket.close(linger=0)
+            self._local.socket = None
+
+        return self._push_result(key, frames, False)
+
+    def _reply(self, socket, identity, frames):
+        socket.send_multipart([identity, b''] + frames)
+
+        return None
+
+    def _handle_request(self, socket, identity, request):
+
+        self._stats['requests'] += 1
+
+        try:
+            request = json.loads(request)
+            method = request['method']
+            encoded_args = request.get('args', [])
+            args = [decode_datetime(arg) for arg in encoded_args]
+
+            if method not in BROKER_METHODS:
+                raise ValueError(f"unknown method {method!r}")
+        except (ValueError, KeyError, TypeError) as error:
+            return self._reply(socket, identity, [json.dumps({'status': 'error', 'error': f"Bad request: {error}"}).encode(), b''])
+
+        # The backend is initialized by the broker: the clients only check that it answers
+        if method == 'initialize':
+            return self._reply(socket, identity, [json.dumps({'status': 'ok'}).encode(), encode_result(method, True)])
+
+        if method == 'broker_stats':
+            return self._reply(socket, identity, [json.dumps({'status': 'ok'}).encode(), encode_result(method, dict(self._stats))])
+
+        key = (method, json.dumps(encoded_args))
+
+        cached = self._cache.get(key)
+
+        if cached is not None and cached[0] > time.monotonic():
+            self._stats['cache_hits'] += 1
+            return self._reply(socket, identity, cached[1])
+
+        if key in self._pending:
+            self._stats['coalesced'] += 1
+            self._pending[key].append(identity)
+            return None
+
+        self._stats['fetches'] += 1
+        self._pending[key] = [identity]
+        self._executor.submit(self._fetch, key, method, args)
+
+        return None
+
+    def _handle_result(self, socket, message):
+        key, cacheable, *frames = message
+        key = tuple(json.loads(key))
+
+        if cacheable:
+            now = time.monotonic()
+            self._cache[key] = (now + self._cache_ttl, frames)
+
+            # Drop the expired replies, so the cache only holds the latest requests
+            self._cache = {cached_key: cached for cached_key, cached in self._cache.items() if cached[0] > now}
+
+        for identity in self._pending.pop(key, []):
+            self._reply(socket, identity, frames)
+
+        return None
+
+    def serve_forever(self):
+        """Serve the requests until stop() is called
+
+        Returns:
+            - None
+
+        """
+
+        router = self._context.socket(zmq.ROUTER)
+        router.setsockopt(zmq.LINGER, 0)
+        router.bind(self._address)
+
+        results = self._context.socket(zmq.PULL)
+        results.setsockopt(zmq.LINGER, 0)
+        results.bind(RESULTS_ADDRESS)
+
+        poller = zmq.Poller()
+        poller.register(router, zmq.POLLIN)
+        poller.register(results, zmq.POLLIN)
+
+        logging.info(f"Data broker serving on {self._address}")
+
+        try:
+            while not self._stopped.is_set():
+                events = dict(poller.poll(100))
+
+                if results in events:
+                    self._handle_result(router, results.recv_multipart())
+
+                if router in events:
+                    identity, _, request = router.recv_multipart()
+                    self._handle_request(router, identity, request)
+        finally:
+            self._executor.shutdown(wait=True)
+            router.close()
+            results.close()
+
+        return None
+
+    def stop(self):
+        """Stop serving (from another thread)
+
+        Returns:
+            - None
+
+        """
+
+        self._stopped.set()
+
+        return None
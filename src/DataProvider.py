@@ -0,0 +1,123 @@
+from collections import namedtuple
+
+import numpy as np
+
+import threading
+
+try:
+    import MetaTrader5 as mt5
+except ImportError:
+    mt5 = None
+
+# Same values as the MetaTrader5 constants, so they can be passed straight through
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_W1 = 32769
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+
+# Layout of the array returned by copy_rates_from
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8')
+])
+
+# Subsets of the MT5 SymbolInfo and Tick fields, for the backends not talking to a terminal
+SymbolInfo = namedtuple('SymbolInfo', [
+    'name',
+    'digits',
+    'point',
+    'trade_contract_size',
+    'currency_base',
+    'currency_profit',
+    'currency_margin'
+])
+
+SymbolTick = namedtuple('SymbolTick', ['time', 'bid', 'ask', 'last', 'volume', 'time_msc'])
+
+class DataProvider:
+    """Interface of the market data backends used by ForexAnalyzer
+    The methods follow the MetaTrader5 package functions of the same name
+    """
+
+    def initialize(self):
+        raise NotImplementedError
+
+    def last_error(self):
+        raise NotImplementedError
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        raise NotImplementedError
+
+    def symbols_get(self):
+        raise NotImplementedError
+
+    def symbol_info(self, symbol):
+        raise NotImplementedError
+
+    def symbol_info_tick(self, symbol):
+        raise NotImplementedError
+
+    def order_calc_margin(self, action, symbol, volume, price):
+        raise NotImplementedError
+
+    def order_calc_profit(self, action, symbol, volume, price_open, price_close):
+        raise NotImplementedError
+
+class MT5DataProvider(DataProvider):
+    """Market data from the MetaTrader5 terminal
+
+    The MetaTrader5 package talks to the terminal over a single connection, which is not safe
+    to use from concurrent threads: the calls are serialized with a lock. Several processes
+    share the terminal through the data broker (data_broker.py), which coalesces and caches the calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+    def initialize(self):
+
+        if mt5 is None:
+            return False
+
+        with self._lock:
+            return mt5.initialize()
+
+    def last_error(self):
+
+        if mt5 is None:
+            return (-1, "MetaTrader5 package is not installed")
+
+        with self._lock:
+            return mt5.last_error()
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        with self._lock:
+            return mt5.copy_rates_from(symbol, timeframe, date_from, count)
+
+    def symbols_get(self):
+        with self._lock:
+            return mt5.symbols_get()
+
+    def symbol_info(self, symbol):
+        with self._lock:
+            return mt5.symbol_info(symbol)
+
+    def symbol_info_tick(self, symbol):
+        with self._lock:
+            return mt5.symbol_info_tick(symbol)
+
+    def order_calc_margin(self, action, symbol, volume, price):
+        with self._lock:
+            return mt5.order_calc_margin(action, symbol, volume, price)
+
+    def order_calc_profit(self, action, symbol, volume, price_open, price_close):
+        with self._lock:
+            return mt5.order_calc_profit(action, symbol, volume, price_open, price_close)
@@ -0,0 +1,294 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+import numpy as np
+import pandas as pd
+
+import os
+import threading
+
+# Bars on each side of a swing point: a swing low is the lowest low of 2 * order + 1 bars
+SWING_ORDER = 3
+
+# Bars between the two swing points compared, and the most bars since the latest of them
+MIN_SWING_DISTANCE = 5
+MAX_SWING_DISTANCE = 60
+MAX_SWING_AGE = 10
+
+# Series scanned by each worker process; fewer series in total are scanned in process
+SCAN_CHUNK_SERIES = 256
+
+DIVERGENCE_COLUMNS = ['symbol', 'timeframe', 'divergence', 'bars_ago', 'price_change', 'rsi_change', 'rsi']
+
+def stack_series(symbols_data, bar_count):
+    """Stack the bars of many symbols into matrices, aligned on their latest bar
+
+    Parameters:
+        - symbols_data(dict): the rates dataframe of each symbol
+        - bar_count(int): the number of latest bars kept
+
+    Returns:
+        - list: the symbols (columns)
+        - ndarray: the (bars, symbols) highs, lows and closes, NaN before the first bar of a symbol
+
+    """
+
+    symbols = list(symbols_data)
+    series = np.full((3, bar_count, len(symbols)), np.nan)
+
+    # Column by column: selecting several columns of a dataframe copies it
+    for column, symbol in enumerate(symbols):
+        rates_df = symbols_data[symbol]
+
+        for row, price in enumerate(['high', 'low', 'close']):
+            prices = rates_df[price].to_numpy()[-bar_count:]
+            series[row, bar_count - prices.shape[0]:, column] = prices
+
+    return symbols, series
+
+def wilder_rsi(closes, period=14):
+    """Wilder's RSI of every column at once, seeded like talib.RSI (and IndicatorEngine.rsi)
+
+    Parameters:
+        - closes(ndarray): the (bars, series) closes, NaN before the first bar of a series
+        - period(int): the RSI period
+
+    Returns:
+        - ndarray: the (bars, series) RSI values, NaN for the first period bars of each series
+
+    """
+
+    changes = np.diff(closes, axis=0)
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+
+    rsi = np.full(closes.shape, np.nan)
+
+    # The row of changes completing the first period of each series
+    first_rows = np.argmax(~np.isnan(changes), axis=0)
+    seed_rows = first_rows + period - 1
+
+    if not changes.shape[0]:
+        return rsi
+
+    # The plain averages of the first period, from cumulative sums
+    cumulative_gains = np.vstack([np.zeros(changes.shape[1]), np.cumsum(gains, axis=0)])
+    cumulative_losses = np.vstack([np.zeros(changes.shape[1]), np.cumsum(losses, axis=0)])
+    columns = np.arange(changes.shape[1])
+    end_rows = np.minimum(seed_rows + 1, changes.shape[0])
+
+    seed_gains = (cumulative_gains[end_rows, columns] - cumulative_gains[first_rows, columns]) / period
+    seed_losses = (cumulative_losses[end_rows, columns] - cumulative_losses[first_rows, columns]) / period
+
+    average_gain = np.full(changes.shape[1], np.nan)
+    average_loss = np.full(changes.shape[1], np.nan)
+
+    # The smoothing is recursive over the bars, but each step covers every series
+    for row in range(changes.shape[0]):
+        seeded = row == seed_rows
+        average_gain = np.where(seeded, seed_gains, (average_gain * (period - 1) + gains[row]) / period)
+        average_loss = np.where(seeded, seed_losses, (average_loss * (period - 1) + losses[row]) / period)
+
+        total = average_gain + average_loss
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi[row + 1] = np.where(total > 0, 100 * average_gain / total, 0.0)
+
+        rsi[row + 1, np.isnan(total)] = np.nan
+
+    return rsi
+
+def find_swings(values, order, lowest):
+    """Find the swing points of every column: the extreme value of the order bars on each side
+
+    Parameters:
+        - values(ndarray): the (bars, series) values
+        - order(int): the bars on each side of a swing point
+        - lowest(bool): whether swing lows (True) or swing highs (False) are found
+
+    Returns:
+        - ndarray: the (bars, series) mask of the swing points (the last order bars are never confirmed)
+
+    """
+
+    swings = np.zeros(values.shape, dtype=bool)
+
+    if values.shape[0] < 2 * order + 1:
+        return swings
+
+    windows = sliding_window_view(values, 2 * order + 1, axis=0)
+    extremes = windows.min(axis=-1) if lowest else windows.max(axis=-1)
+
+    with np.errstate(invalid='ignore'):
+        swings[order:values.shape[0] - order] = values[order:values.shape[0] - order] == extremes
+
+    return swings
+
+def _last_two(mask):
+    """Get the rows of the last two True values of every column (-1 where missing)"""
+
+    rows = np.arange(mask.shape[0])[:, None]
+
+    last = np.where(mask, rows, -1).max(axis=0, initial=-1)
+    previous = np.where(mask & (rows < last), rows, -1).max(axis=0, initial=-1)
+
+    return last, previous
+
+def scan_series(highs, lows, closes, period=14, order=SWING_ORDER, min_distance=MIN_SWING_DISTANCE,
+                max_distance=MAX_SWING_DISTANCE, max_age=MAX_SWING_AGE):
+    """Find the RSI divergences of many series, between their last two swing points
+
+    A regular divergence has the price making a new extreme the RSI doesn't confirm (a lower low
+    with a higher RSI low is bullish, a higher high with a lower RSI high bearish). A hidden
+    divergence is the other way round: a higher low with a lower RSI low is bullish, a lower
+    high with a higher RSI high bearish.
+
+    Parameters:
+        - highs(ndarray): the (bars, series) highs
+        - lows(ndarray): the (bars, series) lows
+        - closes(ndarray): the (bars, series) closes
+        - period(int): the RSI period
+        - order(int): the bars on each side of a swing point
+        - min_distance(int): the fewest bars between the two swing points
+        - max_distance(int): the most bars between the two swing points
+        - max_age(int): the most bars since the latest swing point
+
+    Returns:
+        - dict: the column, divergence, bars since the latest swing point, price change (%), RSI change
+          and latest swing RSI of each divergence found (arrays)
+
+    """
+
+    rsi = wilder_rsi(closes, period)
+    bar_count = closes.shape[0]
+    columns = np.arange(closes.shape[1])
+
+    found = {key: [] for key in ['column', 'divergence', 'bars_ago', 'price_change', 'rsi_change', 'rsi']}
+
+    # The swing lows make the bullish divergences, the swing highs the bearish ones
+    for prices, lowest, side in [(lows, True, 'bullish'), (highs, False, 'bearish')]:
+        last, previous = _last_two(find_swings(prices, order, lowest) & ~np.isnan(rsi))
+
+        distance = last - previous
+        bars_ago = bar_count - 1 - last
+        valid = (previous >= 0) & (distance >= min_distance) & (distance <= max_distance) & (bars_ago <= max_age)
+
+        price_change = (prices[last, columns] / prices[previous, columns] - 1) * 100
+        rsi_change = rsi[last, columns] - rsi[previous, columns]
+
+        # Changes towards the extreme (lower lows, higher highs) are positive
+        direction = -1 if lowest else 1
+        price_extends = direction * price_change > 0
+        rsi_extends = direction * rsi_change > 0
+
+        price_retreats = direction * price_change < 0
+        rsi_retreats = direction * rsi_change < 0
+
+        for kind, matches in [('regular', price_extends & rsi_retreats), ('hidden', price_retreats & rsi_extends)]:
+            selected = np.flatnonzero(valid & matches)
+
+            found['column'].append(selected)
+            found['divergence'].append(np.full(selected.shape[0], f"{kind} {side}", dtype=object))
+            found['bars_ago'].append(bars_ago[selected])
+            found['price_change'].append(price_change[selected])
+            found['rsi_change'].append(rsi_change[selected])
+            found['rsi'].append(rsi[last[selected], selected])
+
+    return {key: np.concatenate(values) for key, values in found.items()}
+
+def _scan_chunk(highs, lows, closes, period):
+    # Run in the worker processes: module level, so that it can be pickled
+    return scan_series(highs, lows, closes, period)
+
+class DivergenceScanner:
+    """RSI divergences over a whole universe of symbols and timeframes
+
+    The bars of a timeframe are stacked into (bars, symbols) matrices, so the RSI, the swing
+    points and the divergences of every symbol are computed by the same array operations.
+    Large scans are split by columns over a pool of worker processes.
+    """
+
+    def __init__(self, max_workers=None, chunk_series=SCAN_CHUNK_SERIES):
+        """Create the scanner (the worker processes are started on the first large scan)
+
+        Parameters:
+            - max_workers(int): the worker processes (the CPU count by default)
+            - chunk_series(int): the series scanned by each worker task
+
+        """
+
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._chunk_series = chunk_series
+
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+
+        return self._executor
+
+    def scan(self, timeframes_data, bar_count, period=14):
+        """Find the RSI divergences of every symbol on every timeframe
+
+        Parameters:
+            - timeframes_data(dict): the rates dataframes of the symbols (dict), per timeframe
+            - bar_count(int): the number of latest bars scanned
+            - period(int): the RSI period
+
+        Returns:
+            - dataframe: the divergences found (see DIVERGENCE_COLUMNS), the largest RSI change first
+
+        """
+
+        tasks = []
+
+        for timeframe, symbols_data in timeframes_data.items():
+            symbols, (highs, lows, closes) = stack_series(symbols_data, bar_count)
+
+            for start in range(0, len(symbols), self._chunk_series):
+                end = start + self._chunk_series
+                tasks.append((timeframe, symbols[start:end], (highs[:, start:end], lows[:, start:end], closes[:, start:end], period)))
+
+        # A single chunk isn't worth the round trip to a worker process
+        if len(tasks) > 1 and self._max_workers > 1:
+            executor = self._get_executor()
+            results = [executor.submit(_scan_chunk, *arguments) for _, _, arguments in tasks]
+            results = [future.result() for future in results]
+        else:
+            results = [_scan_chunk(*arguments) for _, _, arguments in tasks]
+
+        frames = []
+
+        for (timeframe, symbols, _), found in zip(tasks, results):
+            column = found.pop('column')
+
+            frames.append(pd.DataFrame(dict(
+                symbol=np.array(symbols, dtype=object)[column],
+                timeframe=timeframe,
+                **found
+            ), columns=DIVERGENCE_COLUMNS))
+
+        if not frames:
+            return pd.DataFrame(columns=DIVERGENCE_COLUMNS)
+
+        divergence_df = pd.concat(frames, ignore_index=True)
+        divergence_df['strength'] = divergence_df['rsi_change'].abs()
+
+        # The same ranking however the series were split between the workers
+        divergence_df = divergence_df.sort_values(['strength', 'symbol', 'timeframe', 'divergence'], ascending=[False, True, True, True])
+
+        return divergence_df.drop(columns='strength').reset_index(drop=True)
+
+    def shutdown(self):
+
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+        return None
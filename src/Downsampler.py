@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+class Downsampler:
+
+    def ohlc(self, data, max_bars):
+        """Aggregate the bars into at most max_bars candles, keeping the OHLC shape
+        Every candle covers the same number of consecutive bars, like a higher timeframe
+
+        Parameters:
+            - data(dataframe): the bars, oldest first
+            - max_bars(int): the maximum number of candles to return
+
+        Returns:
+            - dataframe: the aggregated bars (the bars themselves if they already fit)
+
+        """
+
+        bar_count = data.shape[0]
+
+        if max_bars < 1 or bar_count <= max_bars:
+            return data
+
+        bucket_size = -(-bar_count // max_bars)
+
+        # Align the buckets on the latest bar, so only the oldest candle may cover fewer bars
+        starts = np.arange((bar_count - 1) % bucket_size + 1 - bucket_size, bar_count, bucket_size)
+        starts[0] = 0
+        ends = np.append(starts[1:], bar_count) - 1
+
+        aggregated = {
+            'time': data['time'].to_numpy()[starts],
+            'open': data['open'].to_numpy()[starts],
+            'high': np.maximum.reduceat(data['high'].to_numpy(), starts),
+            'low': np.minimum.reduceat(data['low'].to_numpy(), starts),
+            'close': data['close'].to_numpy()[ends]
+        }
+
+        for column in ['tick_volume', 'real_volume']:
+            if column in data:
+                aggregated[column] = np.add.reduceat(data[column].to_numpy(), starts)
+
+        return pd.DataFrame(aggregated)
+
+    def lttb(self, x, y, threshold):
+        """Pick the points of a line keeping its visual shape (Largest-Triangle-Three-Buckets)
+
+        Parameters:
+            - x(ndarray): the x values, increasing (datetimes are supported)
+            - y(ndarray): the y values (NaN values are skipped)
+            - threshold(int): the number of points to keep
+
+        Returns:
+            - ndarray: the positions of the points kept, increasing
+
+        """
+
+        x = np.asarray(x)
+        y = np.asarray(y, dtype=np.float64)
+
+        if np.issubdtype(x.dtype, np.datetime64):
+            x = x.astype('datetime64[ns]').astype(np.int64)
+
+        x = x.astype(np.float64)
+
+        valid_positions = np.flatnonzero(~np.isnan(y))
+        point_count = valid_positions.shape[0]
+
+        if threshold < 3 or point_count <= threshold:
+            return valid_positions
+
+        x = x[valid_positions]
+        y = y[valid_positions]
+
+        # The first and last points are always kept; the others are split into buckets
+        edges = np.linspace(1, point_count - 1, threshold - 1).astype(np.int64)
+
+        selected = np.empty(threshold, dtype=np.int64)
+        selected[0] = 0
+        selected[-1] = point_count - 1
+
+        for bucket in range(threshold - 2):
+            start, end = edges[bucket], edges[bucket + 1]
+
+            next_start = end
+            next_end = edges[bucket + 2] if bucket + 2 < edges.shape[0] else point_count
+
+            average_x = x[next_start:next_end].mean()
+            average_y = y[next_start:next_end].mean()
+
+            previous = selected[bucket]
+
+            areas = np.abs(
+                (x[previous] - average_x) * (y[start:end] - y[previous])
+                - (x[previous] - x[start:end]) * (average_y - y[previous])
+            )
+
+            selected[bucket + 1] = start + int(np.argmax(areas))
+
+        return valid_positions[selected]
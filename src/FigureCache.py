@@ -0,0 +1,148 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+import functools
+import json
+import threading
+
+class FigureCache:
+
+    def __init__(self, max_entries=128):
+        self._max_entries = max_entries
+
+        # key -> figure dict, least recently used first
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Get a cached figure, marking it as recently used
+
+        Parameters:
+            - key(tuple): the key of the figure
+
+        Returns:
+            - dict: the figure, or None if it isn't cached
+
+        """
+
+        with self._lock:
+            if key not in self._figures:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._figures.move_to_end(key)
+
+            return self._figures[key]
+
+    def put(self, key, figure):
+        """Store a figure, evicting the least recently used ones above the size limit
+
+        Parameters:
+            - key(tuple): the key of the figure
+            - figure(dict): the figure, as decoded from its JSON
+
+        Returns:
+            - None
+
+        """
+
+        with self._lock:
+            self._figures[key] = figure
+            self._figures.move_to_end(key)
+
+            while len(self._figures) > self._max_entries:
+                self._figures.popitem(last=False)
+
+        return None
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._figures),
+                'max_entries': self._max_entries
+            }
+
+def _content_hash(value):
+    """Hash the values of a dataframe or series, in order"""
+
+    if isinstance(value, pd.Series):
+        value = value.to_frame()
+
+    hashes = [
+        hash(np.ascontiguousarray(column.to_numpy()).tobytes()) if column.dtype.kind in 'biufcmM'
+        else hash(pd.util.hash_pandas_object(column, index=False).to_numpy().tobytes())
+        for _, column in value.items()
+    ]
+
+    return hash(tuple(hashes))
+
+def _last_row(value):
+    """The values of the last row, with the missing ones as None (NaN never equals itself)"""
+
+    return tuple(None if pd.isna(item) else item for item in value.iloc[-1].tolist())
+
+def _fingerprint(value):
+    """Reduce a plot argument to a hashable key
+
+    Bars (a 'time' column, or a series of times) are keyed on their count, their first and
+    last bar times and the values of the last bar, so the forming candle moving invalidates
+    the figure without hashing the whole history. Other frames (e.g. correlation matrices,
+    zones) are small, and keyed on their content.
+    """
+
+    if isinstance(value, pd.DataFrame):
+
+        if 'time' in value and len(value):
+            times = value['time']
+            return ('bars', tuple(value.columns), len(value), times.iat[0], times.iat[-1], _last_row(value))
+
+        return ('dataframe', tuple(value.columns), value.shape, _content_hash(value))
+
+    if isinstance(value, pd.Series):
+
+        if value.dtype.kind == 'M' and len(value):
+            return ('times', len(value), value.iat[0], value.iat[-1])
+
+        return ('series', value.shape, _content_hash(value))
+
+    if isinstance(value, dict):
+        return ('dict', tuple((key, _fingerprint(item)) for key, item in value.items()))
+
+    if isinstance(value, (list, tuple)):
+        return ('list', tuple(_fingerprint(item) for item in value))
+
+    return value
+
+def cached_figure(plot_method):
+    """Decorator caching the figures of a Graphs plot method, as the dicts Dash sends
+
+    The figures are keyed on the method and its arguments: symbol, timeframe, indicator
+    parameters, and the last bar of the bars (see _fingerprint).
+    """
+
+    @functools.wraps(plot_method)
+    def wrapper(self, *args, **kwargs):
+
+        key = (
+            plot_method.__name__,
+            _fingerprint(args),
+            _fingerprint(tuple(sorted(kwargs.items())))
+        )
+
+        figure = self._figure_cache.get(key)
+
+        if figure is None:
+            figure = json.loads(plot_method(self, *args, **kwargs).to_json())
+            self._figure_cache.put(key, figure)
+
+        return figure
+
+    return wrapper
@@ -1,123 +1,248 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, date, time 
-from tapy import Indicators
 
-import MetaTrader5 as mt5
+from src.BarCache import BarCache
+from src.BarStore import BarStore
+from src.BrokerDataProvider import BrokerDataProvider
+from src.CorrelationEngine import CorrelationEngine
+from src.DataProvider import MT5DataProvider, TIMEFRAME_H1, TIMEFRAME_H4, TIMEFRAME_W1
+from src.DivergenceScanner import DivergenceScanner
+from src.HeikenAshi import HeikenAshi
+from src.IndicatorEngine import IndicatorEngine
+from src.Metrics import InstrumentedDataProvider, METRICS_ENABLED
+from src.ReplayDataProvider import ReplayDataProvider
+from src.RiskEngine import RiskEngine
+from src.SingleFlight import SingleFlight
+from src.StrengthEngine import StrengthEngine
+from src.SupportResistance import SupportResistance
+from src.SymbolRegistry import SymbolRegistry
+
+import numpy as np
 import pandas as pd
 
+import logging
+import os
 import pytz
-import talib
+import threading
+
+BAR_CACHE_MAX_BYTES = 32 * 1024 * 1024
+HEIKEN_ASHI_CACHE_MAX_BYTES = 32 * 1024 * 1024
+BAR_STORE_DIR = os.environ.get('MT5_BAR_STORE_DIR', 'bar_store')
+
+# Bars used for the correlations, per timeframe: 30 days of 1H and 4H bars, a year of 1W bars
+CORRELATION_BAR_COUNTS = {
+    '1H': 720,
+    '4H': 180,
+    '1W': 52
+}
+
+# Bars the currency strength is measured over, per timeframe: the last day, week and 5 weeks
+STRENGTH_LOOKBACKS = {
+    '1H': 24,
+    '4H': 30,
+    '1W': 5
+}
+
+# Bars scanned for RSI divergences, on every timeframe: the RSI settles well before the swings compared
+DIVERGENCE_BAR_COUNT = 200
+DIVERGENCE_TIMEFRAMES = ['1H', '4H', '1W']
+
+# The MT5 terminal serves one call at a time (see MT5DataProvider): the symbols are fetched one
+# after the other from it, and concurrently from the replayed bars or the data broker. A batch
+# gets one deadline, after which its symbols still queued are dropped from the shared workers
+FETCH_MAX_WORKERS = 8
+FETCH_TIMEOUT_SECONDS = 10
+
+# The stats of a symbol on a timeframe, as of one request. The frames are built for each
+# request and never stored or modified afterwards, so they can be shared between threads
+DailyStats = namedtuple('DailyStats', [
+    'symbol',
+    'timeframe',
+    'rates',
+    'rsi',
+    'trend_indicators',
+    'heiken_ashi',
+    'zones'
+])
+
+def create_data_provider(use_broker=True):
+    """Create the market data backend, based on the environment
+
+    Setting FOREX_DATA_BROKER connects to the data broker at that address (see data_broker.py).
+    Otherwise, setting MT5_REPLAY_DIR replays the recorded bars of that folder (with
+    MT5_REPLAY_LATENCY seconds per call, and the margins at MT5_REPLAY_LEVERAGE) instead of
+    connecting to the MetaTrader5 terminal.
+
+    Parameters:
+        - use_broker(bool): whether FOREX_DATA_BROKER is honoured (not in the broker itself)
+
+    Returns:
+        - DataProvider: the market data backend
+    
+    """
+
+    broker_address = os.environ.get('FOREX_DATA_BROKER')
+
+    if use_broker and broker_address:
+        return BrokerDataProvider(broker_address)
+
+    replay_directory = os.environ.get('MT5_REPLAY_DIR')
+
+    if replay_directory:
+        return ReplayDataProvider(
+            replay_directory,
+            latency=float(os.environ.get('MT5_REPLAY_LATENCY', 0)),
+            leverage=int(os.environ.get('MT5_REPLAY_LEVERAGE', 100))
+        )
+
+    return MT5DataProvider()
 
 class ForexAnalyzer:
 
     __instance__ = None
+    __instance_lock__ = threading.Lock()
 
-    def __init__(self):
+    def __init__(self, data_provider=None):
 
         if ForexAnalyzer.__instance__ is None:
            ForexAnalyzer.__instance__ = self
         else:
             raise Exception("You cannot create another ForexAnalyzer class")     
 
+        data_provider = data_provider or create_data_provider()
+
+        # Every terminal call goes through here, timed for the /metrics route
+        self._data_provider = InstrumentedDataProvider(data_provider) if METRICS_ENABLED else data_provider
+
         self._mt5_timeframe_dict = {
-            '1H': mt5.TIMEFRAME_H1,
-            '4H': mt5.TIMEFRAME_H4,
-            '1W': mt5.TIMEFRAME_W1
+            '1H': TIMEFRAME_H1,
+            '4H': TIMEFRAME_H4,
+            '1W': TIMEFRAME_W1
+        }
+
+        self._timeframe_seconds_dict = {
+            '1H': 60 * 60,
+            '4H': 4 * 60 * 60,
+            '1W': 7 * 24 * 60 * 60
         }
-        
-        self._symbol = None
         
         self._timezone = pytz.timezone('Europe/Moscow') # MT5 timezone
 
-        self._lagging_indicators = {}
+        self._heiken_ashi = HeikenAshi()
+
+        self._indicator_engine = IndicatorEngine()
+        self._correlation_engine = CorrelationEngine()
+        self._strength_engine = StrengthEngine()
+        self._divergence_scanner = DivergenceScanner()
+        self._support_resistance = SupportResistance()
+
+        self._bar_cache = BarCache(BAR_CACHE_MAX_BYTES)
 
-        self._indicators_stats_df = {}
+        # Several worker processes would append to the same files: with a broker, the bars are
+        # fetched from the broker every time (it coalesces and caches them) and never stored
+        self._bar_store = None if isinstance(data_provider, BrokerDataProvider) else BarStore(BAR_STORE_DIR)
 
-        self._heiken_ashi_df = {}
+        # (symbol, timeframe) -> time of the latest closed bar stored by the live updates
+        self._stored_closed_times = {}
+        self._stored_closed_lock = threading.Lock()
 
-        self._currency_strength_list = []
+        self._fetch_executor = ThreadPoolExecutor(
+            max_workers=1 if isinstance(data_provider, MT5DataProvider) else FETCH_MAX_WORKERS
+        )
+
+        # Identical fetches running at the same time (e.g. several tabs on a symbol) share one call
+        self._fetch_flight = SingleFlight()
+
+        # Shared by the callback threads and the tick poller: locked, and bounded like the bars
+        self._heiken_ashi_cache = BarCache(HEIKEN_ASHI_CACHE_MAX_BYTES)
+
+        # Digits, contract sizes and currencies of every symbol, listed in one call
+        self._symbol_registry = SymbolRegistry(self._data_provider)
 
-        self._full_currency_list = []
+        self._risk_engine = RiskEngine(self._data_provider, self._symbol_registry)
 
-        if not mt5.initialize():
-            print("initialize() failed, error code =",mt5.last_error())
+        if not self._data_provider.initialize():
+            print("initialize() failed, error code =",self._data_provider.last_error())
             quit()
 
     @staticmethod
-    def get_instance():
+    def get_instance(data_provider=None):
         """Static method to fetch the current instance
+
+        Parameters:
+            - data_provider(DataProvider): the market data backend, used when creating the instance
         """
 
-        if not ForexAnalyzer.__instance__:
-            ForexAnalyzer()
+        # Callbacks may run on concurrent threads: only one of them creates the instance
+        with ForexAnalyzer.__instance_lock__:
+            if not ForexAnalyzer.__instance__:
+                ForexAnalyzer(data_provider)
         
         return ForexAnalyzer.__instance__
 
-    def _create_heiken_ashi(self, rates_df, timeframe):
+    def _create_heiken_ashi(self, rates_df, timeframe, symbol):
         """Create data for heiken ashi plots, based on the given timeframe
 
         Parameters:
             - data: a copy of the forex data fetched
             - timeframe: the given timeframe
+            - symbol: the underlying symbol
         
         Return:
-            - None
+            - dataframe: the heiken ashi bars
         
         """
 
-        data = rates_df.copy()
-        
-        for i in range(data.shape[0]):
-            if i > 0:
-                data.loc[data.index[i],'open'] = (rates_df['open'][i-1] + rates_df['close'][i-1])/2
-            
-            data.loc[data.index[i],'close'] = (rates_df['open'][i] + rates_df['close'][i] + rates_df['low'][i] +  rates_df['high'][i])/4
-        
-        data = data.iloc[1:,:]
-        
-        self._heiken_ashi_df[timeframe] = data
+        data = self._heiken_ashi.update(self._heiken_ashi_cache.get(symbol, timeframe), rates_df)
 
-        return None
+        self._heiken_ashi_cache.put(symbol, timeframe, data)
 
-    def _calculate_lagging_indicators(self, day_stats, timeframe):
-        """Create the lagging indicators and store in object attribute (self._lagging_indicators)
+        return data
+
+    def _calculate_lagging_indicators(self, day_stats, timeframe, symbol):
+        """Create the lagging indicators
 
         Parameters:
             - day_stats(dataframe): dataframe containting the stats of the given symbol
             - timeframe(str): the given timeframe to create the stats on
+            - symbol(str): the underlying symbol
         
         Returns:
-            - None
+            - dict: the 'time' and 'value' series of the RSI
         
         """
 
         timeperiod = 14
 
+        rsi_values = self._indicator_engine.rsi(
+            symbol,
+            timeframe,
+            day_stats['time'].to_numpy(),
+            day_stats['close'].to_numpy(),
+            period=timeperiod
+        )
+
         rsi_stats = {
             'time': day_stats['time'],
-            'value': talib.RSI(day_stats["close"], timeperiod=14)
+            'value': pd.Series(rsi_values, index=day_stats.index)
         }
 
-        self._lagging_indicators[timeframe] = {
-            'rsi': rsi_stats
-        }
-
-        return None
+        return rsi_stats
 
     def _get_symbol_info_tick(self, symbol):
-        return mt5.symbol_info_tick(symbol)
+        return self._data_provider.symbol_info_tick(symbol)
 
-    def _get_margin_calculation(self, lot, action, symbol, ask):
-        return mt5.order_calc_margin(action,symbol,lot,ask)
-    
-    def _create_trend_indicators(self, day_stats, timeframe):
-        """Create the trend indicators and store in object attribute (self._indicator_stats_df)
+    def _create_trend_indicators(self, day_stats, timeframe, symbol):
+        """Create the trend indicators
 
         Parameters:
             - day_stats(dataframe): dataframe containting the stats of the given symbol
             - timeframe(str): the given timeframe to create the stats on
+            - symbol(str): the underlying symbol
         
         Returns:
-            - None
+            - dataframe: the stats, with the capitalized OHLC columns and the ATR
         
         """
 
@@ -131,210 +256,489 @@ class ForexAnalyzer:
             inplace=True
         )
 
-        indicators = Indicators(day_stats)
-        indicators.atr(period=50, column_name='atr')
+        day_stats['atr'] = self._indicator_engine.atr(
+            symbol,
+            timeframe,
+            day_stats['time'].to_numpy(),
+            day_stats['High'].to_numpy(),
+            day_stats['Low'].to_numpy(),
+            day_stats['Close'].to_numpy(),
+            period=50
+        )
 
-        self._indicators_stats_df[timeframe] = indicators.df
+        return day_stats
 
-        return None
-
-    def _fetch_data_mt5(self, timeframe, bar_count, symbol=None):
-        """Fetch the data from MT5 servers, based on the given symbol
+    def _copy_rates(self, symbol, timeframe, bar_count, store=True):
+        """Fetch the latest bars of the given symbol from MT5 servers, and keep them in the bar store
 
         Parameters:
+            - symbol(str): the underlying symbol
             - timeframe(str): the given timeframe to fetch the stats
             - bar_count(int): the number of candlesticks to fetch
-            - symbol(str): the underlying symbol
+            - store(bool): whether the bars are written to the bar store
         
         Returns:
-            - dataframe: the statistical data from MT5 for the given symbol 
+            - ndarray: the bars fetched, oldest first
         
         """
 
-        rates = mt5.copy_rates_from(
-            symbol or self._symbol,
+        rates = self._data_provider.copy_rates_from(
+            symbol,
             self._mt5_timeframe_dict[timeframe],
             self.get_current_time(),
             bar_count
         )
 
+        if rates is None:
+            raise RuntimeError(f"copy_rates_from() failed for {symbol}, error code = {self._data_provider.last_error()}")
+
+        if store and self._bar_store is not None:
+            self._bar_store.append(symbol, timeframe, rates)
+
+        return rates
+
+    def _rates_to_frame(self, rates):
         rates = pd.DataFrame(rates)
         rates['time'] = pd.to_datetime(rates['time'], unit='s')
 
         return rates
 
-    def get_digits(self, symbol=None):
-        symbol_info = mt5.symbol_info(symbol or self._symbol)
+    def _count_new_bars(self, last_time, timeframe):
+        """Count the bars to fetch to cover everything since the given bar
 
-        return symbol_info.digits
-    
-    def get_multiplier(self, symbol=None):
-        """Get the multiplier, based on number of digits
+        Parameters:
+            - last_time(datetime): the time of the latest known bar
+            - timeframe(str): the timeframe of the bars
+        
+        Returns:
+            - int: the number of bars to fetch, including the latest known one
+        
+        """
+
+        elapsed = (self.get_current_time() - last_time).total_seconds()
+
+        # The latest known bar is fetched again, as it may still have been forming
+        return max(int(elapsed // self._timeframe_seconds_dict[timeframe]), 0) + 2
+
+    def _merge_new_bars(self, cached_df, new_df):
+        """Merge freshly fetched bars into the cached ones
 
         Parameters:
-            - symbol(str): Get the underlying symbol
+            - cached_df(dataframe): the cached bars
+            - new_df(dataframe): the bars fetched since the latest cached one
         
         Returns:
-            - float: Return the divisor, based on number of decimal places
+            - dataframe: the merged bars, or None if the new bars do not line up with the cache
         
         """
 
-        return 10 ** -self.get_digits(symbol)
+        if new_df.empty or new_df['time'].iat[0] > cached_df['time'].iat[-1]:
+            return None
 
+        kept_df = cached_df[cached_df['time'] < new_df['time'].iat[0]]
 
-    def update_symbol(self, symbol):
-        """Update the symbol, whenever there is a new symbol passed
+        return pd.concat([kept_df, new_df], ignore_index=True)
+
+    def get_rates(self, timeframe, bar_count, symbol):
+        """Get the latest bars of the given symbol, served from the on-disk bar store
+        Only the bars after the latest stored one are fetched from MT5 servers
 
         Parameters:
-            - symbol(str): the new symbol to be updated
+            - timeframe(str): the given timeframe to fetch the stats
+            - bar_count(int): the number of candlesticks to fetch
+            - symbol(str): the underlying symbol
         
         Returns:
-            - None
+            - ndarray: the bars, oldest first
+        
+        """
+
+        if self._bar_store is None:
+            return self._copy_rates(symbol, timeframe, bar_count)
+
+        # Only the count and latest time are read before the new bars are stored
+        stored_count, last_stored_time = self._bar_store.get_extent(symbol, timeframe)
+
+        if stored_count >= bar_count:
+            last_time = pd.to_datetime(last_stored_time, unit='s')
+            new_bar_count = self._count_new_bars(last_time, timeframe)
+
+            if new_bar_count < bar_count:
+                new_rates = self._copy_rates(symbol, timeframe, new_bar_count)
+
+                # Served from the store, unless the new bars left a gap after the stored ones
+                if len(new_rates) and new_rates['time'][0] <= last_stored_time:
+                    return self._bar_store.read(symbol, timeframe, bar_count)
+
+        return self._copy_rates(symbol, timeframe, bar_count)
+
+    def _fetch_data_mt5(self, timeframe, bar_count, symbol):
+        """Fetch the data from MT5 servers, based on the given symbol
+        Repeated requests only fetch the bars after the latest cached one, and identical
+        requests made while one is running share its result
+
+        Parameters:
+            - timeframe(str): the given timeframe to fetch the stats
+            - bar_count(int): the number of candlesticks to fetch
+            - symbol(str): the underlying symbol
+        
+        Returns:
+            - dataframe: the statistical data from MT5 for the given symbol 
         
         """
 
-        self._symbol = symbol
+        return self._fetch_flight.do(
+            (symbol, timeframe, bar_count),
+            self._load_data_mt5, timeframe, bar_count, symbol,
+            copy=pd.DataFrame.copy
+        )
+
+    def _load_data_mt5(self, timeframe, bar_count, symbol):
+
+        cached_df = self._bar_cache.get(symbol, timeframe)
+        rates_df = None
+
+        if cached_df is not None and cached_df.shape[0] >= bar_count:
+            new_bar_count = self._count_new_bars(cached_df['time'].iat[-1], timeframe)
+
+            if new_bar_count < bar_count:
+                rates_df = self._merge_new_bars(
+                    cached_df,
+                    self._rates_to_frame(self._copy_rates(symbol, timeframe, new_bar_count))
+                )
+
+        if rates_df is None:
+            self._bar_cache.record_miss()
+            rates_df = self._rates_to_frame(self.get_rates(timeframe, bar_count, symbol))
+        else:
+            self._bar_cache.record_hit()
+
+            # Keep the cached window at its original size
+            rates_df = rates_df.iloc[-cached_df.shape[0]:].reset_index(drop=True)
+
+        self._bar_cache.put(symbol, timeframe, rates_df)
+
+        return rates_df.iloc[-bar_count:].reset_index(drop=True)
+
+    def fetch_symbols_data(self, timeframe, bar_count, symbols, timeout=FETCH_TIMEOUT_SECONDS):
+        """Fetch the data of many symbols concurrently, on a bounded pool of workers
+        (a single one with the MT5 terminal, which serves one call at a time)
+
+        Parameters:
+            - timeframe(str): the given timeframe to fetch the stats
+            - bar_count(int): the number of candlesticks to fetch, per symbol
+            - symbols(list): the symbols to fetch
+            - timeout(float): the seconds to wait for the whole batch
+        
+        Returns:
+            - dict: the dataframes of the symbols fetched successfully
+            - dict: the error message of the symbols that failed or timed out
+        
+        """
+
+        futures = {
+            symbol: self._fetch_executor.submit(self._fetch_data_mt5, timeframe, bar_count, symbol)
+            for symbol in dict.fromkeys(symbols)
+        }
+
+        # One deadline for the batch: the symbols still queued are cancelled, so they don't hold up the
+        # batches of other requests (a call already running on the terminal can't be interrupted)
+        wait(futures.values(), timeout=timeout)
+
+        symbols_data = {}
+        failed_symbols = {}
+
+        for symbol, future in futures.items():
+
+            if not future.done():
+                future.cancel()
+                failed_symbols[symbol] = f"timed out after {timeout} seconds"
+                continue
+
+            try:
+                rates_df = future.result()
+            except Exception as error:
+                failed_symbols[symbol] = repr(error)
+                continue
+
+            if rates_df.empty:
+                failed_symbols[symbol] = "no data"
+                continue
+
+            symbols_data[symbol] = rates_df
+
+        if failed_symbols:
+            logging.warning(f"Failed to fetch {timeframe} data for {len(failed_symbols)} symbol(s): {failed_symbols}")
+
+        return symbols_data, failed_symbols
+
+    def get_symbol_tick(self, symbol):
+        return self._get_symbol_info_tick(symbol)
+
+    def get_latest_bars(self, timeframe, bar_count, symbol):
+        """Get the few latest bars of the given symbol, bypassing the caches (for live updates)
+        The cached bars are brought up to date, but the forming candle changes on every tick:
+        the bar store is only written once a bar closes
+
+        Parameters:
+            - timeframe(str): the given timeframe to fetch the stats
+            - bar_count(int): the number of candlesticks to fetch
+            - symbol(str): the underlying symbol
+        
+        Returns:
+            - dataframe: the latest bars, oldest first
+        
+        """
+
+        rates = self._copy_rates(symbol, timeframe, bar_count, store=False)
+        latest_df = self._rates_to_frame(rates)
+
+        cached_df = self._bar_cache.get(symbol, timeframe)
+
+        if cached_df is not None:
+            merged_df = self._merge_new_bars(cached_df, latest_df)
+
+            if merged_df is not None:
+                self._bar_cache.put(symbol, timeframe, merged_df.iloc[-cached_df.shape[0]:].reset_index(drop=True))
+
+        if self._bar_store is not None and len(rates) > 1:
+            self._store_closed_bars(symbol, timeframe, rates)
+
+        return latest_df
+
+    def _store_closed_bars(self, symbol, timeframe, rates):
+        """Write the latest bars to the bar store, when a bar closed since they were last written
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+            - rates(ndarray): the latest bars, the last one still forming
+
+        Returns:
+            - None
+
+        """
+
+        key = (symbol, timeframe)
+        closed_time = rates['time'][-2]
+
+        with self._stored_closed_lock:
+            if self._stored_closed_times.get(key) == closed_time:
+                return None
+
+            self._stored_closed_times[key] = closed_time
+
+        self._bar_store.append(symbol, timeframe, rates)
+
         return None
 
-    def get_current_time(self, addition_hours=3):
-        """Get the current time, based on the timezone
+    def get_live_rsi(self, timeframe, latest_bars, symbol):
+        """Get the RSI of the latest bars, continuing from the last get_daily_stats computation
 
         Parameters:
-            - additional_hours(int): the extra hours to be added in
+            - timeframe(str): the timeframe of the bars
+            - latest_bars(dataframe): the latest bars, starting at or before the last closed bar already seen
+            - symbol(str): the underlying symbol
         
         Returns:
-            - datetime: datetime object that is ahead, based on the addition_hours
+            - series: the RSI values of the latest bars (NaN when they don't follow the bars already seen)
         
         """
 
-        # Local time is 3 hours behind
-        return datetime.now()  + timedelta(hours=addition_hours)
-    
-    def get_heiken_ashi(self, timeframe):
-        return self._heiken_ashi_df[timeframe]
+        rsi_values = self._indicator_engine.rsi(
+            symbol,
+            timeframe,
+            latest_bars['time'].to_numpy(),
+            latest_bars['close'].to_numpy(),
+            period=14,
+            extend_only=True
+        )
+
+        return pd.Series(rsi_values, index=latest_bars.index)
 
-    def get_lagging_indicator(self,timeframe, indicator):
-        """Get the respective lagging indicator, based on the timeframe
+    def get_live_atr(self, timeframe, latest_bars, symbol):
+        """Get the ATR of the latest bars, continuing from the last get_daily_stats computation
 
         Parameters:
-            - indicator(str): the indicator to fetch
-            - timeframe(str): the timeframe to fetch in
+            - timeframe(str): the timeframe of the bars
+            - latest_bars(dataframe): the latest bars, starting at or before the last closed bar already seen
+            - symbol(str): the underlying symbol
         
         Returns:
-            - dataframe: dataframe containing the indicator stats
+            - series: the ATR values of the latest bars (NaN when they don't follow the bars already seen)
         
         """
 
-        return self._lagging_indicators[timeframe][indicator]
+        atr_values = self._indicator_engine.atr(
+            symbol,
+            timeframe,
+            latest_bars['time'].to_numpy(),
+            latest_bars['high'].to_numpy(),
+            latest_bars['low'].to_numpy(),
+            latest_bars['close'].to_numpy(),
+            period=50,
+            extend_only=True
+        )
 
-    def get_trend_indicators(self, timeframe):
-        """Get the trend indicators, based on the timeframe
+        return pd.Series(atr_values, index=latest_bars.index)
+
+    def get_digits(self, symbol):
+        return self._symbol_registry.get(symbol).digits
+    
+    def get_multiplier(self, symbol):
+        """Get the multiplier, based on number of digits
 
         Parameters:
-            - timeframe(str): the timeframe to fetch in
+            - symbol(str): Get the underlying symbol
         
         Returns:
-            - dataframe: dataframe containing the indicator stats
+            - float: Return the divisor, based on number of decimal places
         
         """
 
-        return self._indicators_stats_df[timeframe]
+        return self._symbol_registry.get(symbol).multiplier
+
+
+    def get_current_time(self, addition_hours=3):
+        """Get the current time, based on the timezone
 
-    def get_daily_stats(self, timeframe='15M', bar_count=100):
+        Parameters:
+            - additional_hours(int): the extra hours to be added in
+        
+        Returns:
+            - datetime: datetime object that is ahead, based on the addition_hours
+        
+        """
+
+        # Local time is 3 hours behind
+        return datetime.now()  + timedelta(hours=addition_hours)
+    
+    def get_bar_cache_stats(self):
+        """Get the hit/miss counters and memory usage of the bar cache
+        """
+
+        return self._bar_cache.get_stats()
+
+    def get_fetch_flight_stats(self):
+        """Get the counters of the fetches, and how many were deduplicated by a fetch in flight
+        """
+
+        return self._fetch_flight.get_stats()
+
+    def get_daily_stats(self, timeframe, bar_count, symbol):
         """Get the data of the symbol, based on the timeframe and candlesticks
         This is followed by creating the lagging and trend indicators
 
         Parameters:
             - timeframe(str): the timeframe to fetch in
             - bar_count(int): how many candlesticks to fetch
+            - symbol(str): the underlying symbol
         
         Returns:
-            - dataframe: dataframe containing the symbol stats
+            - DailyStats: the bars of the symbol, with their RSI, trend indicators, heiken ashi bars
+              and support and resistance zones
         
         """
 
-        rates_df = self._fetch_data_mt5(timeframe, bar_count)
+        rates_df = self._fetch_data_mt5(timeframe, bar_count, symbol)
 
-        self._calculate_lagging_indicators(rates_df, timeframe)
-        self._create_trend_indicators(rates_df.copy(), timeframe)
-        self._create_heiken_ashi(rates_df, timeframe)
-
-        return rates_df
+        return DailyStats(
+            symbol=symbol,
+            timeframe=timeframe,
+            rates=rates_df,
+            rsi=self._calculate_lagging_indicators(rates_df, timeframe, symbol),
+            trend_indicators=self._create_trend_indicators(rates_df.copy(), timeframe, symbol),
+            heiken_ashi=self._create_heiken_ashi(rates_df, timeframe, symbol),
+            zones=self._support_resistance.update(symbol, timeframe, rates_df)
+        )
 
     def get_currency_strength(self):
-        """Get the strength of the symbol for currency strength analysis
+        """Get the strength of the major currencies, from every cross between them, on every timeframe
 
-        Parameters:
-            - symbol(str): the given symbol
-        
         Returns:
-            - float: the strength of the given symbol
+            - dataframe: the strength (% log return against the basket of majors) of each currency
+              (rows, strongest first) on each timeframe (columns)
         
         """
-        currency_strength = {
-            'JPY': 0.00
-        }
 
-        for symbol in self._currency_strength_list:
+        crosses = self._strength_engine.find_crosses({
+            symbol: (symbol_meta.currency_base, symbol_meta.currency_profit)
+            for symbol, symbol_meta in ((symbol, self._symbol_registry.get(symbol)) for symbol in self.get_symbol_list())
+        })
 
-            rates_df = self._fetch_data_mt5('1W', 5, symbol)
+        # One bulk fetch per timeframe, aligned on time so every cross ends on the same bar
+        returns = {}
 
-            close_price_series = rates_df['close']
+        for timeframe, lookback in STRENGTH_LOOKBACKS.items():
+            symbols_data, _ = self.fetch_symbols_data(timeframe, lookback + 1, list(crosses))
+            times, symbols, closes = self._correlation_engine.align_closes(symbols_data)
 
-            oldest_close_price = close_price_series.iat[0]
-            current_close_price = close_price_series.iat[-1]
+            symbol_returns = dict(zip(symbols, self._strength_engine.period_returns(closes, lookback)))
+            returns[timeframe] = [symbol_returns.get(symbol, np.nan) for symbol in crosses]
 
-            percentage_strength = ((current_close_price - oldest_close_price)/oldest_close_price) * 100
-            currency_strength[symbol[:3]] = round(percentage_strength,3)
+        strengths = self._strength_engine.solve(list(crosses.values()), np.array(list(returns.values())).T)
 
-        # Sort out dictionary in descending order
-        currency_strength = dict(
-            sorted(currency_strength.items(), key=lambda item: item[1], reverse=True)
-        )
+        # Currencies without any cross listed by the broker are left out
+        strength_df = pd.DataFrame(strengths * 100, index=self._strength_engine.get_currencies(), columns=list(returns)).dropna(how='all')
 
-        return currency_strength
+        return strength_df.loc[strength_df.mean(axis=1).sort_values(ascending=False).index].round(3)
 
-    def get_currency_correlations(self, symbols_list):
-        """Get the correlations between different currency pairs
+    def scan_divergences(self, symbols_list=None, timeframes=DIVERGENCE_TIMEFRAMES):
+        """Find the RSI divergences of many symbols, on several timeframes
 
         Parameters:
-            - symbols_list(list): the list of symbols
+            - symbols_list(list): the symbols to scan (all of them if empty)
+            - timeframes(list): the timeframes to scan
 
         Returns:
-            - dataframe: the dataframe containing the correlated data
+            - dataframe: the divergences found, the largest RSI change first
+            - dict: the error message of the symbols that failed, per timeframe
+
         """
 
-        currency_correlation_df = pd.DataFrame()
+        symbols_list = [symbol for symbol in (symbols_list or []) if symbol] or self.get_symbol_list()
 
-        for currency_pair in symbols_list:
-            # 1. Fetch the last 30 days data, in 4-hour intervals
-            # 1 day = 24 hours (6 4-hour intervals); 30 days = (6 * 30 = 180)
-            data = self._fetch_data_mt5('4H', 180, currency_pair)
+        timeframes_data = {}
+        failed_symbols = {}
 
-            # 2. Fetch only the closing price of the given pair
-            currency_correlation_df[currency_pair] = data['close']
+        # One bulk fetch per timeframe, the scan itself runs on the worker processes
+        for timeframe in timeframes:
+            timeframes_data[timeframe], failed = self.fetch_symbols_data(timeframe, DIVERGENCE_BAR_COUNT, symbols_list)
 
-        return currency_correlation_df.corr().round(3)
+            if failed:
+                failed_symbols[timeframe] = failed
 
-    def get_symbol_list(self):
-        """Get all the symbols list from MT5
+        return self._divergence_scanner.scan(timeframes_data, DIVERGENCE_BAR_COUNT), failed_symbols
+
+    def get_currency_correlations(self, symbols_list=None, timeframe='4H', window=None):
+        """Get the correlations between different currency pairs, from the log returns of their closes aligned on time
+
+        Parameters:
+            - symbols_list(list): the list of symbols (the whole broker universe if empty)
+            - timeframe(str): the timeframe of the bars
+            - window(int): the number of latest bars of the rolling correlations (the whole period if None)
+
+        Returns:
+            - dataframe: the dataframe containing the correlated data
         """
 
-        if self._full_currency_list:
-            return self._full_currency_list
+        symbols_list = [symbol for symbol in symbols_list or [] if symbol] or self.get_symbol_list()
+
+        symbols_data, _ = self.fetch_symbols_data(timeframe, CORRELATION_BAR_COUNTS[timeframe], symbols_list)
+        times, symbols, closes = self._correlation_engine.align_closes(symbols_data)
 
-        symbols = mt5.symbols_get()
+        if window:
+            correlations = self._correlation_engine.rolling_correlation_matrix((timeframe, tuple(symbols)), times, symbols, closes, window)
+        else:
+            correlations = self._correlation_engine.correlation_matrix(closes)
 
-        for symbol in symbols:
+        return pd.DataFrame(correlations, index=symbols, columns=symbols).round(3)
 
-            symbol = symbol.name
+    def get_symbol_list(self):
+        """Get all the symbols list from MT5, in alphabetical order
+        """
 
-            if 'JPY' in symbol:
-                self._currency_strength_list.append(symbol)
-            
-            self._full_currency_list.append(symbol)
-    
-        return self._full_currency_list
+        return self._symbol_registry.get_names()
 
     def get_symbol_volume(self):
         """Get the volume data, based on the weekly timeframe
@@ -342,8 +746,9 @@ class ForexAnalyzer:
 
         symbol_info_list = []
 
-        for symbol in self._full_currency_list:
-            data = self._fetch_data_mt5('1W', 1, symbol)
+        symbols_data, _ = self.fetch_symbols_data('1W', 1, self.get_symbol_list())
+
+        for symbol, data in symbols_data.items():
             symbol_info_list.append({
                 'symbol': symbol,
                 'volume': data['tick_volume'].iat[0]
@@ -360,21 +765,44 @@ class ForexAnalyzer:
         return symbols_only
 
     def calculate_margin(self, action_type, lot_size, symbol):
+        """Get the margin of a position, at the latest price
 
-        # Find the MT5 action for Buy/Sell
-        mt5_action = None
-        price = None
+        Parameters:
+            - action_type(str): 'buy' or 'sell'
+            - lot_size(str): the lots of the position
+            - symbol(str): the underlying symbol
 
-        symbol_data = self._get_symbol_info_tick(symbol)
+        Returns:
+            - float: the margin required
 
-        if action_type == 'buy':
-            mt5_action = mt5.ORDER_TYPE_BUY
-            price = symbol_data.ask
-        else:
-            mt5_action = mt5.ORDER_TYPE_SELL
-            price = symbol_data.bid
+        """
+
+        return self._risk_engine.calculate_margin(symbol, action_type, float(lot_size))
+
+    def calculate_risk(self, symbols, lot_sizes, balance, buffer_balance, stop_loss_points, profit_target, profit_trades):
+        """Get the margin and position sizing of every symbol, side and lot size, at the latest prices
+
+        Parameters:
+            - symbols(list): the symbols (all of them if empty)
+            - lot_sizes(list): the lot sizes
+            - balance(float): the account balance
+            - buffer_balance(float): the balance not to go under
+            - stop_loss_points(float): the points lost by a losing trade
+            - profit_target(float): the profit aimed for
+            - profit_trades(int): the trades to reach the profit target in
+
+        Returns:
+            - dataframe: one row per symbol, side and lot size
+            - dict: the error message of the symbols that failed
+
+        """
+
+        risk_df, failed_symbols = self._risk_engine.calculate_risk(
+            symbols or self.get_symbol_list(),
+            lot_sizes, balance, buffer_balance, stop_loss_points, profit_target, profit_trades
+        )
 
-        price = float(price)
-        lot_size = float(lot_size)
+        if failed_symbols:
+            logging.warning(f"Failed to quote {len(failed_symbols)} symbol(s): {failed_symbols}")
 
-        return self._get_margin_calculation(float(lot_size), mt5_action, symbol, price)
+        return risk_df, failed_symbols
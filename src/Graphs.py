@@ -1,43 +1,244 @@
-from datetime import datetime
+from collections import OrderedDict
+
+from src.CorrelationEngine import CorrelationEngine
+from src.Downsampler import Downsampler
+from src.FigureCache import FigureCache, cached_figure
+from src.Metrics import METRICS
 
 import plotly.graph_objects as go
 import pandas as pd
-import plotly.figure_factory as ff
 
 import logging
+import numpy as np
+import threading
+
+RANGEBREAKS_CACHE_SIZE = 256
+FIGURE_CACHE_SIZE = 128
+
+# Plot width assumed until the browser reports it, and the pixels given to each candle
+DEFAULT_TARGET_WIDTH = 1200
+PIXELS_PER_CANDLE = 2
+
+LINE_COLOR = '#1f77b4'
+
+ZONE_COLORS = {
+    'support': 'green',
+    'resistance': 'red',
+    'pivot': 'gray'
+}
+
+# Correlation heatmaps write their cell values up to this number of symbols (hover only above)
+HEATMAP_LABELS_MAX_SYMBOLS = 40
+HEATMAP_LABEL_FONT_SIZE = 9
+HEATMAP_CELL_PIXELS = 18
+HEATMAP_MAX_HEIGHT = 1800
+
+# Points kept on the closed bars trace, when live updates extend it
+LIVE_MAX_POINTS = 5000
+LIVE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 class Graphs:
 
     def __init__(self):
-        self._symbol = None
-        self._digits_precision = None
 
-    def update_symbol(self, symbol, digits):
-        self._symbol = symbol
-        self._digits_precision = digits
+        # (symbol, timeframe, first bar, last bar, bar count) -> rangebreaks
+        self._rangebreaks_cache = OrderedDict()
+        self._rangebreaks_lock = threading.Lock()
 
-        return None
+        self._figure_cache = FigureCache(FIGURE_CACHE_SIZE)
+
+        self._downsampler = Downsampler()
 
-    def _find_earlier_hour_today(self, data_day):
+        self._correlation_engine = CorrelationEngine()
 
-        # Find the earliest point in the day
-        current_date_time = datetime.strptime(str(data_day['time'].iat[-1]), "%Y-%m-%d %H:%M:%S")
-        current_date_time = datetime.combine(current_date_time, datetime.min.time())
+    def get_figure_cache_stats(self):
+        return self._figure_cache.get_stats()
 
-        return current_date_time
+    def slice_today(self, data):
+        """Get the bars of the day of the latest bar, shared by the daily figures
+
+        Parameters:
+            - data(dataframe): the bars, oldest first
+
+        Returns:
+            - dataframe: the bars since midnight of the latest bar's day (a view, not a copy)
+
+        """
+
+        if data.empty:
+            return data
+
+        # The bars are sorted: the day starts at the first bar after midnight
+        start = data['time'].searchsorted(data['time'].iat[-1].normalize())
+
+        return data.iloc[start:]
 
     def _filter_missing_dates(self, data, timeframe):
+        """Find the days without any bar, between the first and the last bar
+
+        Parameters:
+            - data(dataframe): the bars, oldest first
+            - timeframe(str): the timeframe of the bars
+
+        Returns:
+            - ndarray: the missing days (datetime64[D])
+
+        """
+
+        days = data['time'].to_numpy().astype('datetime64[D]')
+
+        # The bars are sorted, so the distinct days are where the day changes
+        present_days = days[np.concatenate([[True], days[1:] != days[:-1]])]
+
+        day_gaps = np.diff(present_days).astype(np.int64)
+        gap_positions = np.flatnonzero(day_gaps > 1)
+
+        gap_starts = present_days[gap_positions] + 1
+        gap_lengths = day_gaps[gap_positions] - 1
+
+        # Expand every gap into its days: start + 0, 1, ..., length - 1
+        offsets = np.arange(gap_lengths.sum()) - np.repeat(np.cumsum(gap_lengths) - gap_lengths, gap_lengths)
+
+        return np.repeat(gap_starts, gap_lengths) + offsets
+
+    def _find_session_break(self, data):
+        """Find the hours of the day never covered by an intraday bar, as one contiguous block
+
+        Parameters:
+            - data(dataframe): the bars, oldest first
+
+        Returns:
+            - list: the [start, end] hours of the break, or None if there is none
+
+        """
+
+        times = data['time'].to_numpy().astype('datetime64[s]').astype(np.int64)
+
+        if times.shape[0] < 2:
+            return None
+
+        bar_hours = int(np.diff(times).min()) // 3600
+
+        if bar_hours < 1 or bar_hours >= 24 or 24 % bar_hours:
+            return None
+
+        # Mark the hours covered by each bar, e.g. a 4H bar at 08:00 covers 08:00 to 12:00
+        start_hours = np.unique((times // 3600) % 24)
+        covered = np.zeros(24, dtype=bool)
+        covered[(start_hours[:, None] + np.arange(bar_hours)) % 24] = True
+
+        if covered.all():
+            return None
+
+        # Only a single break per day is supported, e.g. [22, 1] for 22:00 to 01:00
+        break_starts = np.flatnonzero(~covered & np.roll(covered, 1))
+        break_ends = np.flatnonzero(covered & np.roll(~covered, 1))
+
+        if break_starts.shape[0] != 1:
+            return None
 
-        # build complete timeline from start date to end date
-        all_dates = pd.date_range(start=data['time'].iat[0],end=data['time'].iat[-1])
+        return [int(break_starts[0]), int(break_ends[0])]
 
-        # retrieve the dates that ARE in the original datset
-        original_dates = [d.strftime("%Y-%m-%d") for d in data['time']]
+    @METRICS.timed(METRICS.stage_seconds)
+    def _find_rangebreaks(self, data, timeframe, symbol):
+        """Build the x-axis rangebreaks hiding the periods without bars, memoized per series
 
-        # define dates with missing values
-        break_dates = [d for d in all_dates.strftime("%Y-%m-%d").tolist() if not d in original_dates]
+        Parameters:
+            - data(dataframe): the bars (or a dict with their 'time' series), oldest first
+            - timeframe(str): the timeframe of the bars
+            - symbol(str): the underlying symbol
 
-        return break_dates
+        Returns:
+            - list: the rangebreaks (weekend and session bounds, then the missing days)
+
+        """
+
+        cache_key = (symbol, timeframe, data['time'].iat[0], data['time'].iat[-1], len(data['time']))
+
+        with self._rangebreaks_lock:
+            if cache_key in self._rangebreaks_cache:
+                self._rangebreaks_cache.move_to_end(cache_key)
+                return self._rangebreaks_cache[cache_key]
+
+        missing_dates = self._filter_missing_dates(data, timeframe)
+
+        rangebreaks = []
+
+        # Weekdays, from 0 (Monday) to 6 (Sunday)
+        bar_weekdays = (data['time'].to_numpy().astype('datetime64[D]').astype(np.int64) + 3) % 7
+        missing_weekdays = (missing_dates.astype(np.int64) + 3) % 7
+
+        if missing_dates.shape[0] and not (bar_weekdays >= 5).any():
+            rangebreaks.append(dict(bounds=['sat', 'mon']))
+            missing_dates = missing_dates[missing_weekdays < 5]
+
+        session_break = self._find_session_break(data)
+
+        if session_break:
+            rangebreaks.append(dict(bounds=session_break, pattern='hour'))
+
+        if missing_dates.shape[0]:
+            rangebreaks.append(dict(values=np.datetime_as_string(missing_dates).tolist()))
+
+        with self._rangebreaks_lock:
+            self._rangebreaks_cache[cache_key] = rangebreaks
+
+            if len(self._rangebreaks_cache) > RANGEBREAKS_CACHE_SIZE:
+                self._rangebreaks_cache.popitem(last=False)
+
+        return rangebreaks
+
+    def _slice_x_range(self, data, x_range):
+        """Keep the bars within the zoomed x-axis range
+
+        Parameters:
+            - data(dataframe): the bars (or a dict of series with a 'time' series)
+            - x_range(list): the [start, end] of the x-axis, or None for everything
+
+        Returns:
+            - dataframe: the bars within the range (all of them if none are)
+
+        """
+
+        if not x_range:
+            return data
+
+        times = data['time']
+        in_range = ((times >= pd.Timestamp(x_range[0])) & (times <= pd.Timestamp(x_range[1]))).to_numpy()
+
+        if not in_range.any():
+            return data
+
+        if isinstance(data, dict):
+            return {key: series[in_range] for key, series in data.items()}
+
+        return data[in_range]
+
+    def _downsample_line(self, data, y_column, width):
+        """Keep the points of a line needed to draw it at the given width (LTTB)
+
+        Parameters:
+            - data(dataframe): the points (or a dict of series with a 'time' series)
+            - y_column(str): the column holding the y values
+            - width(int): the plot width, in pixels
+
+        Returns:
+            - dataframe: the points kept
+
+        """
+
+        positions = self._downsampler.lttb(data['time'].to_numpy(), data[y_column].to_numpy(), width or DEFAULT_TARGET_WIDTH)
+
+        return self._take_rows(data, positions)
+
+    def _take_rows(self, data, positions):
+        """Select rows by position, from a dataframe or a dict of series
+        """
+
+        if isinstance(data, dict):
+            return {key: series.iloc[positions] for key, series in data.items()}
+
+        return data.iloc[positions]
 
     def _draw_hline(self, fig, y_val, line_dash, line_col, annotation=None):
 
@@ -51,35 +252,68 @@ class Graphs:
         
         return None
 
-    def _fill_missing_dates(self, fig, data_day, timeframe):
+    def _draw_zones(self, fig, zones):
+        """Shade the support and resistance zones across the whole graph
+
+        Parameters:
+            - fig(Figure): the candlestick figure
+            - zones(dataframe): the low, high, touches and kind of each zone
+
+        Returns:
+            - None
+
+        """
+
+        for zone in zones.itertuples(index=False):
+            fig.add_hrect(
+                y0=zone.low,
+                y1=zone.high,
+                fillcolor=ZONE_COLORS[zone.kind],
+                opacity=0.15,
+                line_width=0,
+                layer='below',
+                annotation_text=f"{zone.kind} ({zone.touches})",
+                annotation_position='right',
+                annotation_font_size=10
+            )
 
-        missing_dates = self._filter_missing_dates(data_day, timeframe)
-        logging.info(missing_dates)
+        return None
+
+    def _fill_missing_dates(self, fig, data_day, timeframe, symbol):
+
+        rangebreaks = self._find_rangebreaks(data_day, timeframe, symbol)
+        logging.info(rangebreaks)
 
         fig.update_xaxes(
-            rangebreaks=[
-                dict(
-                    values=missing_dates
-                )
-            ]
+            rangebreaks=rangebreaks
         )
 
         return None
 
-    def plot_atr(self, data, data_day, timeframe):
+    @METRICS.timed(METRICS.plot_seconds)
+    @cached_figure
+    def plot_atr(self, data, data_day, timeframe, symbol, digits, width=None, x_range=None):
+
+        current_atr = data['atr'].iat[-1]
+
+        data = self._slice_x_range(data, x_range)
+        data_day = self._slice_x_range(data_day, x_range)
+
+        # The segment to the latest (forming) bar is a trace of its own, so live updates can replace it
+        line_data = self._downsample_line(data.iloc[:-1], 'atr', width)
+        forming_segment = data.iloc[-2:]
         
         atr_fig = go.Figure([
             go.Scatter(
-                x=data['time'], 
-                y=data['atr'],
-                mode="lines"
-            )
+                x=points['time'], 
+                y=points['atr'],
+                mode="lines",
+                line_color=LINE_COLOR
+            ) for points in [line_data, forming_segment]
         ])
-        
-        current_atr = data['atr'].iat[-1]
 
         atr_fig.update_layout(
-            title=f"{self._symbol} - ATR (Current value: {current_atr: .{self._digits_precision}f})",
+            title=f"{symbol} - ATR (Current value: {current_atr: .{digits}f})",
             template='simple_white',
             xaxis_title="Time",
             hovermode='x',
@@ -88,23 +322,33 @@ class Graphs:
             yaxis={'visible': False, 'showticklabels': False}
         )
 
-        self._fill_missing_dates(atr_fig, data_day, timeframe)
+        self._fill_missing_dates(atr_fig, data_day, timeframe, symbol)
 
         return atr_fig
 
-    def plot_candlesticks_fullday(self, data_day, timeframe, indicators_df):
+    @METRICS.timed(METRICS.plot_seconds)
+    @cached_figure
+    def plot_candlesticks_fullday(self, data_day, timeframe, indicators_df, symbol, width=None, x_range=None, zones=None):
+
+        data_day = self._slice_x_range(data_day, x_range)
+
+        # The latest (forming) candle is a trace of its own, so live updates can replace it. The bars
+        # closing afterwards are appended to an undecimated trace, not to the downsampled candles
+        candles = self._downsampler.ohlc(data_day.iloc[:-1], (width or DEFAULT_TARGET_WIDTH) // PIXELS_PER_CANDLE - 1)
+        live_candles = data_day.iloc[:0]
+        forming_candle = data_day.iloc[-1:]
 
         candlesticks_minute_fig = go.Figure(
             data=[
                 go.Candlestick(
-                    x=data_day['time'],
-                    open=data_day['open'], 
-                    high=data_day['high'],
-                    low=data_day['low'], 
-                    close=data_day['close'],
+                    x=bars['time'],
+                    open=bars['open'], 
+                    high=bars['high'],
+                    low=bars['low'], 
+                    close=bars['close'],
                     hoverinfo='none',
                     showlegend=False
-                )
+                ) for bars in [candles, live_candles, forming_candle]
             ]
         )
 
@@ -117,7 +361,7 @@ class Graphs:
         )
 
         candlesticks_minute_fig.update_layout(
-            title=f"{self._symbol} - Series ({timeframe})",
+            title=f"{symbol} - Series ({timeframe})",
             xaxis_title="Time",
             yaxis_title="Price",
             hovermode='x',
@@ -125,50 +369,163 @@ class Graphs:
             legend=legend_config
         )
 
-        self._fill_missing_dates(candlesticks_minute_fig, data_day, timeframe)
+        if zones is not None:
+            self._draw_zones(candlesticks_minute_fig, zones)
+
+        self._fill_missing_dates(candlesticks_minute_fig, data_day, timeframe, symbol)
         
         return candlesticks_minute_fig
 
-    def plot_rsi_figure(self, rsi_today):
+    @METRICS.timed(METRICS.plot_seconds)
+    @cached_figure
+    def plot_rsi_figure(self, rsi_today, symbol, width=None, x_range=None):
+
+        current_rsi = rsi_today['value'].iloc[-1]
+
+        rsi_today = self._slice_x_range(rsi_today, x_range)
+
+        # The segment to the latest (forming) bar is a trace of its own, so live updates can replace it
+        line_data = self._downsample_line(self._take_rows(rsi_today, slice(None, -1)), 'value', width)
+        forming_segment = self._take_rows(rsi_today, slice(-2, None))
 
         rsi_fig = go.Figure([
             go.Scatter(
-                x=rsi_today['time'], 
-                y=rsi_today['value'],
-                mode="lines"
-            )
+                x=points['time'], 
+                y=points['value'],
+                mode="lines",
+                line_color=LINE_COLOR,
+                showlegend=False
+            ) for points in [line_data, forming_segment]
         ])
 
-        current_rsi = rsi_today['value'].iloc[-1]
-
         rsi_fig.update_layout(
             xaxis_title="Time",
             yaxis_title=f"RSI Value",
             yaxis_range=[0,100],
             yaxis_dtick=10,
-            title=f"RSI of {self._symbol} - Period: 14 (Current: {current_rsi:.2f})",
+            title=f"RSI of {symbol} - Period: 14 (Current: {current_rsi:.2f})",
             hovermode='x',
             yaxis_tickformat='.2f'
         )
 
-        self._fill_missing_dates(rsi_fig, rsi_today, '15M')
+        self._fill_missing_dates(rsi_fig, rsi_today, '15M', symbol)
 
         return rsi_fig
 
-    def display_symbol_strength(self, data):
+    def get_live_candlestick_update(self, latest_bars, closed_bars):
+        """Build the extendData update of the candlestick figure, from the latest bars
+
+        Parameters:
+            - latest_bars(dataframe): the latest bars, the last one still forming
+            - closed_bars(int): how many bars before the forming one closed since the last update
+
+        Returns:
+            - list: the extendData update (data, trace indices, maximum points)
+
+        """
+
+        closed = latest_bars.iloc[-1 - closed_bars:-1]
+        forming = latest_bars.iloc[-1:]
+
+        update_data = {
+            column: [closed[column].tolist(), forming[column].tolist()]
+            for column in ['open', 'high', 'low', 'close']
+        }
+        update_data['x'] = [closed['time'].dt.strftime(LIVE_TIME_FORMAT).tolist(), forming['time'].dt.strftime(LIVE_TIME_FORMAT).tolist()]
+
+        max_points = {column: [LIVE_MAX_POINTS, 1] for column in update_data}
+
+        return [update_data, [1, 2], max_points]
+
+    def get_live_line_update(self, latest_bars, indicator_values, closed_bars):
+        """Build the extendData update of an indicator figure (RSI or ATR), from the indicator of the latest bars
+
+        Parameters:
+            - latest_bars(dataframe): the latest bars, the last one still forming
+            - indicator_values(series): the indicator values of the latest bars
+            - closed_bars(int): how many bars before the forming one closed since the last update
+
+        Returns:
+            - list: the extendData update (data, trace indices, maximum points)
+
+        """
+
+        times = latest_bars['time'].dt.strftime(LIVE_TIME_FORMAT).tolist()
+        values = indicator_values.tolist()
+
+        update_data = {
+            'x': [times[-1 - closed_bars:-1], times[-2:]],
+            'y': [values[-1 - closed_bars:-1], values[-2:]]
+        }
+
+        max_points = {column: [LIVE_MAX_POINTS, 2] for column in update_data}
+
+        return [update_data, [0, 1], max_points]
+
+    def get_live_day_updates(self, latest_bars, closed_bars, forming_index, multiplier):
+        """Build the extendData updates of the points and volume figures of the day, from the latest bars
+
+        Parameters:
+            - latest_bars(dataframe): the latest bars, the last one still forming
+            - closed_bars(int): how many bars before the forming one closed since the last update
+            - forming_index(int): the position of the forming bar in the day
+            - multiplier(float): the price of a point
 
-        roc_values = list(data.values())
-        marker_colors = ['green' if roc > 0 else 'red' for roc in roc_values]
+        Returns:
+            - list: the extendData update of the points figure
+            - list: the extendData update of the volume figure
+
+        """
+
+        positions = np.arange(forming_index - latest_bars.shape[0] + 1, forming_index + 1)
+        points = np.round((latest_bars['close'].to_numpy() - latest_bars['open'].to_numpy()) / multiplier)
+        colors = np.where(points > 0, 'green', 'red')
+        volumes = latest_bars['tick_volume'].to_numpy()
+
+        closed = slice(latest_bars.shape[0] - 1 - closed_bars, -1)
+
+        points_data = {
+            'x': [positions[closed].tolist(), positions[-1:].tolist()],
+            'y': [np.abs(points[closed]).astype(int).tolist(), np.abs(points[-1:]).astype(int).tolist()],
+            'marker.color': [colors[closed].tolist(), colors[-1:].tolist()]
+        }
+
+        # The segment to the forming bar starts at the previous bar, unless the forming one opened the day
+        segment = slice(-2 if forming_index > 0 else -1, None)
+        segment_length = len(positions[segment])
+
+        volume_data = {
+            'x': [positions[closed].tolist(), positions[segment].tolist()],
+            'y': [volumes[closed].tolist(), volumes[segment].tolist()]
+        }
+
+        return [
+            [points_data, [0, 1], {column: [LIVE_MAX_POINTS, 1] for column in points_data}],
+            [volume_data, [0, 1], {column: [LIVE_MAX_POINTS, segment_length] for column in volume_data}]
+        ]
+
+    @METRICS.timed(METRICS.plot_seconds)
+    @cached_figure
+    def display_symbol_strength(self, strength_df):
+        """Plot the strength of the currencies, grouped by currency with one bar per timeframe
+
+        Parameters:
+            - strength_df(dataframe): the strength of each currency (rows) on each timeframe (columns)
+
+        Returns:
+            - figure: the grouped bar chart
+
+        """
 
         bar_fig = go.Figure(
             [
                 go.Bar(
-                    x=list(data.keys()), 
-                    y=roc_values,
-                    marker_color=marker_colors,
-                    name='ROC',
-                    opacity=0.35
-                )
+                    x=strength_df.index.tolist(),
+                    y=strength_df[timeframe].to_numpy(),
+                    name=timeframe,
+                    opacity=0.6,
+                    hovertemplate=f"{timeframe}: %{{y:.3f}}%<extra></extra>"
+                ) for timeframe in strength_df.columns
             ]
         )
 
@@ -176,16 +533,19 @@ class Graphs:
 
         bar_fig.update_layout(
             template='simple_white',
-            xaxis_title="Symbol",
-            yaxis_title="Strength",
-            title=f"Symbol Strength (with JPY as the apple) - Recent 5 weeks",
+            xaxis_title="Currency",
+            yaxis_title="Strength (%)",
+            title=f"Currency Strength against the majors - last day (1H), 5 days (4H) and 5 weeks (1W)",
+            barmode='group',
             hovermode='x unified',
             height=700
         )
 
         return bar_fig
 
-    def plot_heiken_ashi(self, data, indicator_df):
+    @METRICS.timed(METRICS.plot_seconds)
+    @cached_figure
+    def plot_heiken_ashi(self, data, indicator_df, symbol):
 
         candlesticks_fig = go.Figure(
             data=[
@@ -222,7 +582,7 @@ class Graphs:
         )
 
         candlesticks_fig.update_layout(
-            title=f"{self._symbol} - Series (15M)",
+            title=f"{symbol} - Series (15M)",
             xaxis_title="Time",
             yaxis_title="Price",
             hovermode='x',
@@ -231,63 +591,107 @@ class Graphs:
             legend=legend_config
         )
 
-        self._fill_missing_dates(candlesticks_fig, data, '15M')
+        self._fill_missing_dates(candlesticks_fig, data, '15M', symbol)
         
         return candlesticks_fig
 
-    def plot_correlation_heatmap(self, correlation_df):
-        currency_pairs = list(correlation_df.columns)
-        values = correlation_df.values.tolist()
+    @METRICS.timed(METRICS.plot_seconds)
+    @cached_figure
+    def plot_correlation_heatmap(self, correlation_df, cluster=True):
+        """Plot the correlation matrix as a heatmap
+        The cell values are written in a single text trace up to HEATMAP_LABELS_MAX_SYMBOLS symbols, and only shown on hover above
+
+        Parameters:
+            - correlation_df(dataframe): the correlation matrix, with the symbols as index and columns
+            - cluster(bool): order the symbols so that correlated ones are next to each other
+
+        Returns:
+            - figure: the heatmap figure
+        
+        """
+
+        values = correlation_df.to_numpy(dtype=np.float64)
+
+        if cluster:
+            order = self._correlation_engine.cluster_order(values)
+            values = values[np.ix_(order, order)]
+            currency_pairs = correlation_df.columns[order].tolist()
+        else:
+            currency_pairs = correlation_df.columns.tolist()
 
-        ff_fig = ff.create_annotated_heatmap(
-            x=currency_pairs, 
-            y=currency_pairs, 
-            z=values, 
-            colorscale='Viridis',
-            showscale = True
+        symbol_count = len(currency_pairs)
+
+        fig = go.Figure(
+            go.Heatmap(
+                x=currency_pairs,
+                y=currency_pairs,
+                z=values,
+                zmin=-1,
+                zmax=1,
+                colorscale='Viridis',
+                hovertemplate='%{y} / %{x}: %{z:.3f}<extra></extra>'
+            )
         )
 
-        fig = go.FigureWidget(ff_fig)
-        fig.layout.annotations = ff_fig.layout.annotations
+        if 0 < symbol_count <= HEATMAP_LABELS_MAX_SYMBOLS:
+            cell_values = values.ravel()
+
+            fig.add_trace(
+                go.Scatter(
+                    x=np.tile(currency_pairs, symbol_count),
+                    y=np.repeat(currency_pairs, symbol_count),
+                    text=np.where(np.isnan(cell_values), '', np.char.mod('%.2f', np.nan_to_num(cell_values))),
+                    mode='text',
+                    textfont=dict(
+                        size=HEATMAP_LABEL_FONT_SIZE,
+                        color=np.where(cell_values > 0.3, 'black', 'white')
+                    ),
+                    hoverinfo='skip',
+                    showlegend=False
+                )
+            )
 
         fig.update_layout(
             title=f"Currency correlation",
+            height=min(max(HEATMAP_CELL_PIXELS * symbol_count, 450), HEATMAP_MAX_HEIGHT),
+            xaxis=dict(showgrid=False, tickangle=-90, showticklabels=symbol_count <= HEATMAP_LABELS_MAX_SYMBOLS * 2),
+            yaxis=dict(showgrid=False, autorange='reversed', showticklabels=symbol_count <= HEATMAP_LABELS_MAX_SYMBOLS * 2),
+            plot_bgcolor='white'
         )
 
         return fig
 
-    def plot_pip_range_counts(self, data_day, multiplier):
-
-        def _calculate_points(open_price, close_price):
+    @METRICS.timed(METRICS.plot_seconds)
+    @cached_figure
+    def plot_pip_range_counts(self, data_today, multiplier):
+        """Plot the points each bar of the day moved, coloured by direction
 
-            return round((close_price - open_price) / multiplier)
+        Parameters:
+            - data_today(dataframe): the bars of the day (see slice_today)
+            - multiplier(float): the price of a point
 
-        # Find the earliest point in the day
-        current_date_time = self._find_earlier_hour_today(data_day)
+        Returns:
+            - figure: the bar chart of the points
 
-        data_day = data_day[data_day['time'] >= current_date_time]
+        """
 
-        points_diff_lambda = lambda x: _calculate_points(x['open'], x['close'])
+        points = np.round((data_today['close'].to_numpy() - data_today['open'].to_numpy()) / multiplier)
 
-        colors_list = []
-        points_list = []
-
-        for index, row in data_day.iterrows():
-            diff = points_diff_lambda(row)
-            colors_list.append('green' if diff > 0 else 'red')
-            points_list.append(int(abs(diff)))
-
-        x_val = [x for x in range(0, len(points_list) + 1)]
+        x_val = np.arange(points.shape[0])
+        points_list = np.abs(points).astype(int)
+        colors_list = np.where(points > 0, 'green', 'red')
 
+        # The latest (forming) bar is a trace of its own, so live updates can replace it
         bar_fig = go.Figure(
             [
                 go.Bar(
-                    x=x_val, 
-                    y=points_list,
-                    marker_color=colors_list,
+                    x=x_val[bars], 
+                    y=points_list[bars],
+                    marker_color=colors_list[bars],
                     opacity=0.35,
+                    showlegend=False,
                     hovertemplate='Hour: %{x}:00<br>Points: %{y}<extra></extra>'
-                )
+                ) for bars in [slice(None, -1), slice(-1, None)]
             ]
         )
 
@@ -305,6 +709,8 @@ class Graphs:
 
         return bar_fig
 
+    @METRICS.timed(METRICS.plot_seconds)
+    @cached_figure
     def plot_minimum_profit(self, data_dict):
 
         x_val = list(data_dict.keys())
@@ -329,19 +735,31 @@ class Graphs:
 
         return fig
 
-    def plot_volume_graph(self, data):
+    @METRICS.timed(METRICS.plot_seconds)
+    @cached_figure
+    def plot_volume_graph(self, data_today):
+        """Plot the tick volume of each bar of the day
+
+        Parameters:
+            - data_today(dataframe): the bars of the day (see slice_today)
 
-        current_date_time = self._find_earlier_hour_today(data)
-        data = data[data['time'] >= current_date_time]
+        Returns:
+            - figure: the line chart of the volume
 
-        x_val = [x for x in range(0, len(data))]
+        """
 
+        x_val = np.arange(data_today.shape[0])
+        volumes = data_today['tick_volume'].to_numpy()
+
+        # The segment to the latest (forming) bar is a trace of its own, so live updates can replace it
         fig = go.Figure(
             [
                 go.Scatter(
-                    x=x_val, 
-                    y=data['tick_volume']
-                )
+                    x=x_val[points], 
+                    y=volumes[points],
+                    line_color=LINE_COLOR,
+                    showlegend=False
+                ) for points in [slice(None, -1), slice(-2, None)]
             ]
         )
 
@@ -0,0 +1,133 @@
+from src.Metrics import METRICS
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+class HeikenAshi:
+
+    def _build_arrays(self, open_arr, high_arr, low_arr, close_arr):
+        """Compute the heiken ashi candles over contiguous price arrays
+
+        Parameters:
+            - open_arr(ndarray): the open prices
+            - high_arr(ndarray): the high prices
+            - low_arr(ndarray): the low prices
+            - close_arr(ndarray): the close prices
+
+        Returns:
+            - tuple: the heiken ashi open, high, low and close arrays (first bar dropped)
+
+        """
+
+        ha_open = (open_arr[:-1] + close_arr[:-1]) / 2
+        ha_close = (open_arr[1:] + close_arr[1:] + low_arr[1:] + high_arr[1:]) / 4
+
+        return ha_open, high_arr[1:], low_arr[1:], ha_close
+
+    def build(self, rates_df):
+        """Create the heiken ashi dataframe from the rates, in one vectorized pass
+
+        Parameters:
+            - rates_df(dataframe): the forex data fetched
+
+        Returns:
+            - dataframe: the heiken ashi data, without the first bar
+
+        """
+
+        ha_prices = self._build_arrays(*(rates_df[column].to_numpy(dtype=np.float64) for column in PRICE_COLUMNS))
+
+        # Built in one go: assigning the prices to a copy of the rates costs more than the prices
+        columns = {column: rates_df[column].to_numpy()[1:] for column in rates_df.columns}
+        columns.update(zip(PRICE_COLUMNS, ha_prices))
+
+        return pd.DataFrame(columns, index=rates_df.index[1:])
+
+    def _is_current(self, ha_df, rates_df):
+        """Check whether the heiken ashi data was built from the same bars: the same window,
+        and the same last bar (which may still be forming)
+        """
+
+        if ha_df.shape[0] != rates_df.shape[0] - 1:
+            return False
+
+        if ha_df['time'].iat[0] != rates_df['time'].iat[1] or ha_df['time'].iat[-1] != rates_df['time'].iat[-1]:
+            return False
+
+        open_price, high, low, close = (rates_df[column].iat[-1] for column in PRICE_COLUMNS)
+
+        if ha_df['high'].iat[-1] != high or ha_df['low'].iat[-1] != low or ha_df['close'].iat[-1] != (open_price + close + low + high) / 4:
+            return False
+
+        return all(ha_df[column].iat[-1] == rates_df[column].iat[-1] for column in rates_df.columns if column not in PRICE_COLUMNS)
+
+    def _append(self, ha_df, rates_df):
+        """Compute only the candles of the bars after the last cached one, from the cached open/close arrays
+
+        The last cached candle is computed again, as its bar may still have been forming.
+
+        Parameters:
+            - ha_df(dataframe): the cached heiken ashi data
+            - rates_df(dataframe): the forex data fetched
+
+        Returns:
+            - dataframe: the heiken ashi data, matching build(rates_df) (None when the cache can't be lined up)
+
+        """
+
+        rates_time = rates_df['time'].to_numpy()
+        ha_time = ha_df['time'].to_numpy()
+
+        position = rates_time.searchsorted(ha_time[-1])
+
+        # The last cached bar must be in the window, after its first bar
+        if position == 0 or position >= rates_time.shape[0] or rates_time[position] != ha_time[-1]:
+            return None
+
+        # The cached candles must cover the window up to that bar
+        first = ha_time.shape[0] - position
+
+        if first < 0 or ha_time[first] != rates_time[1]:
+            return None
+
+        tail_open, _, _, tail_close = self._build_arrays(
+            *(rates_df[column].to_numpy(dtype=np.float64)[position - 1:] for column in PRICE_COLUMNS)
+        )
+
+        # The high and low of a candle are the ones of its bar
+        columns = {column: rates_df[column].to_numpy()[1:] for column in rates_df.columns}
+        columns['open'] = np.concatenate([ha_df['open'].to_numpy()[first:-1], tail_open])
+        columns['close'] = np.concatenate([ha_df['close'].to_numpy()[first:-1], tail_close])
+
+        return pd.DataFrame(columns, index=rates_df.index[1:])
+
+    @METRICS.timed(METRICS.stage_seconds)
+    def update(self, ha_df, rates_df):
+        """Get the heiken ashi data of the rates from the cached one: reused as it is when the bars
+        didn't move, extended with the new bars otherwise
+
+        Falls back to a full build whenever the cache can't be lined up with the rates.
+
+        Parameters:
+            - ha_df(dataframe): the cached heiken ashi data (or None)
+            - rates_df(dataframe): the forex data fetched
+
+        Returns:
+            - dataframe: the heiken ashi data, matching build(rates_df)
+
+        """
+
+        if ha_df is None or ha_df.empty or rates_df.shape[0] < 2:
+            return self.build(rates_df)
+
+        if self._is_current(ha_df, rates_df):
+            return ha_df
+
+        data = self._append(ha_df, rates_df)
+
+        if data is None:
+            return self.build(rates_df)
+
+        return data
@@ -0,0 +1,218 @@
+from src.Metrics import METRICS
+
+import numpy as np
+
+import threading
+
+# Committed bars kept per indicator, beyond the latest window
+MAX_HISTORY_BARS = 5000
+
+class _IndicatorState:
+
+    __slots__ = ['times', 'values', 'state']
+
+    def __init__(self, times, values, state):
+        # The committed (closed) bars: their times, indicator values, and the state after the last one
+        self.times = times
+        self.values = values
+        self.state = state
+
+class IndicatorEngine:
+    """Streaming indicators, keeping their state per (symbol, timeframe, indicator)
+
+    Every bar but the latest (which may still be forming) is committed, so a refresh only
+    steps over the bars added since the previous one. The whole window is recomputed when
+    it does not line up with the committed bars (first call, gap, or older history).
+
+    Recomputed windows match talib.RSI and tapy's Indicators.atr; once streaming, the RSI
+    keeps the Wilder smoothing of all the bars seen instead of re-seeding at the window
+    start like talib does, which only differs by a vanishing amount after a few periods.
+    """
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _rsi_step(self, state, bar, period):
+        """Wilder's RSI. The state is (bar count, previous close, average gain, average loss),
+        with the averages holding plain sums until the first period is complete
+        """
+
+        close = bar[0]
+
+        if state is None:
+            return (1, close, 0.0, 0.0), np.nan
+
+        # The count is the position of the bar in the series
+        count, previous_close, average_gain, average_loss = state
+
+        change = close - previous_close
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        if count <= period:
+            average_gain += gain
+            average_loss += loss
+
+            if count == period:
+                average_gain /= period
+                average_loss /= period
+        else:
+            average_gain = (average_gain * (period - 1) + gain) / period
+            average_loss = (average_loss * (period - 1) + loss) / period
+
+        new_state = (count + 1, close, average_gain, average_loss)
+
+        if count < period:
+            return new_state, np.nan
+
+        total = average_gain + average_loss
+
+        return new_state, 100 * average_gain / total if total else 0.0
+
+    def _atr_step(self, state, bar, period):
+        """Average true range, as computed by tapy: the simple moving average of
+        max(high - low, previous close - high, previous close - low).
+        The state is (previous close, latest true ranges)
+        """
+
+        close, high, low = bar
+
+        if state is None:
+            true_range = high - low
+            true_ranges = (true_range,)
+        else:
+            previous_close, true_ranges = state
+            true_range = max(high - low, previous_close - high, previous_close - low)
+            true_ranges = true_ranges[-(period - 1):] + (true_range,)
+
+        value = sum(true_ranges) / period if len(true_ranges) == period else np.nan
+
+        return (close, true_ranges), value
+
+    def _update(self, key, times, columns, step, period, extend_only=False):
+        """Compute an indicator over a window, from the committed state whenever possible
+
+        Parameters:
+            - key(tuple): the (symbol, timeframe, indicator) of the state
+            - times(ndarray): the bar times, oldest first
+            - columns(list): the bar columns fed to the step function
+            - step(function): the function computing the next state and value from a bar
+            - period(int): the period of the indicator
+            - extend_only(bool): leave the state untouched when the window does not line up with it
+
+        Returns:
+            - ndarray: the indicator values, aligned with the bars
+
+        """
+
+        bar_count = times.shape[0]
+        values = np.full(bar_count, np.nan)
+
+        with self._lock:
+            indicator_state = self._states.get(key)
+
+        start = 0
+        state = None
+        kept_times = times[:0]
+        kept_values = values[:0]
+
+        if indicator_state is not None and indicator_state.times.shape[0]:
+            committed_time = indicator_state.times[-1]
+            position = times.searchsorted(committed_time)
+            history_start = indicator_state.times.searchsorted(times[0])
+
+            # The window must start within the committed bars and reach the last of them
+            lines_up = (
+                position < bar_count and times[position] == committed_time
+                and history_start < indicator_state.times.shape[0]
+                and indicator_state.times[history_start] == times[0]
+                and indicator_state.times.shape[0] - history_start == position + 1
+            )
+
+            if lines_up:
+                values[:position + 1] = indicator_state.values[history_start:]
+                start = position + 1
+                state = indicator_state.state
+
+                # The committed bars before the window are kept, for shorter windows (e.g. live updates)
+                kept_times = indicator_state.times[:history_start]
+                kept_values = indicator_state.values[:history_start]
+            elif extend_only:
+                return values
+
+        committed_state = state
+
+        for position in range(start, bar_count):
+            state, values[position] = step(state, tuple(column[position] for column in columns), period)
+
+            if position == bar_count - 2:
+                committed_state = state
+
+        # Commit everything but the latest bar
+        if bar_count > 1:
+            committed_times = np.concatenate([kept_times, times[:-1]])[-MAX_HISTORY_BARS:]
+            committed_values = np.concatenate([kept_values, values[:-1]])[-MAX_HISTORY_BARS:]
+
+            with self._lock:
+                self._states[key] = _IndicatorState(committed_times, committed_values, committed_state)
+
+        return values
+
+    @METRICS.timed(METRICS.stage_seconds)
+    def rsi(self, symbol, timeframe, times, closes, period=14, extend_only=False):
+        """Get the relative strength index over the bars
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+            - times(ndarray): the bar times, oldest first
+            - closes(ndarray): the close prices
+            - period(int): the RSI period
+            - extend_only(bool): only compute from the committed state (NaN values otherwise)
+
+        Returns:
+            - ndarray: the RSI values, NaN for the first period bars
+
+        """
+
+        return self._update(
+            (symbol, timeframe, 'rsi', period),
+            np.asarray(times),
+            [np.asarray(closes, dtype=np.float64)],
+            self._rsi_step,
+            period,
+            extend_only
+        )
+
+    @METRICS.timed(METRICS.stage_seconds)
+    def atr(self, symbol, timeframe, times, highs, lows, closes, period=50, extend_only=False):
+        """Get the average true range over the bars
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+            - times(ndarray): the bar times, oldest first
+            - highs(ndarray): the high prices
+            - lows(ndarray): the low prices
+            - closes(ndarray): the close prices
+            - period(int): the ATR period
+            - extend_only(bool): only compute from the committed state (NaN values otherwise)
+
+        Returns:
+            - ndarray: the ATR values, NaN for the first period - 1 bars
+
+        """
+
+        return self._update(
+            (symbol, timeframe, 'atr', period),
+            np.asarray(times),
+            [
+                np.asarray(closes, dtype=np.float64),
+                np.asarray(highs, dtype=np.float64),
+                np.asarray(lows, dtype=np.float64)
+            ],
+            self._atr_step,
+            period,
+            extend_only
+        )
@@ -0,0 +1,240 @@
+from src.DataProvider import DataProvider
+
+import numpy as np
+
+import bisect
+import functools
+import os
+import threading
+import time
+
+# Setting MT5_METRICS=0 leaves every function unwrapped (the /metrics route is still served, empty)
+METRICS_ENABLED = os.environ.get('MT5_METRICS', '1') != '0'
+
+# Upper bounds of the histogram buckets: seconds, and bytes (256 B to 16 MB, by powers of 4)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(256 * 4 ** power for power in range(9))
+
+def _escape(value):
+    # Label values are escaped as the Prometheus text format requires
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+
+    if not pairs:
+        return ''
+
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Counts of observations per bucket, with their sum, for each set of label values
+
+    Observing is a binary search and a few additions under a lock: cheap enough to leave on.
+    """
+
+    def __init__(self, name, description, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self._buckets = tuple(buckets)
+
+        # label values -> [counts per bucket (the last one above every bound), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        position = bisect.bisect_left(self._buckets, value)
+
+        with self._lock:
+            series = self._series.get(key)
+
+            if series is None:
+                series = self._series[key] = [[0] * (len(self._buckets) + 1), 0.0]
+
+            series[0][position] += 1
+            series[1] += value
+
+        return None
+
+    def get_series(self):
+        """Get the observations of each set of label values
+
+        Returns:
+            - dict: the label values (tuple of pairs) -> (count, sum)
+
+        """
+
+        with self._lock:
+            return {key: (sum(counts), total) for key, (counts, total) in self._series.items()}
+
+    def expose(self):
+        """Get the histogram in the Prometheus text format
+
+        Returns:
+            - list: the lines of the histogram
+
+        """
+
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = np.cumsum(counts)
+
+            for bound, count in zip(self._buckets + ('+Inf',), cumulative):
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {count}")
+
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative[-1]}")
+
+        return lines
+
+class Counter:
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+        return None
+
+    def expose(self):
+
+        with self._lock:
+            series = dict(self._series)
+
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in sorted(series.items())]
+
+        return lines
+
+class Metrics:
+    """The metrics of the process, exposed on the /metrics route (see controller/metrics.py)
+
+    Every label value comes from the code (method and callback names), never from the requests,
+    so the number of series stays bounded.
+    """
+
+    def __init__(self):
+
+        self.callback_seconds = Histogram('dash_callback_seconds', "Time to serve a Dash callback request, serialization included")
+        self.callback_response_bytes = Histogram('dash_callback_response_bytes', "Size of the Dash callback responses (before compression)", SIZE_BUCKETS)
+        self.callback_responses = Counter('dash_callback_responses_total', "Dash callback responses, per HTTP status (204: no update)")
+
+        self.terminal_call_seconds = Histogram('mt5_call_seconds', "Time of the calls to the market data backend")
+        self.terminal_payload_bytes = Histogram('mt5_call_payload_bytes', "Size of the bars returned by the market data backend", SIZE_BUCKETS)
+        self.terminal_failures = Counter('mt5_call_failures_total', "Calls to the market data backend that raised or returned None")
+
+        self.plot_seconds = Histogram('graphs_plot_seconds', "Time to build and serialize a figure (or fetch it from the figure cache)")
+        self.stage_seconds = Histogram('stage_seconds', "Time of the stages behind the figures (indicators, zones, rangebreaks)")
+
+        self._metrics = [
+            self.callback_seconds,
+            self.callback_response_bytes,
+            self.callback_responses,
+            self.terminal_call_seconds,
+            self.terminal_payload_bytes,
+            self.terminal_failures,
+            self.plot_seconds,
+            self.stage_seconds
+        ]
+
+    def timed(self, histogram):
+        """Decorator observing the time of every call of a function, labelled with its qualified name (e.g. Graphs.plot_atr)
+
+        Parameters:
+            - histogram(Histogram): the histogram of the calls
+
+        Returns:
+            - function: the decorator (leaving the function as is when the metrics are disabled)
+
+        """
+
+        def decorator(function):
+
+            if not METRICS_ENABLED:
+                return function
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                started_at = time.perf_counter()
+
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started_at, method=function.__qualname__)
+
+            return wrapper
+
+        return decorator
+
+    def expose(self):
+        """Get every metric in the Prometheus text format
+
+        Returns:
+            - str: the exposition
+        """
+
+        return '\n'.join(line for metric in self._metrics for line in metric.expose()) + '\n'
+
+METRICS = Metrics()
+
+class InstrumentedDataProvider(DataProvider):
+    """Wrap a data provider, timing every call made to the terminal (or the broker)"""
+
+    def __init__(self, data_provider, metrics=METRICS):
+        self._data_provider = data_provider
+        self._metrics = metrics
+
+    def _call(self, method, *args):
+        started_at = time.perf_counter()
+        result = None
+
+        try:
+            result = getattr(self._data_provider, method)(*args)
+            return result
+        finally:
+            self._metrics.terminal_call_seconds.observe(time.perf_counter() - started_at, method=method)
+
+            if result is None:
+                self._metrics.terminal_failures.inc(method=method)
+            elif isinstance(result, np.ndarray):
+                self._metrics.terminal_payload_bytes.observe(result.nbytes, method=method)
+
+    def initialize(self):
+        return self._call('initialize')
+
+    def last_error(self):
+        return self._data_provider.last_error()
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        return self._call('copy_rates_from', symbol, timeframe, date_from, count)
+
+    def symbols_get(self):
+        return self._call('symbols_get')
+
+    def symbol_info(self, symbol):
+        return self._call('symbol_info', symbol)
+
+    def symbol_info_tick(self, symbol):
+        return self._call('symbol_info_tick', symbol)
+
+    def order_calc_margin(self, action, symbol, volume, price):
+        return self._call('order_calc_margin', action, symbol, volume, price)
+
+    def order_calc_profit(self, action, symbol, volume, price_open, price_close):
+        return self._call('order_calc_profit', action, symbol, volume, price_open, price_close)
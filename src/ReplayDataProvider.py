@@ -0,0 +1,302 @@
+from datetime import datetime
+
+from src.DataProvider import (
+    DataProvider, SymbolInfo, SymbolTick, RATES_DTYPE,
+    TIMEFRAME_H1, TIMEFRAME_H4, TIMEFRAME_W1, ORDER_TYPE_BUY
+)
+
+import numpy as np
+import pandas as pd
+
+import os
+import random
+import threading
+import time
+
+class ReplayDataProvider(DataProvider):
+    """Market data replayed from recorded bars on disk
+
+    Bars are read from one file per symbol and timeframe, named <SYMBOL>_<TIMEFRAME>.csv
+    (or .parquet), e.g. EURUSD_1H.csv, with the columns of copy_rates_from.
+    An optional symbols.csv holds the symbol metadata (columns of SymbolInfo).
+    """
+
+    def __init__(self, directory, latency=0.0, jitter=0.0, leverage=100, start=None, speed=1.0):
+        """Create the replay backend
+
+        Parameters:
+            - directory(str): the folder holding the recorded bars
+            - latency(float): the seconds each call takes, to simulate the terminal
+            - jitter(float): the random seconds added on top of the latency
+            - leverage(int): the account leverage used for the margin calculation
+            - start(datetime): if given, the replay clock starts there and hides the later bars
+            - speed(float): how fast the replay clock runs, compared to real time
+
+        """
+
+        self._directory = directory
+        self._latency = latency
+        self._jitter = jitter
+        self._leverage = leverage
+
+        self._start = start
+        self._speed = speed
+        self._created_at = time.time()
+
+        self._timeframe_labels = {
+            TIMEFRAME_H1: '1H',
+            TIMEFRAME_H4: '4H',
+            TIMEFRAME_W1: '1W'
+        }
+
+        self._rates = {}
+        self._symbols_info = None
+        self._lock = threading.Lock()
+
+    def _simulate_latency(self):
+
+        delay = self._latency + random.uniform(0, self._jitter)
+
+        if delay > 0:
+            time.sleep(delay)
+
+        return None
+
+    def _to_epoch(self, date_value):
+        """Convert a datetime to epoch seconds, reading naive datetimes as UTC like the bar times
+        """
+
+        if not isinstance(date_value, datetime):
+            return float(date_value)
+
+        if date_value.tzinfo is None:
+            return (date_value - datetime(1970, 1, 1)).total_seconds()
+
+        return date_value.timestamp()
+
+    def _clock(self):
+        """Get the time of the replay clock, in epoch seconds (the bar times): from the start
+        when one is given, the end of the recorded bars otherwise
+        """
+
+        if self._start is None:
+            return np.inf
+
+        return self._to_epoch(self._start) + (time.time() - self._created_at) * self._speed
+
+    def _replay_time(self, date_from):
+        """Get the latest time visible to the caller, in epoch seconds
+        """
+
+        return min(self._to_epoch(date_from), self._clock())
+
+    def _read_rates(self, path):
+        """Read a recorded bars file into a copy_rates_from-shaped array
+        """
+
+        if path.endswith('.parquet'):
+            rates_df = pd.read_parquet(path)
+        else:
+            rates_df = pd.read_csv(path)
+
+        times = rates_df['time']
+
+        if not pd.api.types.is_numeric_dtype(times):
+            times = (pd.to_datetime(times) - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+
+        rates = np.zeros(rates_df.shape[0], dtype=RATES_DTYPE)
+        rates['time'] = times.to_numpy()
+
+        for column in RATES_DTYPE.names[1:]:
+            if column in rates_df:
+                rates[column] = rates_df[column].to_numpy()
+
+        return np.sort(rates, order='time')
+
+    def _get_rates(self, symbol, timeframe):
+
+        key = (symbol, timeframe)
+
+        with self._lock:
+            if key not in self._rates:
+                self._rates[key] = None
+                label = self._timeframe_labels.get(timeframe)
+
+                for extension in ['parquet', 'csv']:
+                    path = os.path.join(self._directory, f"{symbol}_{label}.{extension}")
+
+                    if os.path.exists(path):
+                        self._rates[key] = self._read_rates(path)
+                        break
+
+            return self._rates[key]
+
+    def _load_symbols_info(self):
+
+        with self._lock:
+            if self._symbols_info is not None:
+                return self._symbols_info
+
+            path = os.path.join(self._directory, 'symbols.csv')
+            metadata = {}
+
+            if os.path.exists(path):
+                for row in pd.read_csv(path).to_dict('records'):
+
+                    # Missing cells get the defaults below, like the symbols without metadata
+                    row = {field: value for field, value in row.items() if not pd.isna(value)}
+
+                    if 'name' in row:
+                        metadata[row['name']] = row
+
+            # Every symbol with recorded bars is listed, metadata or not
+            for file_name in sorted(os.listdir(self._directory)):
+                name, extension = os.path.splitext(file_name)
+
+                if extension in ['.csv', '.parquet'] and '_' in name:
+                    metadata.setdefault(name.rsplit('_', 1)[0], {})
+
+            symbols_info = {}
+
+            for symbol, row in metadata.items():
+                digits = int(row.get('digits', 3 if 'JPY' in symbol else 5))
+
+                symbols_info[symbol] = SymbolInfo(
+                    name=symbol,
+                    digits=digits,
+                    point=float(row.get('point', 10 ** -digits)),
+                    trade_contract_size=float(row.get('trade_contract_size', 100000)),
+                    currency_base=row.get('currency_base', symbol[:3]),
+                    currency_profit=row.get('currency_profit', symbol[3:6]),
+                    currency_margin=row.get('currency_margin', symbol[:3])
+                )
+
+            self._symbols_info = symbols_info
+
+            return self._symbols_info
+
+    def initialize(self):
+        return os.path.isdir(self._directory)
+
+    def last_error(self):
+        return (1, 'Success') if self.initialize() else (-1, f"Replay folder {self._directory} not found")
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        self._simulate_latency()
+
+        rates = self._get_rates(symbol, timeframe)
+
+        if rates is None:
+            return None
+
+        end = rates['time'].searchsorted(self._replay_time(date_from), side='right')
+
+        return rates[max(end - count, 0):end].copy()
+
+    def symbols_get(self):
+        self._simulate_latency()
+
+        return tuple(self._load_symbols_info().values())
+
+    def symbol_info(self, symbol):
+        self._simulate_latency()
+
+        return self._load_symbols_info().get(symbol)
+
+    def symbol_info_tick(self, symbol):
+        self._simulate_latency()
+
+        symbol_info = self._load_symbols_info().get(symbol)
+
+        rates = None
+
+        # The tick is taken from the finest timeframe recorded
+        for timeframe in self._timeframe_labels:
+            rates = self._get_rates(symbol, timeframe)
+
+            if rates is not None:
+                break
+
+        if symbol_info is None or rates is None:
+            return None
+
+        # Like the bars, the ticks follow the replay clock (the wall clock isn't the server time of the bars)
+        end = rates['time'].searchsorted(self._clock(), side='right')
+
+        if end == 0:
+            return None
+
+        last_bar = rates[end - 1]
+        bid = float(last_bar['close'])
+
+        return SymbolTick(
+            time=int(last_bar['time']),
+            bid=bid,
+            ask=bid + int(last_bar['spread']) * symbol_info.point,
+            last=0.0,
+            volume=0,
+            time_msc=int(last_bar['time']) * 1000
+        )
+
+    def order_calc_margin(self, action, symbol, volume, price):
+        """Approximate the margin in the profit currency, as contract size * lots * price / leverage
+        """
+
+        self._simulate_latency()
+
+        symbol_info = self._load_symbols_info().get(symbol)
+
+        if symbol_info is None:
+            return None
+
+        return volume * symbol_info.trade_contract_size * price / self._leverage
+
+    def order_calc_profit(self, action, symbol, volume, price_open, price_close):
+        """Approximate the profit in the profit currency, as contract size * lots * price change
+        """
+
+        self._simulate_latency()
+
+        symbol_info = self._load_symbols_info().get(symbol)
+
+        if symbol_info is None:
+            return None
+
+        direction = 1 if action == ORDER_TYPE_BUY else -1
+
+        return direction * volume * symbol_info.trade_contract_size * (price_close - price_open)
+
+    @staticmethod
+    def record(data_provider, directory, symbols, bar_count=5000):
+        """Record the latest bars of the given symbols from another backend, for later replay
+
+        Parameters:
+            - data_provider(DataProvider): the backend to record from (e.g. MT5DataProvider)
+            - directory(str): the folder to write the bars to
+            - symbols(list): the symbols to record
+            - bar_count(int): the number of bars to record, per symbol and timeframe
+
+        Returns:
+            - None
+
+        """
+
+        os.makedirs(directory, exist_ok=True)
+
+        symbols_info = []
+
+        for symbol in symbols:
+            symbol_info = data_provider.symbol_info(symbol)
+
+            if symbol_info is not None:
+                symbols_info.append({field: getattr(symbol_info, field) for field in SymbolInfo._fields})
+
+            for timeframe, label in {TIMEFRAME_H1: '1H', TIMEFRAME_H4: '4H', TIMEFRAME_W1: '1W'}.items():
+                rates = data_provider.copy_rates_from(symbol, timeframe, datetime.now(), bar_count)
+
+                if rates is not None and len(rates):
+                    pd.DataFrame(rates).to_csv(os.path.join(directory, f"{symbol}_{label}.csv"), index=False)
+
+        pd.DataFrame(symbols_info, columns=SymbolInfo._fields).to_csv(os.path.join(directory, 'symbols.csv'), index=False)
+
+        return None
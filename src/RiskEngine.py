@@ -0,0 +1,225 @@
+from src.DataProvider import ORDER_TYPE_BUY, ORDER_TYPE_SELL
+from src.RiskManager import RiskManager
+
+import numpy as np
+import pandas as pd
+
+import threading
+
+# Share of the margin lost at the broker's stop-out level
+STOP_OUT_LEVEL = 0.20
+
+SIDES = ['buy', 'sell']
+ACTIONS = [ORDER_TYPE_BUY, ORDER_TYPE_SELL]
+
+RISK_COLUMNS = ['symbol', 'side', 'lot_size', 'price', 'margin', 'stop_out_loss', 'point_value', 'remaining_trades', 'required_points']
+
+class _SymbolQuote:
+    """The prices of a symbol at one tick, with the margins and point values quoted at them so far"""
+
+    __slots__ = ['time_msc', 'prices', 'point_values', 'margins']
+
+    def __init__(self, time_msc, prices):
+        self.time_msc = time_msc
+        self.prices = prices
+        self.point_values = None
+
+        # (side, lot size) -> margin
+        self.margins = {}
+
+class RiskEngine:
+    """Margin and position sizing of many symbols, lot sizes and sides at once
+
+    The terminal quotes are kept until the next tick of the symbol. The value of a point scales
+    with the lot size, so it is asked for once per symbol and side, for one lot. The margin does
+    not (brokers tier it by volume): it is asked for each lot size and side actually requested.
+    """
+
+    def __init__(self, data_provider, symbol_registry):
+        """Create the engine
+
+        Parameters:
+            - data_provider(DataProvider): the market data backend
+            - symbol_registry(SymbolRegistry): the metadata of the symbols (for their point)
+
+        """
+
+        self._data_provider = data_provider
+        self._symbol_registry = symbol_registry
+        self._risk_manager = RiskManager()
+
+        # symbol -> quote at the latest tick
+        self._quotes = {}
+        self._lock = threading.Lock()
+
+    def _get_quote(self, symbol):
+        """Get the quote of a symbol at its latest tick (a new, empty one on a new tick)"""
+
+        tick = self._data_provider.symbol_info_tick(symbol)
+
+        if tick is None:
+            raise RuntimeError(f"symbol_info_tick() failed for {symbol}, error code = {self._data_provider.last_error()}")
+
+        with self._lock:
+            quote = self._quotes.get(symbol)
+
+            if quote is None or quote.time_msc != tick.time_msc:
+                quote = _SymbolQuote(tick.time_msc, np.array([tick.ask, tick.bid]))
+                self._quotes[symbol] = quote
+
+        return quote
+
+    def _get_margin(self, symbol, quote, side_index, lot_size):
+        """Get the margin of a position at the quoted price, asking the terminal once per tick"""
+
+        margin = quote.margins.get((side_index, lot_size))
+
+        if margin is None:
+            margin = self._data_provider.order_calc_margin(ACTIONS[side_index], symbol, lot_size, quote.prices[side_index])
+
+            if margin is None:
+                raise RuntimeError(f"order_calc_margin() failed for {symbol}, error code = {self._data_provider.last_error()}")
+
+            quote.margins[(side_index, lot_size)] = margin
+
+        return margin
+
+    def _get_point_values(self, symbol, quote):
+        """Get the value of a point for one lot, of both sides, asking the terminal once per tick"""
+
+        if quote.point_values is None:
+            point = self._symbol_registry.get(symbol).point
+            point_values = np.zeros(len(SIDES))
+
+            for side_index, (action, price, direction) in enumerate(zip(ACTIONS, quote.prices, [1, -1])):
+                point_value = self._data_provider.order_calc_profit(action, symbol, 1.0, price, price + direction * point)
+
+                if point_value is None:
+                    raise RuntimeError(f"order_calc_profit() failed for {symbol}, error code = {self._data_provider.last_error()}")
+
+                # Drop the rounding error of price + point, so the point counts don't round up
+                point_values[side_index] = round(point_value, 10)
+
+            quote.point_values = point_values
+
+        return quote.point_values
+
+    def get_quotes(self, symbols, lot_sizes):
+        """Get the prices, the margins of the lot sizes and the point values of one lot, of both sides of the symbols
+
+        Parameters:
+            - symbols(list): the symbols
+            - lot_sizes(list): the lot sizes to get the margins of
+
+        Returns:
+            - list: the symbols quoted
+            - ndarray: the (symbols, sides) prices
+            - ndarray: the (symbols, sides, lot sizes) margins
+            - ndarray: the (symbols, sides) values of a point for one lot
+            - dict: the error message of the symbols that failed
+
+        """
+
+        quoted_symbols = []
+        prices = []
+        margins = []
+        point_values = []
+        failed_symbols = {}
+
+        for symbol in dict.fromkeys(symbols):
+            try:
+                quote = self._get_quote(symbol)
+                symbol_margins = [
+                    [self._get_margin(symbol, quote, side_index, lot_size) for lot_size in lot_sizes]
+                    for side_index in range(len(SIDES))
+                ]
+                symbol_point_values = self._get_point_values(symbol, quote)
+            except Exception as error:
+                failed_symbols[symbol] = repr(error)
+                continue
+
+            quoted_symbols.append(symbol)
+            prices.append(quote.prices)
+            margins.append(symbol_margins)
+            point_values.append(symbol_point_values)
+
+        symbol_count = len(quoted_symbols)
+
+        return (
+            quoted_symbols,
+            np.array(prices).reshape(symbol_count, len(SIDES)),
+            np.array(margins, dtype=float).reshape(symbol_count, len(SIDES), len(lot_sizes)),
+            np.array(point_values).reshape(symbol_count, len(SIDES)),
+            failed_symbols
+        )
+
+    def calculate_margin(self, symbol, side, lot_size):
+        """Get the margin of a position, from one margin call for its lot size and side
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - side(str): 'buy' or 'sell'
+            - lot_size(float): the lots of the position
+
+        Returns:
+            - float: the margin required
+
+        """
+
+        return float(self._get_margin(symbol, self._get_quote(symbol), SIDES.index(side), lot_size))
+
+    def calculate_risk(self, symbols, lot_sizes, balance, buffer_balance, stop_loss_points, profit_target, profit_trades):
+        """Size every combination of symbol, side and lot size
+
+        Parameters:
+            - symbols(list): the symbols
+            - lot_sizes(list): the lot sizes
+            - balance(float): the account balance
+            - buffer_balance(float): the balance not to go under
+            - stop_loss_points(float): the points lost by a losing trade
+            - profit_target(float): the profit aimed for
+            - profit_trades(int): the trades to reach the profit target in
+
+        Returns:
+            - dataframe: one row per symbol, side and lot size (see RISK_COLUMNS)
+            - dict: the error message of the symbols that failed
+
+        """
+
+        lot_sizes = [float(lot_size) for lot_size in lot_sizes]
+        symbols, prices, margins, point_values, failed_symbols = self.get_quotes(symbols, lot_sizes)
+
+        # (symbols, sides, lot sizes) arrays
+        lot_sizes = np.asarray(lot_sizes)
+        prices = np.broadcast_to(prices[:, :, np.newaxis], margins.shape)
+        point_values = np.abs(point_values[:, :, np.newaxis]) * lot_sizes
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            remaining_trades = self._risk_manager.calculate_remaining_trades({
+                'current_balance': balance,
+                'buffer_balance': buffer_balance,
+                'pip_loss': stop_loss_points,
+                'leverage': point_values
+            })
+
+            required_points = self._risk_manager.calculate_pips_profit({
+                'profit': profit_target,
+                'min_trades_profit': profit_trades,
+                'leverage': point_values
+            })
+
+        symbol_index, side_index, lot_index = np.indices(margins.shape).reshape(3, -1)
+
+        risk_df = pd.DataFrame({
+            'symbol': np.array(symbols, dtype=object)[symbol_index],
+            'side': np.array(SIDES, dtype=object)[side_index],
+            'lot_size': lot_sizes[lot_index],
+            'price': prices.ravel(),
+            'margin': margins.ravel(),
+            'stop_out_loss': balance - STOP_OUT_LEVEL * margins.ravel(),
+            'point_value': point_values.ravel(),
+            'remaining_trades': remaining_trades.ravel(),
+            'required_points': required_points.ravel()
+        }, columns=RISK_COLUMNS)
+
+        return risk_df, failed_symbols
@@ -1,19 +1,29 @@
-import math
+import numpy as np
+
+def _ceil(values):
+    """Round up, to an int for scalars (as math.ceil did) and element-wise for arrays"""
+
+    rounded = np.ceil(values)
+
+    return int(rounded) if np.ndim(rounded) == 0 else rounded
 
 class RiskManager:
+    """Position sizing formulas, on scalars or on numpy arrays of any (broadcastable) shape"""
 
     def calculate_remaining_trades(self, para_dict):
+        """The losing trades the balance can take before reaching the buffer balance"""
 
         amount = para_dict['current_balance'] - para_dict['buffer_balance']
         risk_vol = para_dict['pip_loss'] * para_dict['leverage']
 
-        return math.ceil(amount / risk_vol)
+        return _ceil(amount / risk_vol)
 
 
     def calculate_pips_profit(self, para_dict):
+        """The pips each trade needs to make, to reach the profit aim over the minimum trades"""
 
         profit_aim = para_dict['profit']
         min_trades = para_dict['min_trades_profit']
         leverage = para_dict['leverage']
 
-        return math.ceil(profit_aim / (min_trades * leverage))
\ No newline at end of file
+        return _ceil(profit_aim / (min_trades * leverage))
@@ -0,0 +1,77 @@
+from concurrent.futures import Future
+
+import threading
+
+class SingleFlight:
+    """Share one call between the identical requests made while it is running
+
+    The first caller of a key runs the function, and the callers arriving with the same key
+    before it returns wait for its result (or exception) instead of running it again. Nothing
+    is kept once the call returns, so a later request runs the function again.
+    """
+
+    def __init__(self):
+
+        # key -> future of the result, for the calls in flight
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+
+    def do(self, key, function, *args, copy=None):
+        """Run the function, or wait for the identical call already in flight
+
+        Parameters:
+            - key(hashable): identifies identical calls
+            - function(callable): the function to run
+            - args(list): its arguments
+            - copy(callable): applied to the result handed to the waiting callers, so they
+              don't share a mutable result with the caller that ran the function
+
+        Returns:
+            - the result of the function
+
+        """
+
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            is_leader = future is None
+
+            if is_leader:
+                self.executions += 1
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.deduplicated += 1
+
+        if not is_leader:
+            result = future.result()
+            return copy(result) if copy is not None else result
+
+        try:
+            result = function(*args)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        return result
+
+    def get_stats(self):
+        """Get the counters of the calls, and how many were served by another one in flight
+        """
+
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'deduplicated': self.deduplicated,
+                'in_flight': len(self._in_flight)
+            }
@@ -0,0 +1,98 @@
+import numpy as np
+
+MAJOR_CURRENCIES = ['USD', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD', 'NZD']
+
+class StrengthEngine:
+    """Strength of each currency, from the returns of every cross between them
+
+    The log return of a cross is the strength of its base currency minus the strength of its
+    quote currency. With the 28 crosses of the 8 majors, this is an overdetermined linear system,
+    solved in the least squares sense with the strengths summing to 0 (the minimum norm
+    solution, as the strengths are only defined up to a common shift).
+    """
+
+    def __init__(self, currencies=MAJOR_CURRENCIES):
+        self._currencies = list(currencies)
+        self._positions = {currency: position for position, currency in enumerate(self._currencies)}
+
+    def find_crosses(self, symbols_currencies):
+        """Pick one symbol per cross between the currencies
+
+        Parameters:
+            - symbols_currencies(dict): the (base, quote) currencies of each symbol
+
+        Returns:
+            - dict: the (base, quote) currencies of the symbols picked (the shortest name of each
+              cross, e.g. EURUSD over EURUSD.m)
+
+        """
+
+        crosses = {}
+
+        for symbol in sorted(symbols_currencies, key=lambda name: (len(name), name)):
+            base, quote = symbols_currencies[symbol]
+
+            if base in self._positions and quote in self._positions and base != quote and (base, quote) not in crosses.values():
+                crosses[symbol] = (base, quote)
+
+        return crosses
+
+    def period_returns(self, closes, lookback):
+        """Get the log returns of the latest bars
+
+        Parameters:
+            - closes(ndarray): the (bars, symbols) matrix of the aligned closes
+            - lookback(int): the number of bars the returns are taken over
+
+        Returns:
+            - ndarray: the log return of each symbol (NaN without enough bars)
+
+        """
+
+        if closes.shape[0] <= lookback:
+            return np.full(closes.shape[1], np.nan)
+
+        return np.log(closes[-1]) - np.log(closes[-1 - lookback])
+
+    def solve(self, crosses, returns):
+        """Solve for the strength of every currency, on every column of returns at once
+
+        Parameters:
+            - crosses(list): the (base, quote) currencies of each row of returns
+            - returns(ndarray): the (crosses, columns) log returns (NaN where missing)
+
+        Returns:
+            - ndarray: the (currencies, columns) strengths (NaN for currencies without any cross)
+
+        """
+
+        returns = np.asarray(returns, dtype=float).reshape(len(crosses), -1)
+
+        design = np.zeros((len(crosses), len(self._currencies)))
+
+        for row, (base, quote) in enumerate(crosses):
+            design[row, self._positions[base]] = 1
+            design[row, self._positions[quote]] = -1
+
+        strengths = np.full((len(self._currencies), returns.shape[1]), np.nan)
+        available = ~np.isnan(returns)
+
+        # The columns with the same crosses available share one pseudo-inverse
+        masks, column_groups = np.unique(available.T, axis=0, return_inverse=True)
+
+        for group, mask in enumerate(masks):
+            if not mask.any():
+                continue
+
+            columns = np.flatnonzero(column_groups.ravel() == group)
+            group_design = design[mask]
+
+            strengths[:, columns] = np.linalg.pinv(group_design) @ returns[mask][:, columns]
+
+            # A currency without any cross has no strength (rather than 0)
+            strengths[np.ix_(~group_design.any(axis=0), columns)] = np.nan
+
+        return strengths
+
+    def get_currencies(self):
+        return list(self._currencies)
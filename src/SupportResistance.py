@@ -0,0 +1,205 @@
+from src.DivergenceScanner import find_swings
+from src.Metrics import METRICS
+
+import numpy as np
+import pandas as pd
+
+import threading
+
+# Bars on each side of a pivot: a pivot high is the highest high of 2 * order + 1 bars
+PIVOT_ORDER = 5
+
+# The price range of a zone, in average bar ranges (high - low)
+ZONE_WIDTH_RANGES = 0.5
+
+# Pivots needed for a zone, and the zones kept (the most touched ones)
+MIN_ZONE_TOUCHES = 2
+MAX_ZONES = 8
+
+ZONE_COLUMNS = ['low', 'high', 'touches', 'last_touch', 'kind']
+
+class _PivotState:
+
+    __slots__ = ['scanned_time', 'times', 'prices']
+
+    def __init__(self, scanned_time, times, prices):
+        # The time of the last bar decided (pivot or not), and the pivots found up to it
+        self.scanned_time = scanned_time
+        self.times = times
+        self.prices = prices
+
+class SupportResistance:
+    """Support and resistance zones, from clusters of pivot highs and lows
+
+    The pivots are kept per (symbol, timeframe): a bar is only decided once the order bars
+    after it are closed, and a refresh only scans the bars closed since the previous one. The
+    zones are then clustered again from the pivots of the window, which only sorts them.
+    """
+
+    def __init__(self, order=PIVOT_ORDER, width_ranges=ZONE_WIDTH_RANGES,
+                 min_touches=MIN_ZONE_TOUCHES, max_zones=MAX_ZONES):
+        self._order = order
+        self._width_ranges = width_ranges
+        self._min_touches = min_touches
+        self._max_zones = max_zones
+
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def find_pivots(self, times, highs, lows):
+        """Find the pivot highs and lows of closed bars
+
+        Parameters:
+            - times(ndarray): the bar times, oldest first
+            - highs(ndarray): the high prices
+            - lows(ndarray): the low prices
+
+        Returns:
+            - ndarray: the times of the pivots
+            - ndarray: the prices of the pivots (the high of a pivot high, the low of a pivot low)
+
+        """
+
+        pivot_highs = find_swings(highs, self._order, lowest=False)
+        pivot_lows = find_swings(lows, self._order, lowest=True)
+
+        # A bar can be both (e.g. an outside bar), and then counts twice
+        prices = np.concatenate([highs[pivot_highs], lows[pivot_lows]])
+        pivot_times = np.concatenate([times[pivot_highs], times[pivot_lows]])
+
+        order = np.argsort(pivot_times, kind='stable')
+
+        return pivot_times[order], prices[order]
+
+    def _update_pivots(self, key, times, highs, lows):
+        """Get the pivots of the window, only scanning the bars closed since the last call
+
+        Returns:
+            - ndarray: the times of the pivots within the window
+            - ndarray: the prices of the pivots
+
+        """
+
+        # The latest bar may still be forming: only the bars before it are decided
+        decided_count = times.shape[0] - 1 - self._order
+
+        with self._lock:
+            state = self._states.get(key)
+
+        start = 0
+
+        if state is not None:
+            position = times.searchsorted(state.scanned_time)
+
+            # The window must reach past the bars already decided (not an older window)
+            if position < decided_count and times[position] == state.scanned_time:
+                start = position + 1
+
+        if start == 0:
+            state = _PivotState(None, times[:0], highs[:0])
+
+        if decided_count > start:
+            # The bars around the undecided ones, up to the last closed bar
+            scan_start = max(start - self._order, 0)
+            new_times, new_prices = self.find_pivots(
+                times[scan_start:-1], highs[scan_start:-1], lows[scan_start:-1]
+            )
+
+            new_pivots = new_times >= times[start]
+
+            state = _PivotState(
+                times[decided_count - 1],
+                np.concatenate([state.times, new_times[new_pivots]]),
+                np.concatenate([state.prices, new_prices[new_pivots]])
+            )
+
+        # The pivots before the window are dropped
+        window_start = state.times.searchsorted(times[0])
+        state = _PivotState(state.scanned_time, state.times[window_start:], state.prices[window_start:])
+
+        with self._lock:
+            self._states[key] = state
+
+        return state.times, state.prices
+
+    def cluster(self, prices, times, width):
+        """Group the pivot prices into zones: from the lowest price not in a zone yet, a zone takes
+        every price within the width above it (so zones don't chain into wide bands)
+
+        Parameters:
+            - prices(ndarray): the prices of the pivots
+            - times(ndarray): the times of the pivots
+            - width(float): the largest price range of a zone
+
+        Returns:
+            - ndarray: the low, high, touches (count of pivots) of each zone, lowest first
+            - ndarray: the time of the latest pivot of each zone
+
+        """
+
+        if not prices.shape[0]:
+            return np.zeros((0, 3)), times[:0]
+
+        order = np.argsort(prices, kind='stable')
+        sorted_prices = prices[order]
+        sorted_times = times[order]
+
+        # One binary search per zone, over the sorted prices
+        starts = [0]
+
+        while True:
+            end = sorted_prices.searchsorted(sorted_prices[starts[-1]] + width, side='right')
+
+            if end >= sorted_prices.shape[0]:
+                break
+
+            starts.append(end)
+
+        starts = np.array(starts)
+        ends = np.append(starts[1:], sorted_prices.shape[0])
+
+        zones = np.column_stack([sorted_prices[starts], sorted_prices[ends - 1], ends - starts])
+
+        return zones, np.maximum.reduceat(sorted_times, starts)
+
+    @METRICS.timed(METRICS.stage_seconds)
+    def update(self, symbol, timeframe, rates_df):
+        """Get the support and resistance zones of the latest bars
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+            - rates_df(dataframe): the bars, oldest first
+
+        Returns:
+            - dataframe: the zones (see ZONE_COLUMNS), lowest first; a zone is a support below the
+              latest close, a resistance above it
+
+        """
+
+        times = rates_df['time'].to_numpy()
+        highs = rates_df['high'].to_numpy(dtype=np.float64)
+        lows = rates_df['low'].to_numpy(dtype=np.float64)
+
+        if times.shape[0] < 2 * self._order + 2:
+            return pd.DataFrame(columns=ZONE_COLUMNS)
+
+        pivot_times, pivot_prices = self._update_pivots((symbol, timeframe), times, highs, lows)
+
+        zones, last_touches = self.cluster(pivot_prices, pivot_times, self._width_ranges * np.mean(highs - lows))
+
+        # The most touched zones (the latest touched first among equals), then lowest first
+        kept = np.flatnonzero(zones[:, 2] >= self._min_touches)
+        kept = kept[np.lexsort((-last_touches[kept].astype(np.int64), -zones[kept, 2]))][:self._max_zones]
+        kept.sort()
+
+        close = rates_df['close'].iat[-1]
+        lows, highs = zones[kept, 0], zones[kept, 1]
+
+        return pd.DataFrame({
+            'low': lows,
+            'high': highs,
+            'touches': zones[kept, 2].astype(int),
+            'last_touch': last_touches[kept],
+            'kind': np.where(highs < close, 'support', np.where(lows > close, 'resistance', 'pivot'))
+        }, columns=ZONE_COLUMNS)
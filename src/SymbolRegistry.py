@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+
+# The symbols are listed again in the background once older than this
+SYMBOL_REFRESH_SECONDS = 60 * 60
+
+class SymbolMeta:
+    """The static metadata of a symbol (see the MT5 SymbolInfo)"""
+
+    __slots__ = ['name', 'digits', 'point', 'multiplier', 'trade_contract_size', 'currency_base', 'currency_profit', 'currency_margin']
+
+    def __init__(self, name, digits, point, trade_contract_size, currency_base, currency_profit, currency_margin):
+        self.name = name
+        self.digits = int(digits)
+        self.point = float(point)
+        self.multiplier = 10 ** -self.digits
+        self.trade_contract_size = float(trade_contract_size)
+        self.currency_base = currency_base
+        self.currency_profit = currency_profit
+        self.currency_margin = currency_margin
+
+    @classmethod
+    def from_symbol_info(cls, symbol_info):
+        return cls(
+            symbol_info.name,
+            symbol_info.digits,
+            symbol_info.point,
+            symbol_info.trade_contract_size,
+            symbol_info.currency_base,
+            symbol_info.currency_profit,
+            symbol_info.currency_margin
+        )
+
+class _Snapshot:
+
+    __slots__ = ['symbols', 'names', 'listed_at']
+
+    def __init__(self, symbols_meta, listed_at):
+        # The symbols in alphabetical order
+        self.names = sorted(symbols_meta)
+        self.symbols = {name: symbols_meta[name] for name in self.names}
+        self.listed_at = listed_at
+
+class SymbolRegistry:
+    """The metadata of every symbol, listed in bulk from a single symbols_get() call
+
+    Lookups by name are dictionary reads, without any terminal call. Once the listing is
+    older than the refresh interval, it is still served while a background thread lists the
+    symbols again. A symbol missing from the listing is looked up on its own, and kept.
+    """
+
+    def __init__(self, data_provider, refresh_interval=SYMBOL_REFRESH_SECONDS):
+        """Create the registry (the symbols are listed on first use)
+
+        Parameters:
+            - data_provider(DataProvider): the market data backend
+            - refresh_interval(float): the seconds after which the symbols are listed again
+
+        """
+
+        self._data_provider = data_provider
+        self._refresh_interval = refresh_interval
+
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    def _list_symbols(self):
+        """List the symbols, and swap in their snapshot"""
+
+        symbols = self._data_provider.symbols_get()
+
+        if symbols is None:
+            raise RuntimeError(f"symbols_get() failed, error code = {self._data_provider.last_error()}")
+
+        snapshot = _Snapshot({symbol.name: SymbolMeta.from_symbol_info(symbol) for symbol in symbols}, time.monotonic())
+
+        with self._lock:
+            self._snapshot = snapshot
+
+        return snapshot
+
+    def _refresh_in_background(self):
+
+        try:
+            self._list_symbols()
+        except Exception as error:
+            logging.warning(f"Failed to refresh the symbols: {error!r}")
+
+        return None
+
+    def _get_snapshot(self):
+
+        with self._lock:
+            snapshot = self._snapshot
+
+            if snapshot is not None and time.monotonic() - snapshot.listed_at > self._refresh_interval:
+                if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                    self._refresh_thread = threading.Thread(target=self._refresh_in_background, name='symbols-refresh', daemon=True)
+                    self._refresh_thread.start()
+
+        # Only the very first lookup waits for the listing
+        return snapshot if snapshot is not None else self._list_symbols()
+
+    def get_names(self):
+        """Get the names of the symbols
+
+        Returns:
+            - list: the names, in alphabetical order
+
+        """
+
+        return self._get_snapshot().names
+
+    def get(self, symbol):
+        """Get the metadata of a symbol
+
+        Parameters:
+            - symbol(str): the underlying symbol
+
+        Returns:
+            - SymbolMeta: the metadata of the symbol
+
+        """
+
+        snapshot = self._get_snapshot()
+        symbol_meta = snapshot.symbols.get(symbol)
+
+        if symbol_meta is not None:
+            return symbol_meta
+
+        # Not listed (e.g. hidden from the market watch): look it up on its own
+        symbol_info = self._data_provider.symbol_info(symbol)
+
+        if symbol_info is None:
+            raise RuntimeError(f"symbol_info() failed for {symbol}, error code = {self._data_provider.last_error()}")
+
+        symbol_meta = SymbolMeta.from_symbol_info(symbol_info)
+
+        with self._lock:
+            symbols_meta = dict(self._snapshot.symbols, **{symbol: symbol_meta})
+            self._snapshot = _Snapshot(symbols_meta, self._snapshot.listed_at)
+
+        return symbol_meta
@@ -0,0 +1,110 @@
+from src.ForexAnalyzer import ForexAnalyzer
+
+import logging
+import threading
+import time
+
+class TickPoller:
+    """Background poller of the latest tick and bars of the symbols open in the dashboard
+
+    One poller serves every browser: each (symbol, timeframe) viewed is polled once per
+    interval, and only re-fetches its latest few bars when a new tick arrived. Subscriptions
+    not read for a while are dropped, so closed tabs stop costing terminal calls.
+    """
+
+    def __init__(self, forex_analyzer=None, interval=0.5, bar_count=3, subscription_timeout=60):
+        """Create the poller (the thread starts on the first subscription)
+
+        Parameters:
+            - forex_analyzer(ForexAnalyzer): the analyzer fetching the ticks and bars (the
+              shared instance, created by the poller thread, if None)
+            - interval(float): the seconds between two polls
+            - bar_count(int): the number of latest bars fetched on a new tick
+            - subscription_timeout(float): the seconds after which an unread subscription is dropped
+
+        """
+
+        self._forex_analyzer = forex_analyzer
+        self._interval = interval
+        self._bar_count = bar_count
+        self._subscription_timeout = subscription_timeout
+
+        # (symbol, timeframe) -> {'read_at', 'tick_time', 'version', 'bars', 'tick'}
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _poll_subscription(self, symbol, timeframe, subscription):
+
+        tick = self._forex_analyzer.get_symbol_tick(symbol)
+
+        if tick is None or tick.time_msc == subscription['tick_time']:
+            return None
+
+        bars = self._forex_analyzer.get_latest_bars(timeframe, self._bar_count, symbol)
+
+        with self._lock:
+            subscription['tick_time'] = tick.time_msc
+            subscription['tick'] = tick
+            subscription['bars'] = bars
+            subscription['version'] += 1
+
+        return None
+
+    def _run(self):
+
+        if self._forex_analyzer is None:
+            self._forex_analyzer = ForexAnalyzer.get_instance()
+
+        while True:
+            started_at = time.monotonic()
+
+            with self._lock:
+                expired = [key for key, subscription in self._subscriptions.items() if started_at - subscription['read_at'] > self._subscription_timeout]
+
+                for key in expired:
+                    del self._subscriptions[key]
+
+                subscriptions = list(self._subscriptions.items())
+
+            for (symbol, timeframe), subscription in subscriptions:
+                try:
+                    self._poll_subscription(symbol, timeframe, subscription)
+                except Exception as error:
+                    logging.warning(f"Failed to poll {symbol} ({timeframe}): {error!r}")
+
+            time.sleep(max(self._interval - (time.monotonic() - started_at), 0))
+
+    def get_update(self, symbol, timeframe):
+        """Get the latest tick and bars of a symbol, subscribing to it if needed
+
+        Parameters:
+            - symbol(str): the underlying symbol
+            - timeframe(str): the timeframe of the bars
+
+        Returns:
+            - dict: the 'version', 'tick' and latest 'bars' (dataframe), or None until the first poll
+
+        """
+
+        key = (symbol, timeframe)
+
+        with self._lock:
+            if key not in self._subscriptions:
+                self._subscriptions[key] = {'read_at': 0, 'tick_time': None, 'version': 0, 'bars': None, 'tick': None}
+
+            subscription = self._subscriptions[key]
+            subscription['read_at'] = time.monotonic()
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='tick-poller', daemon=True)
+                self._thread.start()
+
+            if subscription['bars'] is None:
+                return None
+
+            return {
+                'version': subscription['version'],
+                'tick': subscription['tick'],
+                'bars': subscription['bars']
+            }
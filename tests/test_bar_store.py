@@ -0,0 +1,55 @@
+from src.BarStore import BarStore
+from src.DataProvider import RATES_DTYPE
+
+import numpy as np
+
+import threading
+
+def _bars(times, close):
+    rates = np.zeros(len(times), dtype=RATES_DTYPE)
+    rates['time'] = times
+    rates['open'] = rates['high'] = rates['low'] = rates['close'] = close
+    rates['tick_volume'] = close
+
+    return rates
+
+def test_append_and_read_latest(tmp_path):
+    bar_store = BarStore(str(tmp_path))
+    bar_store.append('EURUSD', '1H', _bars(np.arange(10) * 3600, 1.0))
+
+    # The latest stored bar was still forming: it is overwritten, and the new ones appended
+    bar_store.append('EURUSD', '1H', _bars(np.arange(9, 12) * 3600, 2.0))
+
+    rates = bar_store.read('EURUSD', '1H', 4)
+
+    assert rates['time'].tolist() == [8 * 3600, 9 * 3600, 10 * 3600, 11 * 3600]
+    assert rates['close'].tolist() == [1.0, 2.0, 2.0, 2.0]
+    assert len(bar_store.read('EURUSD', '1H')) == 12
+    assert len(bar_store.read('EURUSD', '1H', 50)) == 12
+    assert bar_store.get_extent('EURUSD', '1H') == (12, 11 * 3600)
+
+def test_read_never_sees_half_written_bar(tmp_path):
+    bar_store = BarStore(str(tmp_path))
+    bar_store.append('EURUSD', '1H', _bars(np.arange(100) * 3600, 0.0))
+
+    stop = threading.Event()
+
+    def _tick():
+        # The forming bar is overwritten in place on every tick, all its prices at once
+        for tick in range(1, 2000):
+            bar_store.append('EURUSD', '1H', _bars([99 * 3600], float(tick)))
+
+        stop.set()
+
+    writer = threading.Thread(target=_tick)
+    writer.start()
+
+    torn_reads = 0
+
+    while not stop.is_set():
+        last_bar = bar_store.read('EURUSD', '1H', 1)[0]
+        torn_reads += len({last_bar[column] for column in ['open', 'high', 'low', 'close', 'tick_volume']}) > 1
+
+    writer.join()
+
+    assert torn_reads == 0
@@ -0,0 +1,73 @@
+from benchmarks.synthetic import generate_rates
+from src.CorrelationEngine import CorrelationEngine
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SYMBOL_COUNT = 12
+BAR_COUNT = 300
+WINDOW = 48
+
+@pytest.fixture
+def symbols_data():
+    """Every fifth symbol misses a few random bars, to exercise the time alignment"""
+
+    symbols_data = {}
+
+    for seed in range(SYMBOL_COUNT):
+        rates_df = generate_rates(BAR_COUNT + 1, '1H', seed=seed)
+
+        if seed % 5 == 0:
+            rates_df = rates_df.drop(np.random.default_rng(seed).choice(BAR_COUNT, 10, replace=False)).reset_index(drop=True)
+
+        symbols_data[f"SYM{seed:03d}"] = rates_df
+
+    return symbols_data
+
+def test_align_closes_keeps_previous_close(symbols_data):
+    times, symbols, closes = CorrelationEngine().align_closes(symbols_data)
+
+    assert symbols == list(symbols_data)
+    assert closes.shape == (times.shape[0], SYMBOL_COUNT)
+
+    for column, symbol in enumerate(symbols):
+        rates_df = symbols_data[symbol].set_index('time')
+        np.testing.assert_array_equal(closes[:, column], rates_df['close'].reindex(times, method='ffill').to_numpy())
+
+def test_correlation_matrix_matches_pandas(symbols_data):
+    engine = CorrelationEngine()
+    times, symbols, closes = engine.align_closes(symbols_data)
+
+    reference = pd.DataFrame(closes, columns=symbols).apply(np.log).diff().corr().to_numpy()
+
+    np.testing.assert_allclose(engine.correlation_matrix(closes), reference, atol=1e-12)
+
+def test_rolling_correlations_match_recompute(symbols_data):
+    engine = CorrelationEngine()
+    times, symbols, closes = engine.align_closes(symbols_data)
+
+    # Streaming the bars, the forming one changing before it closes
+    for end in range(times.shape[0] - 100, times.shape[0] + 1):
+        moved = closes[:end].copy()
+        moved[-1] *= 1.001
+        engine.rolling_correlation_matrix('1H', times[:end], symbols, moved, WINDOW)
+
+        rolling = engine.rolling_correlation_matrix('1H', times[:end], symbols, closes[:end], WINDOW)
+
+    np.testing.assert_allclose(rolling, engine.correlation_matrix(closes[-WINDOW - 1:]), atol=1e-12)
+
+def test_rolling_states_per_symbols(symbols_data):
+    engine = CorrelationEngine()
+    times, symbols, closes = engine.align_closes(symbols_data)
+
+    # Two panels on the same timeframe, with different symbols, refreshed in turn
+    panels = [symbols[:6], symbols[4:]]
+
+    for end in range(times.shape[0] - 20, times.shape[0] + 1):
+        for panel in panels:
+            columns = [symbols.index(symbol) for symbol in panel]
+            engine.rolling_correlation_matrix(('1H', tuple(panel)), times[:end], panel, closes[:end, columns], WINDOW)
+
+    # Both kept stepping from their own state, instead of rebuilding it on every call
+    assert [engine._states[('1H', tuple(panel))].steps for panel in panels] == [20, 20]
@@ -0,0 +1,66 @@
+from benchmarks.references import talib_rsi
+from benchmarks.synthetic import generate_rates
+from src.DivergenceScanner import DivergenceScanner, scan_series, stack_series, wilder_rsi
+
+import numpy as np
+import pandas as pd
+import pytest
+
+BAR_COUNT = 200
+SYMBOL_COUNT = 40
+
+@pytest.fixture
+def timeframes_data():
+    symbols = [f"SYM{index:03d}" for index in range(SYMBOL_COUNT)]
+
+    return {
+        timeframe: {symbol: generate_rates(BAR_COUNT - 7 * (seed % 3), timeframe, seed=seed) for seed, symbol in enumerate(symbols)}
+        for timeframe in ['1H', '4H']
+    }
+
+def test_wilder_rsi_matches_talib(timeframes_data):
+    symbols_data = timeframes_data['1H']
+    symbols, (_, _, closes) = stack_series(symbols_data, BAR_COUNT)
+
+    rsi = wilder_rsi(closes)
+
+    # The shorter histories are padded with NaN: their RSI starts later
+    for column, symbol in enumerate(symbols):
+        reference = talib_rsi(symbols_data[symbol]['close'])
+        np.testing.assert_allclose(rsi[BAR_COUNT - reference.shape[0]:, column], reference, atol=1e-9)
+
+def test_stacked_scan_matches_per_series(timeframes_data):
+    symbols_data = timeframes_data['1H']
+    symbols, (highs, lows, closes) = stack_series(symbols_data, BAR_COUNT)
+
+    stacked = scan_series(highs, lows, closes)
+    stacked = pd.DataFrame(stacked).assign(symbol=lambda found: [symbols[column] for column in found['column']])
+
+    per_series = []
+
+    for symbol in symbols:
+        _, (highs, lows, closes) = stack_series({symbol: symbols_data[symbol]}, BAR_COUNT)
+        per_series.append(pd.DataFrame(scan_series(highs, lows, closes)).assign(symbol=symbol))
+
+    per_series = pd.concat(per_series)
+    sort_columns = ['symbol', 'divergence']
+
+    assert stacked.shape[0] > 0
+    pd.testing.assert_frame_equal(
+        stacked.drop(columns='column').sort_values(sort_columns).reset_index(drop=True),
+        per_series.drop(columns='column').sort_values(sort_columns).reset_index(drop=True),
+        check_dtype=False
+    )
+
+def test_pooled_scan_matches_in_process(timeframes_data):
+    in_process = DivergenceScanner(max_workers=1).scan(timeframes_data, BAR_COUNT)
+
+    scanner = DivergenceScanner(max_workers=2, chunk_series=SYMBOL_COUNT // 2)
+
+    try:
+        pooled = scanner.scan(timeframes_data, BAR_COUNT)
+    finally:
+        scanner.shutdown()
+
+    assert not in_process.empty
+    pd.testing.assert_frame_equal(pooled, in_process)
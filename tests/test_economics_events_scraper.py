@@ -0,0 +1,195 @@
+from datetime import date, datetime
+
+import economics_events_scraper
+from economics_events_scraper import ForexFactoryScraper, EVENT_COLUMNS, _format_day
+
+import pytest
+
+import email.message
+import io
+import json
+import os
+import time
+import urllib.error
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'forexfactory_calendar.html')
+
+with open(FIXTURE_PATH) as fixture_file:
+    CALENDAR_HTML = fixture_file.read()
+
+class FakeResponse(io.BytesIO):
+    """A urlopen response, with the validators of the page"""
+
+    def __init__(self, body, headers):
+        super().__init__(body.encode('utf-8'))
+        self.headers = headers
+
+class FakeCalendarServer:
+    """Stands in for urllib.request.urlopen: serves the fixture, or a 304 when the ETag matches"""
+
+    def __init__(self, html=CALENDAR_HTML, etag='"v1"', last_modified='Mon, 04 Jan 2021 00:00:00 GMT'):
+        self.html = html
+        self.etag = etag
+        self.last_modified = last_modified
+        self.requests = []
+
+    def __call__(self, request, timeout=None):
+
+        self.requests.append(request)
+
+        headers = email.message.Message()
+        headers['ETag'] = self.etag
+        headers['Last-Modified'] = self.last_modified
+
+        if request.get_header('If-none-match') == self.etag:
+            raise urllib.error.HTTPError(request.full_url, 304, 'Not Modified', headers, None)
+
+        return FakeResponse(self.html, headers)
+
+@pytest.fixture
+def server(monkeypatch):
+    fake_server = FakeCalendarServer()
+    monkeypatch.setattr(economics_events_scraper.urllib.request, 'urlopen', fake_server)
+
+    return fake_server
+
+def _wait_for_refresh(scraper):
+    scraper._refresh_thread.join(timeout=5)
+    assert not scraper._refresh_thread.is_alive()
+
+def test_format_day_has_no_leading_zero():
+    assert _format_day(date(2021, 1, 5)) == 'Jan 5'
+    assert _format_day(datetime(2021, 11, 25, 13, 30)) == 'Nov 25'
+
+def test_parse_fills_blank_dates_and_times(tmp_path):
+    scraper = ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path))
+
+    events_df = scraper.parse(CALENDAR_HTML)
+
+    assert list(events_df.columns) == EVENT_COLUMNS
+    assert events_df.to_dict(orient='records') == [
+        {'date': 'Jan 4', 'time_minus_12hours': '2:00am', 'currency': 'EUR', 'event': 'German Retail Sales m/m', 'impact': 3},
+        {'date': 'Jan 4', 'time_minus_12hours': '2:00am', 'currency': 'EUR', 'event': 'Spanish Manufacturing PMI', 'impact': 2},
+        {'date': 'Jan 4', 'time_minus_12hours': '10:00am', 'currency': 'USD', 'event': 'ISM Manufacturing PMI', 'impact': 1},
+        {'date': 'Jan 5', 'time_minus_12hours': 'All Day', 'currency': 'CHF', 'event': 'Bank Holiday', 'impact': 4},
+        {'date': 'Jan 5', 'time_minus_12hours': '4:30am', 'currency': 'GBP', 'event': 'Mortgage Approvals', 'impact': 2}
+    ]
+
+def test_parsers_agree(tmp_path):
+    scraper = ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path))
+
+    assert scraper._extract_rows_lxml(CALENDAR_HTML) == scraper._extract_rows_soup(CALENDAR_HTML)
+
+def test_parse_page_without_events(tmp_path):
+    scraper = ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path))
+
+    events_df = scraper.parse('<html><body><table></table></body></html>')
+
+    assert events_df.empty
+    assert list(events_df.columns) == EVENT_COLUMNS
+
+def test_events_indexed_by_day(tmp_path, server):
+    scraper = ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path))
+
+    assert scraper.get_events(date(2021, 1, 4))['event'].tolist() == [
+        'German Retail Sales m/m', 'Spanish Manufacturing PMI', 'ISM Manufacturing PMI'
+    ]
+    assert scraper.get_events(date(2021, 1, 5))['currency'].tolist() == ['CHF', 'GBP']
+
+    # The Sunday only has its day breaker row
+    no_events_df = scraper.get_events(date(2021, 1, 3))
+
+    assert no_events_df.empty
+    assert list(no_events_df.columns) == EVENT_COLUMNS
+
+    assert len(server.requests) == 1
+
+def test_file_url(tmp_path):
+    scraper = ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path), url='file://' + os.path.abspath(FIXTURE_PATH))
+
+    assert len(scraper.get_events(date(2021, 1, 4))) == 3
+
+def test_cache_served_within_ttl(tmp_path, server):
+    ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path)).refresh()
+
+    with open(tmp_path / 'calendar_jan.2021.json') as cache_file:
+        cache = json.load(cache_file)
+
+    assert cache['etag'] == server.etag
+    assert cache['last_modified'] == server.last_modified
+    assert len(cache['events']) == 5
+
+    # A new calendar (e.g. after a restart) is served from the disk cache
+    scraper = ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path))
+
+    assert len(scraper.get_events(date(2021, 1, 4))) == 3
+    assert scraper._refresh_thread is None
+    assert len(server.requests) == 1
+
+def test_expired_cache_revalidated_in_background(tmp_path, server):
+    scraper = ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path), ttl=60)
+    scraper.refresh()
+
+    scraper._fetched_at = time.time() - 120
+
+    # The expired events are served, while the page is revalidated
+    assert len(scraper.get_events(date(2021, 1, 4))) == 3
+
+    _wait_for_refresh(scraper)
+
+    revalidation = server.requests[-1]
+
+    assert len(server.requests) == 2
+    assert revalidation.get_header('If-none-match') == server.etag
+    assert revalidation.get_header('If-modified-since') == server.last_modified
+
+    # Not modified: the events are kept, and fresh again
+    assert len(scraper.get_events(date(2021, 1, 4))) == 3
+    assert time.time() - scraper._fetched_at < 60
+    assert len(server.requests) == 2
+
+def test_changed_page_replaces_events(tmp_path, server):
+    scraper = ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path), ttl=60)
+    scraper.refresh()
+
+    server.html = CALENDAR_HTML.replace('Mortgage Approvals', 'Net Lending to Individuals m/m')
+    server.etag = '"v2"'
+    scraper._fetched_at = time.time() - 120
+
+    scraper.get_events(date(2021, 1, 5))
+    _wait_for_refresh(scraper)
+
+    assert scraper.get_events(date(2021, 1, 5))['event'].tolist() == ['Bank Holiday', 'Net Lending to Individuals m/m']
+
+    with open(tmp_path / 'calendar_jan.2021.json') as cache_file:
+        assert json.load(cache_file)['etag'] == '"v2"'
+
+def test_failed_revalidation_keeps_events(tmp_path, server, monkeypatch):
+    scraper = ForexFactoryScraper('jan.2021', cache_dir=str(tmp_path), ttl=60)
+    scraper.refresh()
+
+    def _unreachable(request, timeout=None):
+        raise urllib.error.URLError('unreachable')
+
+    monkeypatch.setattr(economics_events_scraper.urllib.request, 'urlopen', _unreachable)
+    scraper._fetched_at = time.time() - 120
+
+    assert len(scraper.get_events(date(2021, 1, 4))) == 3
+    _wait_for_refresh(scraper)
+
+    assert len(scraper.get_events(date(2021, 1, 4))) == 3
+
+def test_this_month_downloaded_again_after_rollover(tmp_path, server):
+    scraper = ForexFactoryScraper('this', cache_dir=str(tmp_path))
+    scraper.refresh()
+
+    # Cached during the previous month: downloaded again in full, without the validators
+    scraper._fetched_month = '2000-01'
+    scraper._save_cache()
+
+    scraper = ForexFactoryScraper('this', cache_dir=str(tmp_path))
+    scraper.get_events(date(2021, 1, 4))
+
+    assert len(server.requests) == 2
+    assert server.requests[-1].get_header('If-none-match') is None
+    assert scraper._fetched_month == datetime.now().strftime('%Y-%m')
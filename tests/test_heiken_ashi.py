@@ -0,0 +1,54 @@
+from benchmarks.bench_heiken_ashi import legacy_heiken_ashi
+from benchmarks.synthetic import generate_rates
+from src.HeikenAshi import HeikenAshi
+
+import pandas as pd
+import pytest
+
+BAR_COUNT = 300
+
+@pytest.fixture
+def rates_df():
+    return generate_rates(BAR_COUNT + 10)
+
+def _assert_matches_legacy(ha_df, rates_df):
+    pd.testing.assert_frame_equal(ha_df, legacy_heiken_ashi(rates_df), check_dtype=False)
+
+def test_build_matches_legacy(rates_df):
+    _assert_matches_legacy(HeikenAshi().build(rates_df), rates_df)
+
+def test_update_appends_new_bars(rates_df):
+    heiken_ashi = HeikenAshi()
+
+    # The window moved by a few bars, the last cached one having formed since
+    previous_df = rates_df.iloc[:BAR_COUNT].reset_index(drop=True)
+    current_df = rates_df.iloc[5:].reset_index(drop=True)
+
+    cached_df = heiken_ashi.build(previous_df.assign(close=previous_df['close'] + 0.001 * (previous_df.index == BAR_COUNT - 1)))
+
+    _assert_matches_legacy(heiken_ashi.update(cached_df, current_df), current_df)
+
+def test_update_replaces_forming_bar(rates_df):
+    heiken_ashi = HeikenAshi()
+
+    cached_df = heiken_ashi.build(rates_df)
+    ticked_df = rates_df.copy()
+    ticked_df.loc[ticked_df.index[-1], 'close'] += 0.002
+
+    _assert_matches_legacy(heiken_ashi.update(cached_df, ticked_df), ticked_df)
+
+def test_update_reuses_current_data(rates_df):
+    heiken_ashi = HeikenAshi()
+
+    cached_df = heiken_ashi.build(rates_df)
+
+    assert heiken_ashi.update(cached_df, rates_df) is cached_df
+
+@pytest.mark.parametrize('cached_slice', [slice(50, 100), slice(20, BAR_COUNT), slice(0, 0)])
+def test_update_rebuilds_unaligned_cache(rates_df, cached_slice):
+    heiken_ashi = HeikenAshi()
+
+    current_df = rates_df.iloc[10:].reset_index(drop=True)
+    cached_df = heiken_ashi.build(rates_df.iloc[cached_slice].reset_index(drop=True)) if cached_slice.stop else None
+
+    _assert_matches_legacy(heiken_ashi.update(cached_df, current_df), current_df)
@@ -0,0 +1,97 @@
+from benchmarks.references import talib_rsi, tapy_atr
+from benchmarks.synthetic import generate_rates
+from src.IndicatorEngine import IndicatorEngine
+
+import numpy as np
+import pytest
+
+WINDOW = 600
+
+def _indicators(engine, window_df, extend_only=False):
+    times = window_df['time'].to_numpy()
+
+    rsi = engine.rsi('EURUSD', '4H', times, window_df['close'].to_numpy(), extend_only=extend_only)
+    atr = engine.atr(
+        'EURUSD', '4H', times,
+        window_df['high'].to_numpy(), window_df['low'].to_numpy(), window_df['close'].to_numpy(),
+        extend_only=extend_only
+    )
+
+    return rsi, atr
+
+@pytest.fixture
+def rates_df():
+    return generate_rates(WINDOW + 100, '4H')
+
+def _window(rates_df, start, end):
+    return rates_df.iloc[start:end].reset_index(drop=True)
+
+def test_full_window_matches_references(rates_df):
+    window_df = _window(rates_df, 0, WINDOW)
+
+    rsi, atr = _indicators(IndicatorEngine(), window_df)
+
+    np.testing.assert_allclose(rsi, talib_rsi(window_df['close']), atol=1e-9)
+    np.testing.assert_allclose(atr, tapy_atr(window_df), atol=1e-12)
+
+def test_streamed_refresh_matches_references(rates_df):
+    engine = IndicatorEngine()
+
+    for shift in range(100):
+        window_df = _window(rates_df, shift, WINDOW + shift)
+        rsi, atr = _indicators(engine, window_df)
+
+    # Both keep stepping over every bar seen, instead of starting again at the window
+    history_df = _window(rates_df, 0, WINDOW + 99)
+
+    np.testing.assert_allclose(rsi, talib_rsi(history_df['close'])[-WINDOW:], atol=1e-9)
+    np.testing.assert_allclose(atr, tapy_atr(history_df)[-WINDOW:], atol=1e-12)
+
+def test_forming_bar_is_not_committed(rates_df):
+    engine = IndicatorEngine()
+    window_df = _window(rates_df, 0, WINDOW)
+
+    _indicators(engine, window_df.assign(close=window_df['close'] + 0.01 * (window_df.index == WINDOW - 1)))
+    rsi, atr = _indicators(engine, window_df)
+
+    np.testing.assert_allclose(rsi, talib_rsi(window_df['close']), atol=1e-9)
+    np.testing.assert_allclose(atr, tapy_atr(window_df), atol=1e-12)
+
+def test_gap_forces_recompute(rates_df):
+    engine = IndicatorEngine()
+    _indicators(engine, _window(rates_df, 0, WINDOW - 50))
+
+    # The new window starts after the committed bars: it can't be stepped from them
+    window_df = _window(rates_df, WINDOW - 40, WINDOW + 100)
+    rsi, atr = _indicators(engine, window_df)
+
+    np.testing.assert_allclose(rsi, talib_rsi(window_df['close']), atol=1e-9)
+    np.testing.assert_allclose(atr, tapy_atr(window_df), atol=1e-12)
+
+def test_extend_only_continues_committed_bars(rates_df):
+    engine = IndicatorEngine()
+    _indicators(engine, _window(rates_df, 0, WINDOW))
+
+    # The latest bars of a live update: the last closed bar, the previously forming one and a new one
+    live_df = _window(rates_df, WINDOW - 2, WINDOW + 1)
+    rsi, atr = _indicators(engine, live_df, extend_only=True)
+
+    history_df = _window(rates_df, 0, WINDOW + 1)
+
+    np.testing.assert_allclose(rsi, talib_rsi(history_df['close'])[-3:], atol=1e-9)
+    np.testing.assert_allclose(atr, tapy_atr(history_df)[-3:], atol=1e-12)
+
+def test_extend_only_leaves_unaligned_state(rates_df):
+    engine = IndicatorEngine()
+    _indicators(engine, _window(rates_df, 0, WINDOW))
+
+    rsi, atr = _indicators(engine, _window(rates_df, WINDOW + 10, WINDOW + 13), extend_only=True)
+
+    assert np.isnan(rsi).all() and np.isnan(atr).all()
+
+    # The committed bars are untouched: the next refresh still steps from them
+    rsi, atr = _indicators(engine, _window(rates_df, 1, WINDOW + 1))
+    history_df = _window(rates_df, 0, WINDOW + 1)
+
+    np.testing.assert_allclose(rsi, talib_rsi(history_df['close'])[-WINDOW:], atol=1e-9)
+    np.testing.assert_allclose(atr, tapy_atr(history_df)[-WINDOW:], atol=1e-12)
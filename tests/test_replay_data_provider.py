@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic import generate_rates
+from src.DataProvider import ORDER_TYPE_BUY, TIMEFRAME_H1
+from src.ReplayDataProvider import ReplayDataProvider
+
+import pandas as pd
+import pytest
+
+BAR_COUNT = 100
+
+@pytest.fixture
+def replay_dir(tmp_path):
+    rates_df = generate_rates(BAR_COUNT, '1H')
+
+    # Recorded just now: the latest bar opened on the server clock, ahead of the wall clock (UTC)
+    server_hour = pd.Timestamp.utcnow().tz_localize(None).floor('H') + pd.Timedelta(hours=2)
+    rates_df['time'] += server_hour - rates_df['time'].iat[-1]
+    rates_df.to_csv(tmp_path / 'EURUSD_1H.csv', index=False)
+
+    return tmp_path, rates_df
+
+def _epoch(bar_time):
+    return (bar_time - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+
+def _latest_bar(data_provider, date_from):
+    return data_provider.copy_rates_from('EURUSD', TIMEFRAME_H1, date_from, 3)[-1]
+
+def test_tick_follows_the_bars(replay_dir):
+    directory, rates_df = replay_dir
+    data_provider = ReplayDataProvider(str(directory))
+
+    # The app asks for the bars up to the server time, ahead of the wall clock
+    latest_bar = _latest_bar(data_provider, datetime.now() + timedelta(hours=3))
+    tick = data_provider.symbol_info_tick('EURUSD')
+
+    assert tick.time == latest_bar['time'] == _epoch(rates_df['time'].iat[-1])
+    assert tick.bid == pytest.approx(rates_df['close'].iat[-1])
+
+def test_tick_follows_the_replay_clock(replay_dir):
+    directory, rates_df = replay_dir
+    start = rates_df['time'].iat[50].to_pydatetime()
+    data_provider = ReplayDataProvider(str(directory), start=start, speed=0)
+
+    latest_bar = _latest_bar(data_provider, datetime.now() + timedelta(hours=3))
+    tick = data_provider.symbol_info_tick('EURUSD')
+
+    assert tick.time == latest_bar['time'] == _epoch(rates_df['time'].iat[50])
+    assert tick.bid == pytest.approx(rates_df['close'].iat[50])
+
+def test_leverage_from_environment(replay_dir, monkeypatch):
+    from src.ForexAnalyzer import create_data_provider
+
+    directory, _ = replay_dir
+    monkeypatch.delenv('FOREX_DATA_BROKER', raising=False)
+    monkeypatch.setenv('MT5_REPLAY_DIR', str(directory))
+    monkeypatch.setenv('MT5_REPLAY_LEVERAGE', '30')
+
+    data_provider = create_data_provider()
+
+    assert data_provider.order_calc_margin(ORDER_TYPE_BUY, 'EURUSD', 1.0, 1.2) == pytest.approx(100000 * 1.2 / 30)
@@ -0,0 +1,51 @@
+from src.StrengthEngine import StrengthEngine, MAJOR_CURRENCIES
+
+import numpy as np
+import pytest
+
+import itertools
+
+CROSSES = list(itertools.combinations(MAJOR_CURRENCIES, 2))
+
+@pytest.fixture
+def strengths():
+    strengths = np.random.default_rng(0).normal(size=(len(MAJOR_CURRENCIES), 3))
+
+    return strengths - strengths.mean(axis=0)
+
+def _cross_returns(strengths, crosses):
+    positions = {currency: position for position, currency in enumerate(MAJOR_CURRENCIES)}
+
+    return np.array([strengths[positions[base]] - strengths[positions[quote]] for base, quote in crosses])
+
+def test_solve_recovers_exact_strengths(strengths):
+    solved = StrengthEngine().solve(CROSSES, _cross_returns(strengths, CROSSES))
+
+    np.testing.assert_allclose(solved, strengths, atol=1e-12)
+
+def test_solve_noisy_returns(strengths):
+    returns = _cross_returns(strengths, CROSSES) + np.random.default_rng(1).normal(scale=0.01, size=(len(CROSSES), 3))
+
+    np.testing.assert_allclose(StrengthEngine().solve(CROSSES, returns), strengths, atol=0.02)
+
+def test_solve_missing_crosses(strengths):
+    returns = _cross_returns(strengths, CROSSES)
+
+    # NZD has no cross left in the second column: it gets no strength, the others still sum to 0
+    returns[[position for position, cross in enumerate(CROSSES) if 'NZD' in cross], 1] = np.nan
+
+    solved = StrengthEngine().solve(CROSSES, returns)
+
+    np.testing.assert_allclose(solved[:, [0, 2]], strengths[:, [0, 2]], atol=1e-12)
+    assert np.isnan(solved[-1, 1])
+    assert abs(np.nansum(solved[:, 1])) < 1e-12
+
+def test_find_crosses_prefers_plain_names():
+    crosses = StrengthEngine().find_crosses({
+        'EURUSD.m': ('EUR', 'USD'),
+        'EURUSD': ('EUR', 'USD'),
+        'XAUUSD': ('XAU', 'USD'),
+        'GBPJPY': ('GBP', 'JPY')
+    })
+
+    assert crosses == {'EURUSD': ('EUR', 'USD'), 'GBPJPY': ('GBP', 'JPY')}
@@ -0,0 +1,54 @@
+from benchmarks.synthetic import generate_rates
+from src.SupportResistance import SupportResistance, MIN_ZONE_TOUCHES, PIVOT_ORDER, ZONE_COLUMNS
+
+import numpy as np
+import pytest
+
+WINDOW = 300
+REFRESHES = 60
+
+@pytest.fixture
+def rates_df():
+    return generate_rates(WINDOW + REFRESHES, '4H', seed=3)
+
+def _loop_pivots(highs, lows, order):
+    """Pivots found bar by bar, with a max and min over each window"""
+
+    pivots = []
+
+    for position in range(order, len(highs) - order):
+        if highs[position] == max(highs[position - order:position + order + 1]):
+            pivots.append(highs[position])
+
+        if lows[position] == min(lows[position - order:position + order + 1]):
+            pivots.append(lows[position])
+
+    return pivots
+
+def test_find_pivots_matches_loop(rates_df):
+    _, prices = SupportResistance().find_pivots(
+        rates_df['time'].to_numpy(), rates_df['high'].to_numpy(), rates_df['low'].to_numpy()
+    )
+
+    assert prices.tolist() == _loop_pivots(rates_df['high'].tolist(), rates_df['low'].tolist(), PIVOT_ORDER)
+
+def test_incremental_pivots_match_full_scan(rates_df):
+    support_resistance = SupportResistance()
+
+    for end in range(WINDOW, WINDOW + REFRESHES + 1):
+        window_df = rates_df.iloc[end - WINDOW:end].reset_index(drop=True)
+        zones_df = support_resistance.update('EURUSD', '4H', window_df)
+
+    # Every bar seen but the forming one is scanned, and the pivots before the window dropped
+    closed_df = rates_df.iloc[:-1]
+    pivot_times, pivot_prices = SupportResistance().find_pivots(
+        closed_df['time'].to_numpy(), closed_df['high'].to_numpy(), closed_df['low'].to_numpy()
+    )
+    in_window = pivot_times >= window_df['time'].iat[0]
+    state = support_resistance._states[('EURUSD', '4H')]
+
+    np.testing.assert_array_equal(state.times, pivot_times[in_window])
+    np.testing.assert_array_equal(state.prices, pivot_prices[in_window])
+
+    assert list(zones_df.columns) == ZONE_COLUMNS
+    assert (zones_df['touches'] >= MIN_ZONE_TOUCHES).all() and (zones_df['low'] <= zones_df['high']).all()